@@ -1,12 +1,26 @@
 import os
-import json
+import sys
 import random
+from array import array
 from collections import defaultdict
 import argparse
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 # Paths relative to this script
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 ROOT_DIR = os.path.dirname(BASE_DIR)
+
+sys.path.insert(0, ROOT_DIR)
+from group_runner import run_groups
+from json_backend import load_path
+from jsonl_writer import AtomicJsonlWriter
+import profiling
+from results_store import load_store
+from solution_index import SolutionIndex
 RUN_RESULT_DIR = os.path.join(ROOT_DIR, 'run_result')
 AGENTS_SOLUTION_DIR = os.path.join(ROOT_DIR, 'agents_solution')
 LITE_SCORES_PATH = os.path.join(BASE_DIR, 'seg_method', 'lite.json')
@@ -22,8 +36,7 @@ OUTPUT_MODEL_NAME = "Agent_Selection_v1"
 
 def load_json(path):
     try:
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return load_path(path)
     except FileNotFoundError:
         print(f"Warning: File not found: {path}")
         return {}
@@ -31,24 +44,6 @@ def load_json(path):
         print(f"Error reading {path}: {e}")
         return {}
 
-def load_jsonl_to_dict(path):
-    """Loads a JSONL file into a dict mapping instance_id to the full record."""
-    data = {}
-    try:
-        with open(path, 'r', encoding='utf-8') as f:
-            for line in f:
-                if not line.strip(): continue
-                try:
-                    record = json.loads(line)
-                    if 'instance_id' in record:
-                        data[record['instance_id']] = record
-                except json.JSONDecodeError:
-                    continue
-    except FileNotFoundError:
-        # Some agents might not have a solution file if they are baselines or errored
-        print(f"Warning: Solution file not found: {path}")
-    return data
-
 def parse_run_result_filename(filename):
     """
     Parses filenames like 'JoyCode__gpt-5.1-500-1.json'
@@ -78,6 +73,153 @@ def parse_run_result_filename(filename):
     
     return None, None
 
+@profiling.profiled()
+def build_score_matrix(store, agents_info, use_numpy=None):
+    """
+    Builds the instances x agents n_resolved_tests matrix for one LLM group.
+    Returns (agent_names, instances, scores): with NumPy, scores is an
+    instances x agents int array; otherwise a list of per-agent int arrays
+    aligned with the sorted instances. Missing entries are 0.
+    """
+    if use_numpy is None:
+        use_numpy = np is not None
+    agent_names = [info['agent_name'] for info in agents_info]
+
+    per_agent = []
+    all_instances = set()
+    for info in agents_info:
+        results_map = store.n_resolved(info['filename']) if store.has(info['filename']) else {}
+        all_instances.update(results_map)
+        per_agent.append(results_map)
+
+    instances = sorted(all_instances)
+    index = {inst_id: i for i, inst_id in enumerate(instances)}
+
+    if use_numpy:
+        scores = np.zeros((len(instances), len(agent_names)), dtype=np.int64)
+        for a, results_map in enumerate(per_agent):
+            rows = np.fromiter((index[inst_id] for inst_id in results_map), dtype=np.intp, count=len(results_map))
+            scores[rows, a] = np.fromiter(results_map.values(), dtype=np.int64, count=len(results_map))
+        return agent_names, instances, scores
+
+    columns = []
+    for results_map in per_agent:
+        col = array('i', bytes(4 * len(instances)))
+        for inst_id, n in results_map.items():
+            col[index[inst_id]] = n
+        columns.append(col)
+
+    return agent_names, instances, columns
+
+def top_agents(scores, n_instances):
+    """
+    Yields (max resolved, [agent indexes at that max]) per instance. With a
+    NumPy matrix the row maxima and the tie mask come from one pass over the
+    whole matrix, so the per-instance work is only the tied agents.
+    """
+    if np is not None and isinstance(scores, np.ndarray):
+        maxes = scores.max(axis=1)
+        rows, cols = np.nonzero(scores == maxes[:, None])
+        # rows is sorted, so each instance's tied agents are one contiguous run of cols
+        bounds = np.searchsorted(rows, np.arange(n_instances + 1)).tolist()
+        cols = cols.tolist()
+        for i, max_resolved in enumerate(maxes.tolist()):
+            yield max_resolved, cols[bounds[i]:bounds[i + 1]]
+        return
+
+    # Pure-Python fallback: column-wise max, then a scan of every agent
+    maxes = list(map(max, zip(*scores))) if scores else [0] * n_instances
+    for i, max_resolved in enumerate(maxes):
+        yield max_resolved, [a for a, col in enumerate(scores) if col[i] == max_resolved]
+
+@profiling.profiled()
+def select_agents(agent_names, instances, scores, lite_scores, rng):
+    """
+    Picks one agent per instance: most resolved tests, then highest lite.json
+    score, then a seeded random choice. Yields one metadata entry per instance
+    in sorted instance order.
+    """
+    n_agents = len(agent_names)
+    lite = [lite_scores.get(name, 0) for name in agent_names]
+
+    for instance_id, (max_resolved, tied) in zip(instances, top_agents(scores, len(instances))):
+        candidates = [agent_names[a] for a in tied]
+
+        # Tie-breaking logic
+        tie_status = "no_tie"
+        chosen_agent = candidates[0]
+        tie_break_score = None
+
+        if len(tied) > 1:
+            # Secondary Criteria: lite.json score
+            tie_status = "score_break"
+            tie_break_score = max(lite[a] for a in tied)
+            score_candidates = [agent_names[a] for a in tied if lite[a] == tie_break_score]
+
+            if len(score_candidates) == 1:
+                chosen_agent = score_candidates[0]
+            else:
+                # Tertiary Criteria: Random
+                tie_status = "random_break"
+                chosen_agent = rng.choice(score_candidates)
+
+        yield {
+            "instance_id": instance_id,
+            "chosen_agent": chosen_agent,
+            "n_resolved_tests": max_resolved,
+            "tie_status": tie_status,
+            "tie_break_score": tie_break_score, # Only relevant if tie occurred
+            "candidate_agents": candidates, # Who was tied at top resolved count
+            "total_agents_evaluated": n_agents
+        }
+
+# Offset indexes over agents_solution/<agent>.jsonl, shared across the LLM
+# groups a process handles. Only the byte offsets stay resident; a chosen
+# record is read with a seek and decoded on demand.
+agent_solution_indexes = {}
+
+def get_agent_solution(agent_name, instance_id):
+    if agent_name not in agent_solution_indexes:
+        sol_path = os.path.join(AGENTS_SOLUTION_DIR, f"{agent_name}.jsonl")
+        agent_solution_indexes[agent_name] = SolutionIndex(sol_path)
+        
+    return agent_solution_indexes[agent_name].get(instance_id)
+
+def process_llm_group(llm_name, agents_info, store, lite_scores):
+    print(f"\nProcessing LLM: {llm_name}")
+    
+    # Instances x agents matrix of resolved test counts
+    agent_names, instances, scores = build_score_matrix(store, agents_info)
+        
+    print(f"  Found {len(agent_names)} agents and {len(instances)} unique instances.")
+    
+    # Initialize random seed for this LLM to ensures deterministic behavior per LLM
+    rng = random.Random(RANDOM_SEED)
+    
+    # Stream Outputs for this LLM: each record is written as soon as its instance is decided
+    meta_path = os.path.join(METADATA_DIR, f"{llm_name}.jsonl")
+    chosen_path = os.path.join(CHOSEN_DIR, f"{llm_name}.jsonl")
+    print(f"  Writing metadata to {meta_path}...")
+    print(f"  Writing chosen solutions to {chosen_path}...")
+    
+    with AtomicJsonlWriter(meta_path) as meta_out, AtomicJsonlWriter(chosen_path) as chosen_out:
+        for meta_entry in select_agents(agent_names, instances, scores, lite_scores, rng):
+            meta_out.write(meta_entry)
+            
+            # Prepare Chosen Solution Entry
+            # Records are decoded fresh from the solution file, so they are updated in place
+            instance_id = meta_entry["instance_id"]
+            chosen_agent = meta_entry["chosen_agent"]
+            solution_record = get_agent_solution(chosen_agent, instance_id)
+            if solution_record:
+                solution_record['model_name_or_path'] = OUTPUT_MODEL_NAME
+                chosen_out.write(solution_record)
+            else:
+                # If solution not found (shouldn't happen for valid agents), create placeholder or warn
+                # For now we will skip/warn, but strict requirements imply we need a solution
+                print(f"    [WARNING] Solution payload missing for {chosen_agent} on {instance_id}")
+
+@profiling.profiled()
 def main():
     print("Starting Agent Selection Algorithm...")
     
@@ -91,6 +233,7 @@ def main():
     
     # 3. Scan Run Results and Group by LLM
     print(f"Scanning {RUN_RESULT_DIR}...")
+    store = load_store(RUN_RESULT_DIR)
     files_by_llm = defaultdict(list)
     
     for filename in os.listdir(RUN_RESULT_DIR):
@@ -104,126 +247,11 @@ def main():
                 'path': os.path.join(RUN_RESULT_DIR, filename)
             })
 
-    # Cache for agent solution modifications to avoid re-reading files unnecessarily across LLMs
-    # (Though currently we process per LLM, agent files are same across LLMs? 
-    # Actually agents_solution filenames are just agent names, e.g. JoyCode.jsonl)
-    # We will load instances on demand or pre-load per agent. 
-    # Given file sizes are small (~1-2MB), we can cache them.
-    agent_solutions_cache = {}
-
-    def get_agent_solution(agent_name, instance_id):
-        if agent_name not in agent_solutions_cache:
-            sol_path = os.path.join(AGENTS_SOLUTION_DIR, f"{agent_name}.jsonl")
-            agent_solutions_cache[agent_name] = load_jsonl_to_dict(sol_path)
-            
-        return agent_solutions_cache[agent_name].get(instance_id)
-
-    # 4. Process Each LLM Group
-    for llm_name, agents_info in files_by_llm.items():
-        print(f"\nProcessing LLM: {llm_name}")
-        
-        # Load all agent result data for this LLM
-        agent_results = {} # agent_name -> {instance_id -> n_resolved}
-        all_instances = set()
-        
-        for info in agents_info:
-            agent_name = info['agent_name']
-            data = load_json(info['path'])
-            
-            # Allow mapping instance results to simpler lookup
-            results_map = {}
-            for inst_id, res in data.items():
-                results_map[inst_id] = res.get('n_resolved_tests', 0)
-                all_instances.add(inst_id)
-            
-            agent_results[agent_name] = results_map
-            
-        print(f"  Found {len(agent_results)} agents and {len(all_instances)} unique instances.")
-        
-        metadata_output = []
-        chosen_output = []
-        
-        # Initialize random seed for this LLM to ensures deterministic behavior per LLM
-        rng = random.Random(RANDOM_SEED)
-        
-        for instance_id in sorted(list(all_instances)):
-            # Gather scores for this instance
-            candidates = []
-            max_resolved = -1
-            
-            for agent_name, results in agent_results.items():
-                resolved_count = results.get(instance_id, 0) # Default to 0 if instance missing for agent
-                if resolved_count > max_resolved:
-                    max_resolved = resolved_count
-                    candidates = [agent_name]
-                elif resolved_count == max_resolved:
-                    candidates.append(agent_name)
-            
-            # Tie-breaking logic
-            tie_status = "no_tie"
-            chosen_agent = candidates[0]
-            tie_break_score = None
-            
-            if len(candidates) > 1:
-                # Secondary Criteria: lite.json score
-                tie_status = "score_break"
-                best_score = -1
-                score_candidates = []
-                
-                for cand in candidates:
-                    score = lite_scores.get(cand, 0)
-                    if score > best_score:
-                        best_score = score
-                        score_candidates = [cand]
-                    elif score == best_score:
-                        score_candidates.append(cand)
-                
-                tie_break_score = best_score
-                
-                if len(score_candidates) == 1:
-                    chosen_agent = score_candidates[0]
-                else:
-                    # Tertiary Criteria: Random
-                    tie_status = "random_break"
-                    chosen_agent = rng.choice(score_candidates)
-            
-            # Prepare Metadata Entry
-            meta_entry = {
-                "instance_id": instance_id,
-                "chosen_agent": chosen_agent,
-                "n_resolved_tests": max_resolved,
-                "tie_status": tie_status,
-                "tie_break_score": tie_break_score, # Only relevant if tie occurred
-                "candidate_agents": candidates, # Who was tied at top resolved count
-                "total_agents_evaluated": len(agent_results)
-            }
-            metadata_output.append(meta_entry)
-            
-            # Prepare Chosen Solution Entry
-            solution_record = get_agent_solution(chosen_agent, instance_id)
-            if solution_record:
-                # Create a copy to avoid modifying cache
-                final_record = solution_record.copy()
-                final_record['model_name_or_path'] = OUTPUT_MODEL_NAME
-
-                chosen_output.append(final_record)
-            else:
-                # If solution not found (shouldn't happen for valid agents), create placeholder or warn
-                # For now we will skip/warn, but strict requirements imply we need a solution
-                print(f"    [WARNING] Solution payload missing for {chosen_agent} on {instance_id}")
-
-        # Write Outputs for this LLM
-        meta_path = os.path.join(METADATA_DIR, f"{llm_name}.jsonl")
-        print(f"  Writing metadata to {meta_path}...")
-        with open(meta_path, 'w', encoding='utf-8') as f:
-            for entry in metadata_output:
-                f.write(json.dumps(entry) + '\n')
-                
-        chosen_path = os.path.join(CHOSEN_DIR, f"{llm_name}.jsonl")
-        print(f"  Writing chosen solutions to {chosen_path}...")
-        with open(chosen_path, 'w', encoding='utf-8') as f:
-            for entry in chosen_output:
-                f.write(json.dumps(entry) + '\n')
+    # 4. Process Each LLM Group (independent groups fan out to worker processes)
+    run_groups(process_llm_group, [
+        (llm_name, agents_info, store, lite_scores)
+        for llm_name, agents_info in files_by_llm.items()
+    ])
                 
     print("\nProcessing Complete.")
 
@@ -1,7 +1,13 @@
-import json
 import os
 import re
-from collections import defaultdict
+import json
+import argparse
+
+from group_runner import run_groups
+from llm_group import load_llm_group
+import profiling
+from results_store import load_json, load_store, scan_results_dir
+from threshold_sweep import ThresholdSweep, solved_fractions, threshold_grid
 
 # Configurations
 GENERATED_RESULTS_DIR = r"c:\Users\naolt\Downloads\class projects\dkang\results\run_result"
@@ -17,204 +23,205 @@ def get_generated_dir():
 
 ACTIVE_GEN_DIR = get_generated_dir()
 
-def load_json(filepath):
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error reading {filepath}: {e}")
-        return None
+def _read_real_resolved(path, store=None):
+    resolved = store.cached_real_resolved(path) if store is not None else None
+    if resolved is not None:
+        return resolved
+    data = load_json(path)
+    return set(data.get("resolved", [])) if data else set()
 
-def parse_filename(filename):
-    name_no_ext = os.path.splitext(filename)[0]
-    if name_no_ext.startswith("gold_"):
-        return "GOLD", name_no_ext.replace("gold_", "")
-    if name_no_ext.startswith("none_"):
-        return "NONE", name_no_ext.replace("none_", "")
-    parts = name_no_ext.split("__")
-    if len(parts) == 2:
-        return parts[0], parts[1]
-    return name_no_ext, "Unknown"
-
-def get_meaningful_tests(gold_data, none_data):
-    meaningful_map = {}
-    all_instances = set(gold_data.keys()) | set(none_data.keys())
-    for instance_id in all_instances:
-        gold_resolved = set(gold_data.get(instance_id, {}).get("details", {}).get("resolved", []))
-        none_resolved = set(none_data.get(instance_id, {}).get("details", {}).get("resolved", []))
-        meaningful = gold_resolved - none_resolved
-        if meaningful:
-            meaningful_map[instance_id] = meaningful
-    return meaningful_map
-
-def load_real_results(agent_name):
+class RealResultsIndex:
+    """
+    One listing of a real results directory. Agent names resolve to files
+    against that listing, and each file's resolved set is read at most once.
+    """
+
+    def __init__(self, real_results_dir):
+        self.real_results_dir = real_results_dir
+        try:
+            self.names = os.listdir(real_results_dir)
+        except OSError:
+            self.names = []
+        self._name_set = set(self.names)
+        self._paths = {}
+        self._resolved = {}
+
+    def path(self, agent_name):
+        """results_<agent>.json, else the first listed file containing the agent name; None if neither."""
+        if agent_name not in self._paths:
+            fname = f"results_{agent_name}.json"
+            if fname not in self._name_set:
+                # Fuzzy match if needed (e.g. Lingxi names might differ slightly)
+                fname = next((c for c in self.names if agent_name in c), None)
+            self._paths[agent_name] = os.path.join(self.real_results_dir, fname) if fname else None
+        return self._paths[agent_name]
+
+    def resolved(self, agent_name, store=None):
+        path = self.path(agent_name)
+        if path is None:
+            return None
+        if path not in self._resolved:
+            self._resolved[path] = _read_real_resolved(path, store)
+        return self._resolved[path]
+
+
+_real_indexes = {}  # real results dir -> RealResultsIndex
+
+def real_results_index(real_results_dir=None):
+    real_results_dir = real_results_dir or REAL_RESULTS_DIR
+    if real_results_dir not in _real_indexes:
+        _real_indexes[real_results_dir] = RealResultsIndex(real_results_dir)
+    return _real_indexes[real_results_dir]
+
+def load_real_results(agent_name, real_results_dir=None, store=None):
     """
     Load the real SWE-bench verified results for a given agent.
     File format: filtered_results/results_[agent].json
+    A store opened from a corpus snapshot serves unchanged files without reading them.
     """
-    # Try exact match first
-    fname = f"results_{agent_name}.json"
-    fpath = os.path.join(REAL_RESULTS_DIR, fname)
-    if os.path.exists(fpath):
-        data = load_json(fpath)
-        return set(data.get("resolved", [])) if data else set()
+    return real_results_index(real_results_dir).resolved(agent_name, store)
+
+def analyze_llm_group(store, llm, filenames, gold_files, none_files):
+    print(f"\n{'='*80}")
+    print(f"CORRELATION ANALYSIS: TestGen LLM = {llm}")
+    print(f"{'='*80}")
+    
+    group = load_llm_group(store, llm, filenames, gold_files, none_files)
+    if group is None:
+        print("  [SKIPPING] Missing baseline.")
+        return None
+        
+    print(f"  Validating against Real Results for {len(filenames)} agents...")
+    report_correlation(group)
+    return report_threshold_sweep(group)
+
+def correlation_sweep(group, real_results_dir=None):
+    """
+    (agent names, ThresholdSweep) for the group's agents that have real results.
+    Only instances with meaningful tests are scored: without tests we can't predict anything.
+    Computed once per group and real-results dir, so every report shares it.
+    """
+    key = ("correlation_sweep", real_results_dir)
+    if key not in group.derived:
+        group.derived[key] = _correlation_sweep(group, real_results_dir)
+    return group.derived[key]
+
+def _correlation_sweep(group, real_results_dir):
+    _, agents, fractions = solved_fractions(group)
+    instances = group.matrix.instances
+    names, rows, labels = [], [], []
+    for agent_name, row in zip(agents, fractions):
+        real_resolved_set = load_real_results(agent_name, real_results_dir, group.store)
+        if real_resolved_set is None:
+            continue
+        names.append(agent_name)
+        rows.append(row)
+        labels.append([inst in real_resolved_set for inst in instances])
+    return names, ThresholdSweep.compute(rows, labels, threshold_grid(fractions))
+
+@profiling.profiled()
+def report_correlation(group, real_results_dir=None):
+    """Precision/recall of 'passes a meaningful generated test' against real resolution."""
+    llm = group.llm
+    names, sweep = correlation_sweep(group, real_results_dir)
+
+    # "Pass" = solved AT LEAST ONE meaningful test; report_threshold_sweep compares every
+    # other cut-off, up to solving ALL of them
+    loose = sweep.index_of("any")
+    agent_stats = []
+    for row, agent_name in enumerate(names):
+        stats = sweep.metrics(row, loose)
+        stats["Agent"] = agent_name
+        agent_stats.append(stats)
+
+    # Sort by F1
+    agent_stats.sort(key=lambda x: x["F1"], reverse=True)
+    
+    print("\n  [CORRELATION METRICS]")
+    print("  Can Generated Tests predict Real Success?")
+    print(f"  {'Agent':<40} | {'Prec':<6} | {'Recall':<6} | {'F1':<6} | {'FP (False Hope)':<15} | {'FN (Missed)':<10}")
+    print("  " + "-"*100)
     
-    # Fuzzy match if needed (e.g. Lingxi names might differ slightly)
-    # The user filenames in filtered_results seem to match the "Agent" part of our split.
-    # Check listing
-    try:
-        candidates = os.listdir(REAL_RESULTS_DIR)
-        for c in candidates:
-            if agent_name in c:
-                 data = load_json(os.path.join(REAL_RESULTS_DIR, c))
-                 return set(data.get("resolved", [])) if data else set()
-    except Exception:
-        pass
+    for s in agent_stats:
+        print(f"  {s['Agent']:<40} | {s['Prec']:.2f}   | {s['Recall']:.2f}   | {s['F1']:.2f}   | {s['FP']:<15} | {s['FN']:<10}")
         
-    return None
+    # Aggregate
+    total = sweep.pooled().metrics(0, loose)
+    agg_prec = total["Prec"]
+    agg_rec = total["Recall"]
+    print("-" * 100)
+    print(f"  AGGREGATE for {llm}: Precision={agg_prec:.2f}, Recall={agg_rec:.2f}")
+    
+    if agg_prec < 0.5:
+        print("  [INSIGHT] Low Precision: Generated tests are too easy or pass when the real issue isn't fixed.")
+    if agg_rec < 0.5:
+        print("  [INSIGHT] Low Recall: Generated tests are too hard/strict OR we didn't generate tests for enough instances.")
+
+def _fmt_auc(value):
+    return f"{value:.3f}" if value is not None else "n/a"
+
+@profiling.profiled()
+def report_threshold_sweep(group, real_results_dir=None):
+    """
+    Pass criterion "solved >= t of an instance's meaningful tests", swept over
+    every distinct solved fraction. Returns the curves as JSON-ready data.
+    """
+    names, sweep = correlation_sweep(group, real_results_dir)
+    pooled = sweep.pooled()
+    loose, strict = sweep.index_of("any"), sweep.index_of("all")
+    best = pooled.best_index(0)
+
+    print("\n  [THRESHOLD SWEEP] Pass = solved fraction of the instance's meaningful tests >= t")
+    print(f"  {'t':<6} | {'TP':<5} | {'FP':<5} | {'FN':<5} | {'TN':<5} | {'Prec':<6} | {'Recall':<6} | {'F1':<6} | {'FPR':<6} |")
+    print("  " + "-"*80)
+    for k, t in enumerate(sweep.thresholds):
+        m = pooled.metrics(0, k)
+        notes = []
+        if k == loose:
+            notes.append("any")
+        if k == strict:
+            notes.append("all")
+        if k == best:
+            notes.append("best F1")
+        print(f"  {t:<6.3f} | {m['TP']:<5} | {m['FP']:<5} | {m['FN']:<5} | {m['TN']:<5} | "
+              f"{m['Prec']:.2f}   | {m['Recall']:.2f}   | {m['F1']:.2f}   | {m['FPR']:.2f}   | {', '.join(notes)}")
+    print(f"  Pooled ROC AUC={_fmt_auc(pooled.roc_auc(0))}, Average Precision={_fmt_auc(pooled.average_precision(0))}")
 
-def analyze_correlation():
+    print(f"\n  {'Agent':<40} | {'Best t':<6} | {'F1@best':<7} | {'F1@any':<6} | {'F1@all':<6} | {'ROC AUC':<7} | {'AP':<5}")
+    print("  " + "-"*100)
+    for row, agent_name in enumerate(names):
+        k = sweep.best_index(row)
+        print(f"  {agent_name:<40} | {sweep.thresholds[k]:<6.3f} | {sweep.metrics(row, k)['F1']:<7.2f} | "
+              f"{sweep.metrics(row, loose)['F1']:<6.2f} | {sweep.metrics(row, strict)['F1']:<6.2f} | "
+              f"{_fmt_auc(sweep.roc_auc(row)):<7} | {_fmt_auc(sweep.average_precision(row)):<5}")
+
+    curves = sweep.to_json(names)
+    curves["pooled"] = pooled.to_json(["all agents"])["rows"]["all agents"]
+    return curves
+
+@profiling.profiled()
+def analyze_correlation(curves_path=None):
     print(f"Generated Results: {ACTIVE_GEN_DIR}")
     print(f"Real Results:      {REAL_RESULTS_DIR}")
     
-    gen_files = [f for f in os.listdir(ACTIVE_GEN_DIR) if f.endswith(".json")]
+    store = load_store(ACTIVE_GEN_DIR)
     
     # 1. Group by LLM
-    files_by_llm = defaultdict(list)
-    gold_files = {}
-    none_files = {}
-    
-    for f in gen_files:
-        agent, llm = parse_filename(f)
-        if agent == "GOLD":
-            gold_files[llm] = f
-        elif agent == "NONE":
-            none_files[llm] = f
-        else:
-            files_by_llm[llm].append(f)
-
-    for llm in files_by_llm:
-        print(f"\n{'='*80}")
-        print(f"CORRELATION ANALYSIS: TestGen LLM = {llm}")
-        print(f"{'='*80}")
-        
-        # Match baseline
-        matched_gold_key = None
-        for k in gold_files:
-            if k in llm or llm in k:
-                matched_gold_key = k
-                break
-        matched_none_key = None
-        for k in none_files:
-            if k in llm or llm in k:
-                matched_none_key = k
-                break
-                
-        if not matched_gold_key or not matched_none_key:
-            print("  [SKIPPING] Missing baseline.")
-            continue
-            
-        gold_data = load_json(os.path.join(ACTIVE_GEN_DIR, gold_files[matched_gold_key]))
-        none_data = load_json(os.path.join(ACTIVE_GEN_DIR, none_files[matched_none_key]))
-        meaningful_map = get_meaningful_tests(gold_data, none_data)
-        
-        print(f"  Validating against Real Results for {len(files_by_llm[llm])} agents...")
-        
-        # Aggregate stats
-        total_tp = 0
-        total_fp = 0
-        total_fn = 0
-        total_tn = 0
-        
-        # Per-agent stats
-        agent_stats = []
-        
-        for filename in files_by_llm[llm]:
-            agent_name, _ = parse_filename(filename)
-            
-            # Load Generated Results
-            gen_data = load_json(os.path.join(ACTIVE_GEN_DIR, filename))
-            if not gen_data: continue
-            
-            # Load Real Results
-            real_resolved_set = load_real_results(agent_name)
-            if real_resolved_set is None:
-                # print(f"  [WARN] No real results found for agent '{agent_name}'. Skipping.")
-                continue
-                
-            # Compare for each Instance in Meaningful Map
-            # We ONLY care about instances where we HAVE generated meaningful tests.
-            # If we don't have tests for an instance, we can't predict anything.
-            
-            tp = 0 # Predicted Pass (Gen) & Actual Pass (Real)
-            fp = 0 # Predicted Pass (Gen) & Actual Fail (Real) -> "False Hope"
-            fn = 0 # Predicted Fail (Gen) & Actual Pass (Real) -> "Tests too strict"
-            tn = 0 # Predicted Fail (Gen) & Actual Fail (Real)
-            
-            for inst, needed_tests in meaningful_map.items():
-                # Did Agent Pass Generated Tests?
-                # Definition of "Pass Generated": Solved ALL meaningful tests? Or AT LEAST ONE?
-                # Usually "Pass" means solving the issue. If tests are unit tests, maybe "All" is better.
-                # However, earlier we saw agents solving 196/197 instances.
-                # Let's say: If agent solves AT LEAST ONE meaningful test => We predict "PASS".
-                # (You can swap this to "ALL" if the tests are atomic requirements)
-                
-                agent_resolved_tests = set(gen_data.get(inst, {}).get("details", {}).get("resolved", []))
-                meaningful_hits = agent_resolved_tests & needed_tests
-                
-                predicted_pass = len(meaningful_hits) > 0 # Loose criteria
-                # predicted_pass = len(meaningful_hits) == len(needed_tests) # Strict criteria
-                
-                actual_pass = inst in real_resolved_set
-                
-                if predicted_pass and actual_pass:
-                    tp += 1
-                elif predicted_pass and not actual_pass:
-                    fp += 1
-                elif not predicted_pass and actual_pass:
-                    fn += 1
-                elif not predicted_pass and not actual_pass:
-                    tn += 1
-            
-            # Calculate agent metrics
-            precision = tp / (tp + fp) if (tp + fp) > 0 else 0
-            recall = tp / (tp + fn) if (tp + fn) > 0 else 0
-            f1 = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
-            
-            agent_stats.append({
-                "Agent": agent_name,
-                "Prec": precision,
-                "Recall": recall,
-                "F1": f1,
-                "TP": tp, "FP": fp, "FN": fn
-            })
-            
-            total_tp += tp
-            total_fp += fp
-            total_fn += fn
-            total_tn += tn
-
-        # Sort by F1
-        agent_stats.sort(key=lambda x: x["F1"], reverse=True)
-        
-        print("\n  [CORRELATION METRICS]")
-        print("  Can Generated Tests predict Real Success?")
-        print(f"  {'Agent':<40} | {'Prec':<6} | {'Recall':<6} | {'F1':<6} | {'FP (False Hope)':<15} | {'FN (Missed)':<10}")
-        print("  " + "-"*100)
-        
-        for s in agent_stats:
-            print(f"  {s['Agent']:<40} | {s['Prec']:.2f}   | {s['Recall']:.2f}   | {s['F1']:.2f}   | {s['FP']:<15} | {s['FN']:<10}")
-            
-        # Aggregate
-        agg_prec = total_tp / (total_tp + total_fp) if (total_tp + total_fp) > 0 else 0
-        agg_rec = total_tp / (total_tp + total_fn) if (total_tp + total_fn) > 0 else 0
-        print("-" * 100)
-        print(f"  AGGREGATE for {llm}: Precision={agg_prec:.2f}, Recall={agg_rec:.2f}")
-        
-        if agg_prec < 0.5:
-            print("  [INSIGHT] Low Precision: Generated tests are too easy or pass when the real issue isn't fixed.")
-        if agg_rec < 0.5:
-            print("  [INSIGHT] Low Recall: Generated tests are too hard/strict OR we didn't generate tests for enough instances.")
+    files_by_llm, gold_files, none_files = scan_results_dir(ACTIVE_GEN_DIR)
+
+    llms = list(files_by_llm)
+    curves = run_groups(analyze_llm_group, [
+        (store, llm, files_by_llm[llm], gold_files, none_files)
+        for llm in llms
+    ])
+
+    if curves_path:
+        with open(curves_path, "w", encoding="utf-8") as f:
+            json.dump({llm: c for llm, c in zip(llms, curves) if c is not None}, f, indent=2)
+        print(f"\nThreshold sweep curves written to {curves_path}")
 
 if __name__ == "__main__":
-    analyze_correlation()
+    parser = argparse.ArgumentParser(description="Correlate generated-test results with real SWE-bench resolution.")
+    parser.add_argument("--curves", help="Also write per-group confusion counts and ROC/PR curves to this JSON file.")
+    args = parser.parse_args()
+    analyze_correlation(args.curves)
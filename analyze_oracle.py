@@ -1,7 +1,10 @@
-import json
 import os
 import re
-from collections import defaultdict
+
+from group_runner import run_groups
+from llm_group import load_llm_group
+import profiling
+from results_store import load_store, scan_results_dir
 
 # Use the same results directory as before (adjust if user moved things)
 RESULTS_DIR = r"c:\Users\naolt\Downloads\class projects\dkang\results\run_result"
@@ -17,227 +20,125 @@ def get_results_dir():
 
 ACTIVE_RESULTS_DIR = get_results_dir()
 
-def load_json(filepath):
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error reading {filepath}: {e}")
-        return None
-
-def parse_filename(filename):
-    """
-    Parses the filename to extract Agent Name and TestGen LLM.
-    """
-    name_no_ext = os.path.splitext(filename)[0]
+def analyze_llm_group(store, llm, filenames, gold_files, none_files):
+    print(f"\n{'='*80}")
+    print(f"ORACLE ANALYSIS: TestGen LLM = {llm}")
+    print(f"{'='*80}")
     
-    if name_no_ext.startswith("gold_"):
-        return "GOLD", name_no_ext.replace("gold_", "")
-    if name_no_ext.startswith("none_"):
-        return "NONE", name_no_ext.replace("none_", "")
+    group = load_llm_group(store, llm, filenames, gold_files, none_files)
+    if group is None:
+        print(f"  [SKIPPING] Missing Gold/None baselines for {llm}")
+        return
+
+    print(f"  Total Meaningful Tests Avail: {group.total_meaningful}")
     
-    parts = name_no_ext.split("__")
-    if len(parts) == 2:
-        return parts[0], parts[1]
+    # Agent x meaningful-test bitset matrix for this group
+    print(f"  Loading {len(filenames)} agents...")
+    if not group.matrix.agents:
+        print("  No agent data found.")
+        return
+
+    report_oracle(group)
+    report_ensemble(group)
+
+def best_single_agent(group):
+    """(agent index, score) of the agent solving the most meaningful tests; first wins ties."""
+    scores = [group.matrix.count(row) for row in group.matrix.rows]
+    best_single_score = max(scores)
+    return scores.index(best_single_score), best_single_score
+
+def oracle_score(group):
+    # For each instance, we want to choose the agent that solved the MOST meaningful tests
+    # Oracle Score = Sum(Max(len(resolved) for agents))
+    return sum(max(col) for col in zip(*group.counts))
+
+@profiling.profiled()
+def report_oracle(group):
+    """Best single agent vs. picking the best agent per instance."""
+    total_possible_meaningful = group.total_meaningful
+    agents = group.matrix.agents
+
+    # --- METRIC 1: Best Single Agent ---
+    best_idx, best_single_score = best_single_agent(group)
+    best_single_agent_name = agents[best_idx]
     
-    return name_no_ext, "Unknown"
-
-def get_meaningful_tests(gold_data, none_data):
-    """
-    Identifies 'meaningful' tests for each instance.
-    Meaningful Test = (Resolved in Gold) - (Resolved in None)
-    Returns a dict: { instance_id: set(meaningful_test_names) }
-    """
-    meaningful_map = {}
+    print(f"\n  [BEST SINGLE AGENT]")
+    print(f"    Agent: {best_single_agent_name}")
+    print(f"    Score: {best_single_score} / {total_possible_meaningful}")
+    print(f"    %:     {best_single_score/total_possible_meaningful*100:.2f}%")
     
-    all_instances = set(gold_data.keys()) | set(none_data.keys())
+    # --- METRIC 2: Oracle (Select Best Agent Per Instance) ---
+    oracle = oracle_score(group)
+
+    print(f"\n  [ORACLE - BEST AGENT PER INSTANCE]")
+    print(f"    Oracle Score: {oracle} / {total_possible_meaningful}")
+    print(f"    %:            {oracle/total_possible_meaningful*100:.2f}%")
+    print(f"    Gain vs Best: +{oracle - best_single_score} tests")
+
+@profiling.profiled()
+def report_ensemble(group):
+    """Union of all agents vs. the oracle, plus the specialists behind the gap."""
+    matrix = group.matrix
+    agents = matrix.agents
+    counts = group.counts
+    best_idx, _ = best_single_agent(group)
+    best_single_agent_name = agents[best_idx]
+    oracle = oracle_score(group)
+
+    # --- METRIC 3: Perfect Ensemble (Union of all agents) ---
+    # If we could combine partial solutions from multiple agents on the same instance
+    # Ensemble Score = Sum(len(Union(resolved) for agents))
     
-    for instance_id in all_instances:
-        gold_resolved = set(gold_data.get(instance_id, {}).get("details", {}).get("resolved", []))
-        none_resolved = set(none_data.get(instance_id, {}).get("details", {}).get("resolved", []))
+    ensemble_score = matrix.count(matrix.union())
+    
+    # A test T is uniquely covered by Agent A if A solved T and no one else did
+    _, unique_mask = group.difficulty_masks()
+    specialist_contributions = [] # (first unique bit, agent idx, count)
+    for a, row in enumerate(matrix.rows):
+        mine = row & unique_mask
+        if mine:
+            specialist_contributions.append(((mine & -mine).bit_length(), a, matrix.count(mine)))
+    
+    print(f"\n  [PERFECT ENSEMBLE - UNION OF ALL AGENTS]")
+    print(f"    Ensemble Score: {ensemble_score}")
+    print(f"    Gain vs Oracle: +{ensemble_score - oracle} tests (tests missed by 'best agent' but caught by another)")
+    
+    # --- METRIC 4: Specialist Analysis ---
+    # Which agents are "Specialists"? 
+    # Agents contributing to the Oracle/Ensemble on instances where the "Best Single Agent" failed or underperformed.
+    
+    best_counts = counts[best_idx]
+    
+    # Difficult Instances: Instances where Best Single Agent got 0, but SOMEONE got > 0
+    difficult_wins = [] # (first winning instance idx, agent idx, boost)
+    
+    for a, agent_counts in enumerate(counts):
+        if a == best_idx: continue
         
-        meaningful = gold_resolved - none_resolved
-        if meaningful:
-            meaningful_map[instance_id] = meaningful
-            
-    return meaningful_map
+        # Instances where this agent beat the best agent
+        gains = [(i, c - b) for i, (c, b) in enumerate(zip(agent_counts, best_counts)) if c > b]
+        if gains:
+            difficult_wins.append((gains[0][0], a, sum(g for _, g in gains)))
+    
+    print(f"\n  [SPECIALIST ANALYSIS]")
+    print(f"    Agents that outperformed {best_single_agent_name} on specific instances:")
+    for _, a, boost in sorted(difficult_wins, key=lambda x: (-x[2], x[0], x[1])):
+        print(f"      {agents[a]}: +{boost} tests gained")
+        
+    print(f"\n    Agents with Unique Solves (Global):")
+    for _, a, count in sorted(specialist_contributions, key=lambda x: (-x[2], x[0], x[1])):
+        print(f"      {agents[a]}: {count} unique tests")
 
+@profiling.profiled()
 def analyze_oracle():
     print(f"Reading from: {ACTIVE_RESULTS_DIR}")
-    files = [f for f in os.listdir(ACTIVE_RESULTS_DIR) if f.endswith(".json")]
-    
-    files_by_llm = defaultdict(list)
-    gold_files = {}
-    none_files = {}
-    
-    for f in files:
-        agent, llm = parse_filename(f)
-        if agent == "GOLD":
-            gold_files[llm] = f
-        elif agent == "NONE":
-            none_files[llm] = f
-        else:
-            files_by_llm[llm].append(f)
-
-    for llm in files_by_llm:
-        print(f"\n{'='*80}")
-        print(f"ORACLE ANALYSIS: TestGen LLM = {llm}")
-        print(f"{'='*80}")
-        
-        # Match baseline files
-        matched_gold_key = None
-        for k in gold_files:
-            if k in llm or llm in k:
-                matched_gold_key = k
-                break
-        
-        matched_none_key = None
-        for k in none_files:
-            if k in llm or llm in k:
-                matched_none_key = k
-                break
-        
-        if not matched_gold_key or not matched_none_key:
-            print(f"  [SKIPPING] Missing Gold/None baselines for {llm}")
-            continue
+    store = load_store(ACTIVE_RESULTS_DIR)
+    files_by_llm, gold_files, none_files = scan_results_dir(ACTIVE_RESULTS_DIR)
 
-        gold_data = load_json(os.path.join(ACTIVE_RESULTS_DIR, gold_files[matched_gold_key]))
-        none_data = load_json(os.path.join(ACTIVE_RESULTS_DIR, none_files[matched_none_key]))
-        
-        meaningful_map = get_meaningful_tests(gold_data, none_data)
-        total_possible_meaningful = sum(len(t) for t in meaningful_map.values())
-        print(f"  Total Meaningful Tests Avail: {total_possible_meaningful}")
-        
-        # Load all agent data for this group
-        agents_data = {} # {agent_name: {instance_id: set(resolved_tests)}}
-        
-        print(f"  Loading {len(files_by_llm[llm])} agents...")
-        for filename in files_by_llm[llm]:
-            agent_name, _ = parse_filename(filename)
-            fpath = os.path.join(ACTIVE_RESULTS_DIR, filename)
-            data = load_json(fpath)
-            if not data: continue
-            
-            # Pre-process resolved sets for efficiency
-            # Only keep resolved tests that are 'meaningful'
-            processed_agent_data = {}
-            for inst, needed in meaningful_map.items():
-                resolved = set(data.get(inst, {}).get("details", {}).get("resolved", []))
-                # Intersection with meaningful
-                meaningful_resolved = resolved & needed
-                if meaningful_resolved:
-                    processed_agent_data[inst] = meaningful_resolved
-            
-            agents_data[agent_name] = processed_agent_data
-
-        if not agents_data:
-            print("  No agent data found.")
-            continue
-
-        # --- METRIC 1: Best Single Agent ---
-        best_single_agent = None
-        best_single_score = -1
-        
-        for agent, data in agents_data.items():
-            # Sum of len of resolved sets
-            score = sum(len(s) for s in data.values())
-            if score > best_single_score:
-                best_single_score = score
-                best_single_agent = agent
-        
-        print(f"\n  [BEST SINGLE AGENT]")
-        print(f"    Agent: {best_single_agent}")
-        print(f"    Score: {best_single_score} / {total_possible_meaningful}")
-        print(f"    %:     {best_single_score/total_possible_meaningful*100:.2f}%")
-        
-        # --- METRIC 2: Oracle (Select Best Agent Per Instance) ---
-        # For each instance, we want to choose the agent that solved the MOST meaningful tests
-        # Oracle Score = Sum(Max(len(resolved) for agents))
-        
-        oracle_score = 0
-        instance_best_agents = defaultdict(list)
-        
-        for inst in meaningful_map:
-            max_resolved_for_inst = 0
-            best_agents_for_inst = []
-            
-            for agent, data in agents_data.items():
-                resolved_count = len(data.get(inst, set()))
-                if resolved_count > max_resolved_for_inst:
-                    max_resolved_for_inst = resolved_count
-                    best_agents_for_inst = [agent]
-                elif resolved_count == max_resolved_for_inst and resolved_count > 0:
-                    best_agents_for_inst.append(agent)
-            
-            oracle_score += max_resolved_for_inst
-            for ag in best_agents_for_inst:
-                instance_best_agents[ag].append(inst)
-
-        print(f"\n  [ORACLE - BEST AGENT PER INSTANCE]")
-        print(f"    Oracle Score: {oracle_score} / {total_possible_meaningful}")
-        print(f"    %:            {oracle_score/total_possible_meaningful*100:.2f}%")
-        print(f"    Gain vs Best: +{oracle_score - best_single_score} tests")
-
-        # --- METRIC 3: Perfect Ensemble (Union of all agents) ---
-        # If we could combine partial solutions from multiple agents on the same instance
-        # Ensemble Score = Sum(len(Union(resolved) for agents))
-        
-        ensemble_score = 0
-        specialist_contributions = defaultdict(int) # tests uniquely contributed to the ensemble by an agent
-        
-        for inst in meaningful_map:
-            union_resolved = set()
-            for data in agents_data.values():
-                if inst in data:
-                    union_resolved.update(data[inst])
-            
-            ensemble_score += len(union_resolved)
-            
-            # Identify who contributed uniquely to this union?
-            # A test T is uniquely covered by Agent A if A solved T and no one else did
-            for test in union_resolved:
-                solvers = []
-                for agent, data in agents_data.items():
-                    if inst in data and test in data[inst]:
-                        solvers.append(agent)
-                
-                if len(solvers) == 1:
-                    specialist_contributions[solvers[0]] += 1
-        
-        print(f"\n  [PERFECT ENSEMBLE - UNION OF ALL AGENTS]")
-        print(f"    Ensemble Score: {ensemble_score}")
-        print(f"    Gain vs Oracle: +{ensemble_score - oracle_score} tests (tests missed by 'best agent' but caught by another)")
-        
-        # --- METRIC 4: Specialist Analysis ---
-        # Which agents are "Specialists"? 
-        # Agents contributing to the Oracle/Ensemble on instances where the "Best Single Agent" failed or underperformed.
-        
-        best_agent_data = agents_data.get(best_single_agent, {})
-        
-        # Difficult Instances: Instances where Best Single Agent got 0, but SOMEONE got > 0
-        difficult_wins = defaultdict(int) 
-        
-        for inst, needed in meaningful_map.items():
-            best_agent_score = len(best_agent_data.get(inst, set()))
-            
-            # Find agents who beat the best agent here
-            for agent, data in agents_data.items():
-                if agent == best_single_agent: continue
-                
-                agent_score = len(data.get(inst, set()))
-                if agent_score > best_agent_score:
-                    difficult_wins[agent] += (agent_score - best_agent_score)
-        
-        print(f"\n  [SPECIALIST ANALYSIS]")
-        print(f"    Agents that outperformed {best_single_agent} on specific instances:")
-        sorted_diff = sorted(difficult_wins.items(), key=lambda x: x[1], reverse=True)
-        for ag, boost in sorted_diff:
-            print(f"      {ag}: +{boost} tests gained")
-            
-        print(f"\n    Agents with Unique Solves (Global):")
-        sorted_unique = sorted(specialist_contributions.items(), key=lambda x: x[1], reverse=True)
-        for ag, count in sorted_unique:
-            print(f"      {ag}: {count} unique tests")
+    run_groups(analyze_llm_group, [
+        (store, llm, files_by_llm[llm], gold_files, none_files)
+        for llm in files_by_llm
+    ])
 
 if __name__ == "__main__":
     analyze_oracle()
@@ -1,212 +1,150 @@
-import json
-import os
 import re
 from collections import defaultdict
 
+from group_runner import run_groups
+from llm_group import load_llm_group
+import profiling
+from results_store import load_store, scan_results_dir
+
 RESULTS_DIR = r"c:\Users\naolt\Downloads\class projects\dkang\results\run_result"
 
-def load_json(filepath):
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error reading {filepath}: {e}")
-        return None
-
-def parse_filename(filename):
-    """
-    Parses the filename to extract Agent Name and TestGen LLM.
-    Handles 'gold_' and 'none_' special cases.
-    """
-    name_no_ext = os.path.splitext(filename)[0]
+def analyze_llm_group(store, llm, filenames, gold_files, none_files):
+    print(f"\n{'='*80}")
+    print(f"ANALYSIS GROUP: Test Generation LLM = {llm}")
+    print(f"{'='*80}")
+
+    # Try to find matching gold/none files
+    # The LLM string in 'gold_<llm>' might slightly differ from 'Agent__<llm>' 
+    # e.g., gold_gpt-5.1 vs Agent__gpt-5.1-500-1. 
+    # We need a robust matching strategy.
     
-    if name_no_ext.startswith("gold_"):
-        return "GOLD", name_no_ext.replace("gold_", "")
-    if name_no_ext.startswith("none_"):
-        return "NONE", name_no_ext.replace("none_", "")
+    # Heuristic: Check if the LLM string from the agent filename starts with the gold filename's LLM string or vice versa
+    # actually looking at the file list:
+    # gold_gpt-5.1.json
+    # JoyCode__gpt-5.1-500-1.json
+    # It seems 'gpt-5.1' is a substring of 'gpt-5.1-500-1'.
     
-    # Pattern: [Agent]__[LLM]
-    # We need to be careful as Agent or LLM might contain underscores or other separators.
-    # Based on file list: "JoyCode__gpt-5.1-500-1.json" -> Agent: JoyCode, LLM: gpt-5.1-500-1
-    parts = name_no_ext.split("__")
-    if len(parts) == 2:
-        return parts[0], parts[1]
+    group = load_llm_group(store, llm, filenames, gold_files, none_files)
+    if group is None:
+        print(f"  [WARNING] Baseline files (Gold/None) missing for LLM '{llm}'. Skipping meaningful diffs.")
+        print(f"  Expected matching keys for Gold: {list(gold_files.keys())}, None: {list(none_files.keys())}")
+        return
+
+    print(f"  Using Baseline: Gold='{group.gold_file}' | None='{group.none_file}'")
+    report_meaningful_counts(group)
+
+@profiling.profiled()
+def report_meaningful_counts(group):
+    """Per-agent meaningful/raw resolved counts and unique solves for one group."""
+    store = group.store
+    meaningful_tests_map = group.meaningful_map
+    meaningful_bits = group.meaningful_bits
     
-    # Fallback for complex names if standard split fails, or return as is
-    return name_no_ext, "Unknown"
-
-def get_meaningful_tests(gold_data, none_data):
-    """
-    Identifies 'meaningful' tests for each instance.
-    Meaningful Test = (Resolved in Gold) - (Resolved in None)
-    Returns a dict: { instance_id: set(meaningful_test_names) }
-    """
-    meaningful_map = {}
+    total_meaningful_instances = len(meaningful_tests_map)
+    total_meaningful_tests_count = group.total_meaningful
     
-    all_instances = set(gold_data.keys()) | set(none_data.keys())
+    print(f"  Total Instances with Meaningful Tests: {total_meaningful_instances}")
+    print(f"  Total Meaningful Tests (Gold Resolved - None Resolved): {total_meaningful_tests_count}")
+    print("-" * 80)
     
-    for instance_id in all_instances:
-        gold_resolved = set(gold_data.get(instance_id, {}).get("details", {}).get("resolved", []))
-        none_resolved = set(none_data.get(instance_id, {}).get("details", {}).get("resolved", []))
-        
-        # Meaningful = Gold resolved BUT None failed (or didn't resolve)
-        meaningful = gold_resolved - none_resolved
-        if meaningful:
-            meaningful_map[instance_id] = meaningful
-            
-    return meaningful_map
-
-def analyze_results():
-    files = [f for f in os.listdir(RESULTS_DIR) if f.endswith(".json")]
-    
-    # 1. Group files by LLM to find pairs
-    files_by_llm = defaultdict(list)
-    gold_files = {}
-    none_files = {}
+    # Store agent stats
+    agent_stats = []
     
-    # Pre-scan to identify Gold/None baselines
-    for f in files:
-        agent, llm = parse_filename(f)
-        if agent == "GOLD":
-            gold_files[llm] = f
-        elif agent == "NONE":
-            none_files[llm] = f
-        else:
-            files_by_llm[llm].append(f)
+    # Track unique solves: {instance_id: (solved by >= 1 agent, solved by >= 2 agents)} bitmaps
+    unique_solver_tracker = {}
+    agent_solved = []  # (agent_name, {instance_id: solved bitmap})
 
-    # 2. Analyze per LLM group
-    for llm in files_by_llm:
-        print(f"\n{'='*80}")
-        print(f"ANALYSIS GROUP: Test Generation LLM = {llm}")
-        print(f"{'='*80}")
-
-        # Try to find matching gold/none files
-        # The LLM string in 'gold_<llm>' might slightly differ from 'Agent__<llm>' 
-        # e.g., gold_gpt-5.1 vs Agent__gpt-5.1-500-1. 
-        # We need a robust matching strategy.
-        
-        # Heuristic: Check if the LLM string from the agent filename starts with the gold filename's LLM string or vice versa
-        # actually looking at the file list:
-        # gold_gpt-5.1.json
-        # JoyCode__gpt-5.1-500-1.json
-        # It seems 'gpt-5.1' is a substring of 'gpt-5.1-500-1'.
-        
-        matched_gold_key = None
-        for k in gold_files:
-            if k in llm or llm in k:
-                matched_gold_key = k
-                break
-        
-        matched_none_key = None
-        for k in none_files:
-            if k in llm or llm in k:
-                matched_none_key = k
-                break
-        
-        if not matched_gold_key or not matched_none_key:
-            print(f"  [WARNING] Baseline files (Gold/None) missing for LLM '{llm}'. Skipping meaningful diffs.")
-            print(f"  Expected matching keys for Gold: {list(gold_files.keys())}, None: {list(none_files.keys())}")
+    for agent_name, filename in group.agent_files:
+        if not store.has(filename):
             continue
+        agent_resolved_map = group.resolved_bits(filename)
 
-        print(f"  Using Baseline: Gold='{gold_files[matched_gold_key]}' | None='{none_files[matched_none_key]}'")
-        
-        gold_data = load_json(os.path.join(RESULTS_DIR, gold_files[matched_gold_key]))
-        none_data = load_json(os.path.join(RESULTS_DIR, none_files[matched_none_key]))
-        
-        meaningful_tests_map = get_meaningful_tests(gold_data, none_data)
-        
-        total_meaningful_instances = len(meaningful_tests_map)
-        total_meaningful_tests_count = sum(len(tests) for tests in meaningful_tests_map.values())
-        
-        print(f"  Total Instances with Meaningful Tests: {total_meaningful_instances}")
-        print(f"  Total Meaningful Tests (Gold Resolved - None Resolved): {total_meaningful_tests_count}")
-        print("-" * 80)
+        resolved_meaningful_count = 0
+        resolved_meaningful_instances_count = 0
+        solved_map = {}
         
-        # Store agent stats
-        agent_stats = []
-        
-        # Track unique solves: {instance_id: {test_name: [list of agents who solved it]}}
-        unique_solver_tracker = defaultdict(lambda: defaultdict(list))
-
-        for filename in files_by_llm[llm]:
-            agent_name, _ = parse_filename(filename)
-            filepath = os.path.join(RESULTS_DIR, filename)
-            data = load_json(filepath)
+        for instance_id, needed_tests in meaningful_bits.items():
+            agent_resolved = agent_resolved_map.get(instance_id, 0)
             
-            if not data:
-                continue
-
-            resolved_meaningful_count = 0
-            resolved_meaningful_instances_count = 0
+            # Check which meaningful tests this agent resolved
+            solved_here = needed_tests & agent_resolved
+            resolved_meaningful_count += solved_here.bit_count()
             
-            for instance_id, needed_tests in meaningful_tests_map.items():
-                agent_resolved = set(data.get(instance_id, {}).get("details", {}).get("resolved", []))
-                
-                # Check which meaningful tests this agent resolved
-                solved_here = needed_tests.intersection(agent_resolved)
-                resolved_meaningful_count += len(solved_here)
-                
-                if len(solved_here) > 0:
-                    resolved_meaningful_instances_count += 1
+            if solved_here:
+                resolved_meaningful_instances_count += 1
+                solved_map[instance_id] = solved_here
                 
                 # Track for unique solver analysis
-                for t in solved_here:
-                    unique_solver_tracker[instance_id][t].append(agent_name)
-
-            # Metadata stats
-            total_resolved_raw = 0
-            for k, v in data.items():
-                total_resolved_raw += v.get("n_resolved_tests", 0)
-
-            stats = {
-                "Agent": agent_name,
-                "Total Resolved (Raw)": total_resolved_raw,
-                "Meaningful Resolved": resolved_meaningful_count,
-                "Meaningful Instances": resolved_meaningful_instances_count,
-                "Percentage Meaningful": (resolved_meaningful_count / total_meaningful_tests_count * 100) if total_meaningful_tests_count > 0 else 0.0
-            }
-            agent_stats.append(stats)
-
-        # Sort by Meaningful Resolved Descending
-        agent_stats.sort(key=lambda x: x["Meaningful Resolved"], reverse=True)
-
-        # Print Table
-        headers = ["Agent", "Mean. Tests", "% Tests", "Mean. Inst.", "Total Raw"]
-        row_format = "{:<40} | {:<12} | {:<10} | {:<12} | {:<10}"
-        
-        print(row_format.format(*headers))
-        print("-" * 105)
-        for stat in agent_stats:
-            print(row_format.format(
-                stat["Agent"], 
-                stat["Meaningful Resolved"], 
-                f"{stat['Percentage Meaningful']:.2f}%",
-                f"{stat['Meaningful Instances']}/{total_meaningful_instances}",
-                stat["Total Resolved (Raw)"]
-            ))
-
-        # --- UNIQUE SOLVES ANALYSIS ---
-        print("\n  [UNIQUE SOLVES ANALYSIS]")
-        print("  Meaningful tests solved by ONLY ONE agent in this group:")
-        
-        unique_counts = defaultdict(int) 
-        
-        found_any_unique = False
-        for instance_id, tests_map in unique_solver_tracker.items():
-            for test_name, solvers in tests_map.items():
-                if len(solvers) == 1:
-                    found_any_unique = True
-                    solo_agent = solvers[0]
-                    unique_counts[solo_agent] += 1
-                    # Optional: Print detailed unique solves (can be verbose)
-                    # print(f"    {solo_agent} resolved {instance_id}::{test_name}")
-
-        if not found_any_unique:
-            print("    None found.")
-        else:
-            sorted_uniques = sorted(unique_counts.items(), key=lambda x: x[1], reverse=True)
-            for agent, count in sorted_uniques:
-                print(f"    {agent}: {count} unique solves")
+                once, twice = unique_solver_tracker.get(instance_id, (0, 0))
+                unique_solver_tracker[instance_id] = (once | solved_here, twice | (once & solved_here))
+        agent_solved.append((agent_name, solved_map))
+
+        # Metadata stats
+        total_resolved_raw = sum(store.n_resolved(filename).values())
+
+        stats = {
+            "Agent": agent_name,
+            "Total Resolved (Raw)": total_resolved_raw,
+            "Meaningful Resolved": resolved_meaningful_count,
+            "Meaningful Instances": resolved_meaningful_instances_count,
+            "Percentage Meaningful": (resolved_meaningful_count / total_meaningful_tests_count * 100) if total_meaningful_tests_count > 0 else 0.0
+        }
+        agent_stats.append(stats)
+
+    # Sort by Meaningful Resolved Descending
+    agent_stats.sort(key=lambda x: x["Meaningful Resolved"], reverse=True)
+
+    # Print Table
+    headers = ["Agent", "Mean. Tests", "% Tests", "Mean. Inst.", "Total Raw"]
+    row_format = "{:<40} | {:<12} | {:<10} | {:<12} | {:<10}"
+    
+    print(row_format.format(*headers))
+    print("-" * 105)
+    for stat in agent_stats:
+        print(row_format.format(
+            stat["Agent"], 
+            stat["Meaningful Resolved"], 
+            f"{stat['Percentage Meaningful']:.2f}%",
+            f"{stat['Meaningful Instances']}/{total_meaningful_instances}",
+            stat["Total Resolved (Raw)"]
+        ))
+
+    # --- UNIQUE SOLVES ANALYSIS ---
+    print("\n  [UNIQUE SOLVES ANALYSIS]")
+    print("  Meaningful tests solved by ONLY ONE agent in this group:")
+    
+    unique_counts = defaultdict(int) 
+    
+    found_any_unique = False
+    for agent_name, solved_map in agent_solved:
+        for instance_id, solved_here in solved_map.items():
+            once, twice = unique_solver_tracker[instance_id]
+            solo = solved_here & ~twice
+            if solo:
+                found_any_unique = True
+                unique_counts[agent_name] += solo.bit_count()
+                # Optional: Print detailed unique solves (can be verbose)
+                # print(f"    {agent_name} resolved {instance_id}::{group.test_names(instance_id, solo)}")
+
+    if not found_any_unique:
+        print("    None found.")
+    else:
+        sorted_uniques = sorted(unique_counts.items(), key=lambda x: x[1], reverse=True)
+        for agent, count in sorted_uniques:
+            print(f"    {agent}: {count} unique solves")
+
+@profiling.profiled()
+def analyze_results():
+    store = load_store(RESULTS_DIR)
+
+    # 1. Group files by LLM to find pairs
+    files_by_llm, gold_files, none_files = scan_results_dir(RESULTS_DIR)
+
+    # 2. Analyze per LLM group
+    run_groups(analyze_llm_group, [
+        (store, llm, files_by_llm[llm], gold_files, none_files)
+        for llm in files_by_llm
+    ])
 
 if __name__ == "__main__":
     analyze_results()
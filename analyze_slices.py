@@ -0,0 +1,173 @@
+import os
+import argparse
+
+from group_runner import run_groups
+from instance_slices import SLICE_KINDS, slice_index
+from llm_group import load_llm_group
+import profiling
+from results_store import RUN_RESULT_DIR, load_json, load_store, match_baseline_key, scan_results_dir
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# SWE-bench evaluation reports of the selected solutions: <model>.<llm>.json
+# (model = select_best_agent.OUTPUT_MODEL_NAME)
+SELECTION_MODEL_NAME = "Agent_Selection_v1"
+
+# ============================================================
+# TABLE HELPERS
+# ============================================================
+
+def _label(kind, key):
+    # "scikit-learn/scikit-learn" -> "scikit-learn"; years print as-is
+    return key.split("/")[-1] if kind == "repo" else key
+
+def _print_table(kind, keys, rows, first_col="Agent"):
+    """rows: [(label, {slice key: cell text})], one column per slice key."""
+    labels = [_label(kind, k) for k in keys]
+    widths = [max(7, len(label)) for label in labels]
+    print(f"  {first_col:<40} | " + " | ".join(f"{label:>{w}}" for label, w in zip(labels, widths)))
+    print("  " + "-" * (43 + sum(w + 3 for w in widths)))
+    for name, cells in rows:
+        print(f"  {name:<40} | " + " | ".join(f"{cells.get(k, '-'):>{w}}" for k, w in zip(keys, widths)))
+
+def _pct(n, total):
+    return f"{n / total * 100:.1f}%" if total else "-"
+
+# ============================================================
+# SLICED REPORTS
+# ============================================================
+
+@profiling.profiled()
+def report_sliced_scores(group, kind="repo"):
+    """% of each slice's meaningful tests solved per agent, with the oracle and ensemble, and who to route each slice to."""
+    matrix = group.matrix
+    masks = group.slice_masks(kind)
+    index = slice_index(kind)
+    keys = index.order(masks)
+    tests = {k: masks[k].bit_count() for k in keys}
+    n_inst = index.count_by(matrix.instances)
+
+    print(f"\n  [MEANINGFUL TESTS SOLVED BY {kind.upper()}]")
+    rows = [
+        ("Instances", {k: str(n_inst[k]) for k in keys}),
+        ("Meaningful Tests", {k: str(tests[k]) for k in keys}),
+    ]
+    solved = []
+    for agent, row in zip(matrix.agents, matrix.rows):
+        per_slice = {k: (row & masks[k]).bit_count() for k in keys}
+        solved.append((agent, per_slice))
+        rows.append((agent, {k: _pct(per_slice[k], tests[k]) for k in keys}))
+
+    # Oracle = best agent per instance, summed per slice; ensemble = union of all agents
+    oracle_max = [max(col) for col in zip(*group.counts)] if group.counts else []
+    oracle = index.sum_by(matrix.instances, oracle_max)
+    union = matrix.union()
+    rows.append(("Oracle (best agent per instance)", {k: _pct(oracle.get(k, 0), tests[k]) for k in keys}))
+    rows.append(("Ensemble (union of all agents)", {k: _pct((union & masks[k]).bit_count(), tests[k]) for k in keys}))
+    _print_table(kind, keys, rows)
+
+    if not solved:
+        return
+    print(f"\n  [ROUTING] Best agent per {kind} (runner-up gap in meaningful tests):")
+    for k in keys:
+        ranked = sorted(solved, key=lambda x: (-x[1][k], x[0]))
+        best, best_score = ranked[0][0], ranked[0][1][k]
+        gap = best_score - ranked[1][1][k] if len(ranked) > 1 else best_score
+        print(f"    {k:<30} {best:<40} {best_score}/{tests[k]} (+{gap})")
+
+@profiling.profiled()
+def report_sliced_regressions(group, kind="repo"):
+    """Tests the None baseline passes that each agent fails, per slice (missing/unreported tests are not counted)."""
+    matrix = group.regressions
+    index = slice_index(kind)
+    masks = {k: mask for k, mask in index.mask_by(matrix.tests.instances, matrix.tests.instance_masks).items() if mask}
+
+    rows = []
+    for agent_name, row, evaluated in zip(matrix.agents, matrix.rows["failed"], matrix.rows["evaluated"]):
+        rows.append((agent_name, {k: (row & mask).bit_count() for k, mask in masks.items()}, not evaluated))
+
+    print(f"\n  [REGRESSIONS BY {kind.upper()}] Tests passed by None but failed by the agent (lower is safer):")
+    # Agents with no evaluated baseline test cannot be judged, so they go last
+    rows.sort(key=lambda x: (x[2], sum(x[1].values()), x[0]))
+    _print_table(kind, index.order(masks), [(agent, {k: str(v) for k, v in cells.items()}) for agent, cells, _ in rows])
+
+def load_selection_reports(selection_dir=BASE_DIR):
+    """{llm: evaluation report} of the selected solutions found in selection_dir."""
+    reports = {}
+    prefix = f"{SELECTION_MODEL_NAME}."
+    try:
+        names = sorted(os.listdir(selection_dir))
+    except OSError:
+        return reports
+    for f in names:
+        if f.startswith(prefix) and f.endswith(".json"):
+            data = load_json(os.path.join(selection_dir, f))
+            if isinstance(data, dict):
+                reports[f[len(prefix):-len(".json")]] = data
+    return reports
+
+@profiling.profiled()
+def report_sliced_selection(group, kind="repo", selection_dir=BASE_DIR):
+    """Resolved / submitted instances of the selected solutions per slice, as in the leaderboard's resolved_by_<kind>.json."""
+    reports = load_selection_reports(selection_dir)
+    key = match_baseline_key(group.llm, reports)
+    print(f"\n  [SELECTION OUTCOMES BY {kind.upper()}]")
+    if key is None:
+        print(f"    No {SELECTION_MODEL_NAME}.<llm>.json evaluation report for {group.llm}.")
+        return
+
+    index = slice_index(kind)
+    resolved = index.count_by(reports[key].get("resolved_ids", []))
+    submitted = index.count_by(reports[key].get("submitted_ids", []))
+    keys = index.order(submitted)
+    print(f"    Report: {SELECTION_MODEL_NAME}.{key}.json")
+    _print_table(kind, keys, [
+        ("Resolved", {k: str(resolved.get(k, 0)) for k in keys}),
+        ("Submitted", {k: str(submitted[k]) for k in keys}),
+        ("% Resolved", {k: _pct(resolved.get(k, 0), submitted[k]) for k in keys}),
+    ], first_col="")
+
+def report_slices(group, kind="repo", selection_dir=BASE_DIR):
+    report_sliced_scores(group, kind)
+    report_sliced_regressions(group, kind)
+    report_sliced_selection(group, kind, selection_dir)
+
+def analyze_llm_group(store, llm, filenames, gold_files, none_files, kind, selection_dir):
+    print(f"\n{'='*80}")
+    print(f"SLICED ANALYSIS ({kind}): TestGen LLM = {llm}")
+    print(f"{'='*80}")
+
+    group = load_llm_group(store, llm, filenames, gold_files, none_files)
+    if group is None:
+        print(f"  [SKIPPING] Missing Gold/None baselines for {llm}")
+        return
+    if not group.matrix.agents:
+        print("  No agent data.")
+        return
+    report_slices(group, kind, selection_dir)
+
+# ============================================================
+# MAIN
+# ============================================================
+
+@profiling.profiled()
+def main():
+    parser = argparse.ArgumentParser(description="Slice meaningful scores, oracle, regressions and selection outcomes by repo or year.")
+    parser.add_argument("--data_dir", default=RUN_RESULT_DIR, help="Directory containing run_result JSON files.")
+    parser.add_argument("--by", choices=SLICE_KINDS, default="repo", help="Slice by repository or creation year (default: repo).")
+    parser.add_argument("--selection_dir", default=BASE_DIR, help=f"Directory of {SELECTION_MODEL_NAME}.<llm>.json reports.")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.data_dir):
+        print(f"Error: Directory not found: {args.data_dir}")
+        return
+
+    store = load_store(args.data_dir)
+    files_by_llm, gold_files, none_files = scan_results_dir(args.data_dir)
+    run_groups(analyze_llm_group, [
+        (store, llm, files_by_llm[llm], gold_files, none_files, args.by, args.selection_dir)
+        for llm in sorted(files_by_llm)
+    ])
+
+if __name__ == "__main__":
+    main()
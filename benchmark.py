@@ -0,0 +1,282 @@
+import os
+import io
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import contextlib
+import tracemalloc
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BASE_DIR, "algorithm"))
+
+import select_best_agent
+from analyze_advanced import report_best_team
+from corpus_snapshot import write_snapshot
+from analyze_oracle import report_ensemble, report_oracle
+from llm_group import load_llm_group
+from results_store import load_store, scan_results_dir
+
+BASELINE_PATH = os.path.join(BASE_DIR, "benchmark_baseline.json")
+
+# A phase regresses when it is this much slower than its baseline...
+DEFAULT_TOLERANCE = 0.25
+# ...and by more than this many seconds (keeps tiny phases from flapping)
+MIN_REGRESSION_SECONDS = 0.05
+# Same for a phase's peak traced memory, in MB
+MIN_REGRESSION_MB = 1.0
+
+PRESETS = {
+    "small": {"agents": 10, "instances": 200, "tests": 8, "llms": 1},
+    "medium": {"agents": 40, "instances": 500, "tests": 10, "llms": 3},
+    "target": {"agents": 200, "instances": 2294, "tests": 10, "llms": 3},
+}
+
+# ============================================================
+# SYNTHETIC CORPUS
+# ============================================================
+
+def generate_corpus(root, agents, instances, tests, llms, patch_size=2000, seed=0):
+    """
+    Writes a run_result/ directory (gold_/none_/Agent__<llm>-500-1.json per
+    TestGen LLM), agents_solution/<agent>.jsonl and a lite.json score file
+    under root. Gold resolves ~90% of tests, None ~40%, agents in between.
+    """
+    rng = random.Random(seed)
+    run_dir = os.path.join(root, "run_result")
+    sol_dir = os.path.join(root, "agents_solution")
+    os.makedirs(run_dir, exist_ok=True)
+    os.makedirs(sol_dir, exist_ok=True)
+
+    instance_ids = [f"repo{i % 12}__repo{i % 12}-{i}" for i in range(instances)]
+    test_names = [f"tests/test_mod{t % 4}.py::test_case_{t}" for t in range(tests)]
+    agent_names = [f"Agent{a:03d}" for a in range(agents)]
+    skills = [rng.uniform(0.45, 0.9) for _ in agent_names]
+
+    def write_run(path, rate):
+        data = {}
+        for inst in instance_ids:
+            resolved, unresolved = [], []
+            for t in test_names:
+                (resolved if rng.random() < rate else unresolved).append(t)
+            data[inst] = {
+                "n_resolved_tests": len(resolved),
+                "n_unresolved_tests": len(unresolved),
+                "n_missing_tests": 0,
+                "details": {"resolved": resolved, "unresolved": unresolved, "missing": []},
+            }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    for l in range(llms):
+        llm = f"gpt-bench{l}"
+        write_run(os.path.join(run_dir, f"gold_{llm}.json"), 0.9)
+        write_run(os.path.join(run_dir, f"none_{llm}.json"), 0.4)
+        for name, skill in zip(agent_names, skills):
+            write_run(os.path.join(run_dir, f"{name}__{llm}-500-1.json"), skill)
+
+    patch = "diff --git a/x.py b/x.py\n" + "+" * patch_size
+    for name in agent_names:
+        with open(os.path.join(sol_dir, f"{name}.jsonl"), "w", encoding="utf-8") as f:
+            for inst in instance_ids:
+                f.write(json.dumps({"instance_id": inst, "model_name_or_path": name, "model_patch": patch}) + "\n")
+
+    lite_path = os.path.join(root, "lite.json")
+    with open(lite_path, "w", encoding="utf-8") as f:
+        json.dump({name: round(rng.uniform(20, 60), 1) for name in agent_names}, f)
+
+    return run_dir, sol_dir, lite_path
+
+# ============================================================
+# PHASES
+# ============================================================
+
+def copy_corpus(root, run_dir, sol_dir, lite_path, dest):
+    """Copies a freshly generated corpus to dest, so a second pass starts as cold as the first."""
+    os.makedirs(dest)
+    shutil.copytree(run_dir, os.path.join(dest, os.path.basename(run_dir)))
+    shutil.copytree(sol_dir, os.path.join(dest, os.path.basename(sol_dir)))
+    shutil.copy2(lite_path, dest)
+    return tuple(os.path.join(dest, os.path.relpath(p, root)) for p in (run_dir, sol_dir, lite_path))
+
+def run_phases(root, run_dir, sol_dir, lite_path, trace=False):
+    """
+    Runs each pipeline phase once, with report output discarded. Returns
+    {phase: {"seconds": ...}}, or with trace {phase: {"peak_mb": ...}}: the
+    peak of the memory the phase itself allocated, from tracemalloc started
+    at the phase's start. Tracing slows the phases down, so a run measures
+    either time or memory, never both.
+    """
+    results = {}
+
+    def phase(name, func):
+        sink = io.StringIO()
+        if trace:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(sink):
+                value = func()
+            if trace:
+                results[name] = {"peak_mb": round(tracemalloc.get_traced_memory()[1] / (1 << 20), 1)}
+            else:
+                results[name] = {"seconds": round(time.perf_counter() - start, 4)}
+        finally:
+            if trace:
+                tracemalloc.stop()
+        return value
+
+    store = phase("load_cold", lambda: load_store(run_dir))
+    store = phase("load_warm", lambda: load_store(run_dir))
+    phase("snapshot_write", lambda: write_snapshot(run_dir, real_dir=None))
+    phase("snapshot_open", lambda: load_store(run_dir))
+    files_by_llm, gold_files, none_files = scan_results_dir(run_dir)
+    llms = sorted(files_by_llm)
+
+    groups = phase("meaningful", lambda: [
+        load_llm_group(store, llm, files_by_llm[llm], gold_files, none_files) for llm in llms
+    ])
+    phase("solve_matrix", lambda: [(g.matrix, g.counts, g.difficulty_masks()) for g in groups])
+    phase("oracle", lambda: [(report_oracle(g), report_ensemble(g)) for g in groups])
+    phase("best_pair", lambda: [report_best_team(g, 2) for g in groups])
+
+    # Selection writes into the scratch tree instead of the repo outputs
+    out_dir = os.path.join(root, "algorithm_chosen_agent_solutions")
+    select_best_agent.AGENTS_SOLUTION_DIR = sol_dir
+    select_best_agent.METADATA_DIR = os.path.join(out_dir, "metadata")
+    select_best_agent.CHOSEN_DIR = os.path.join(out_dir, "chosen")
+    select_best_agent.agent_solution_indexes.clear()
+    os.makedirs(select_best_agent.METADATA_DIR, exist_ok=True)
+    os.makedirs(select_best_agent.CHOSEN_DIR, exist_ok=True)
+    with open(lite_path, "r", encoding="utf-8") as f:
+        lite_scores = json.load(f)
+
+    def selection():
+        for llm in llms:
+            agents_info = []
+            for fn in files_by_llm[llm]:
+                agent_name, _ = select_best_agent.parse_run_result_filename(fn)
+                agents_info.append({"agent_name": agent_name, "filename": fn, "path": os.path.join(run_dir, fn)})
+            select_best_agent.process_llm_group(llm, agents_info, store, lite_scores)
+    phase("selection", selection)
+
+    return results
+
+# ============================================================
+# BASELINES
+# ============================================================
+
+def config_key(config):
+    return "{agents}a_{instances}i_{tests}t_{llms}l".format(**config)
+
+def load_baselines(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def compare(results, baseline, tolerance):
+    """Returns a list of regression messages (empty when within tolerance)."""
+    failures = []
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        limit = base["seconds"] * (1 + tolerance)
+        if stats["seconds"] > limit and stats["seconds"] - base["seconds"] > MIN_REGRESSION_SECONDS:
+            failures.append(f"{name}: {stats['seconds']:.3f}s vs baseline {base['seconds']:.3f}s (+{tolerance:.0%} allowed)")
+        if stats.get("peak_mb") is not None and base.get("peak_mb") is not None:
+            limit = base["peak_mb"] * (1 + tolerance)
+            if stats["peak_mb"] > limit and stats["peak_mb"] - base["peak_mb"] > MIN_REGRESSION_MB:
+                failures.append(f"{name}: peak {stats['peak_mb']:.1f} MB vs baseline {base['peak_mb']:.1f} MB (+{tolerance:.0%} allowed)")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the analysis pipeline on a synthetic corpus.")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small", help="Scale preset (default: small).")
+    parser.add_argument("--agents", type=int, help="Override the preset's agent count.")
+    parser.add_argument("--instances", type=int, help="Override the preset's instance count.")
+    parser.add_argument("--tests", type=int, help="Override tests per instance.")
+    parser.add_argument("--llms", type=int, help="Override the number of TestGen LLM groups.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", help="Generate the corpus here (kept) instead of a temp dir.")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file (default: benchmark_baseline.json).")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline for its scale.")
+    parser.add_argument("--require-baseline", action="store_true", help="Fail when there is no baseline for this scale.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed slowdown or peak memory growth vs baseline (0.25 = 25%%).")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the traced pass measuring each phase's peak memory.")
+    parser.add_argument("--json", help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+
+    config = dict(PRESETS[args.preset])
+    for key in config:
+        if getattr(args, key) is not None:
+            config[key] = getattr(args, key)
+
+    root = args.workdir or tempfile.mkdtemp(prefix="bench_")
+    try:
+        print(f"Generating corpus {config_key(config)} in {root}...")
+        start = time.perf_counter()
+        run_dir, sol_dir, lite_path = generate_corpus(root, seed=args.seed, **config)
+        print(f"  generated in {time.perf_counter() - start:.2f}s")
+
+        mem_paths = None
+        if not args.no_memory:
+            mem_paths = copy_corpus(root, run_dir, sol_dir, lite_path, os.path.join(root, "memory_pass"))
+
+        results = run_phases(root, run_dir, sol_dir, lite_path)
+        if mem_paths:
+            print("Measuring peak memory per phase (traced pass)...")
+            for name, stats in run_phases(os.path.dirname(mem_paths[0]), *mem_paths, trace=True).items():
+                results[name].update(stats)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(root, ignore_errors=True)
+
+    print(f"\n{'Phase':<14} | {'Seconds':>9} | {'Peak MB':>9}")
+    print("-" * 38)
+    for name, stats in results.items():
+        peak = stats.get("peak_mb")
+        print(f"{name:<14} | {stats['seconds']:>9.3f} | {peak if peak is not None else '-':>9}")
+
+    report = {
+        "config": config,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "phases": results,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    baselines = load_baselines(args.baseline)
+    key = config_key(config)
+
+    if args.save_baseline:
+        baselines[key] = report
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"\nSaved baseline for {key} to {args.baseline}")
+        return
+
+    if key not in baselines:
+        print(f"\nNo baseline for {key} (run with --save-baseline to record one).")
+        if args.require_baseline:
+            sys.exit(1)
+        return
+
+    failures = compare(results, baselines[key]["phases"], args.tolerance)
+    if failures:
+        print("\nREGRESSIONS:")
+        for msg in failures:
+            print(f"  {msg}")
+        sys.exit(1)
+    print(f"\nAll phases within {args.tolerance:.0%} of the {key} baseline.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import os
+import zlib
+import random
+import argparse
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from group_runner import run_groups
+from llm_group import load_llm_group
+import profiling
+from results_store import load_store, scan_results_dir
+
+DEFAULT_RESULTS_DIR = r"c:\Users\naolt\Downloads\class projects\dkang\results\run_result"
+
+DEFAULT_REPLICATES = 10000
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_SEED = 0
+
+# Replicates drawn per NumPy block; bounds the block x instances index array
+BLOCK_REPLICATES = 1000
+# Pairwise gaps summarized per NumPy block; bounds the block x replicates gap array
+BLOCK_PAIRS = 256
+
+
+# ============================================================
+# RESAMPLING
+# ============================================================
+
+def _replicates_numpy(counts, totals, replicates, seed):
+    """replicates x agents array of resampled % Tests."""
+    # instances x (agents + 1): per-instance solved counts, then meaningful tests
+    values = np.column_stack([np.asarray(counts, dtype=np.float64).T, np.asarray(totals, dtype=np.float64)])
+    n = len(totals)
+    rng = np.random.default_rng(seed)
+    out = np.empty((replicates, len(counts)))
+    for start in range(0, replicates, BLOCK_REPLICATES):
+        block = min(BLOCK_REPLICATES, replicates - start)
+        idx = rng.integers(0, n, size=(block, n))
+        # How often each instance was drawn in each replicate
+        idx += np.arange(block)[:, None] * n
+        weights = np.bincount(idx.ravel(), minlength=block * n).reshape(block, n).astype(np.float64)
+        sums = weights @ values
+        out[start:start + block] = sums[:, :-1] * 100 / sums[:, -1:]
+    return out
+
+
+def _replicates_python(counts, totals, replicates, seed):
+    """
+    replicates x agents list of resampled % Tests without NumPy.
+
+    Each instance's column (every agent's count, then its meaningful total)
+    is packed into one int with fields wide enough never to carry, so a
+    replicate is a single sum of n ints followed by one unpack.
+    """
+    rows = list(counts) + [totals]
+    n = len(totals)
+    width = (n * max(max(row) for row in rows)).bit_length() + 1
+    packed = [sum(row[i] << (k * width) for k, row in enumerate(rows)) for i in range(n)]
+    field = (1 << width) - 1
+    total_shift = len(counts) * width
+    shifts = [k * width for k in range(len(counts))]
+
+    rng = random.Random(seed)
+    pool = range(n)
+    out = []
+    for _ in range(replicates):
+        acc = sum(map(packed.__getitem__, rng.choices(pool, k=n)))
+        scale = 100 / (acc >> total_shift)
+        out.append([(acc >> s & field) * scale for s in shifts])
+    return out
+
+
+def _quantiles(values, qs):
+    """Linear-interpolation quantiles (NumPy's default method) of a list."""
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    result = []
+    for q in qs:
+        pos = q * last
+        lo = int(pos)
+        hi = min(lo + 1, last)
+        result.append(ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo))
+    return result
+
+
+def bootstrap_scores(counts, totals, replicates=DEFAULT_REPLICATES, confidence=DEFAULT_CONFIDENCE,
+                     seed=DEFAULT_SEED, pairs=None, use_numpy=None):
+    """
+    Percentile bootstrap over instances of each agent's % Tests (meaningful
+    tests solved / meaningful tests) and of pairwise gaps.
+
+    counts: agents x instances meaningful tests solved; totals: meaningful
+    tests per instance; pairs: (a, b) agent index pairs, every a < b by
+    default. Returns (agent_cis, pair_cis): agent_cis[a] is (point, low,
+    high); pair_cis[(a, b)] is (gap, low, high, share of replicates where a
+    scored above b), with gaps taken as a minus b.
+    """
+    if use_numpy is None:
+        use_numpy = np is not None
+    n_agents = len(counts)
+    if pairs is None:
+        pairs = [(a, b) for a in range(n_agents) for b in range(a + 1, n_agents)]
+    total = sum(totals)
+    points = [sum(row) * 100 / total for row in counts]
+    qs = ((1 - confidence) / 2, (1 + confidence) / 2)
+
+    pair_cis = {}
+    if use_numpy:
+        # agents x replicates, so each agent's replicates are contiguous
+        reps = np.ascontiguousarray(_replicates_numpy(counts, totals, replicates, seed).T)
+        lows, highs = np.quantile(reps, qs, axis=1)
+        agent_cis = [(points[a], float(lows[a]), float(highs[a])) for a in range(n_agents)]
+        for start in range(0, len(pairs), BLOCK_PAIRS):
+            block = pairs[start:start + BLOCK_PAIRS]
+            left, right = zip(*block)
+            gaps = reps[list(left)] - reps[list(right)]
+            lows, highs = np.quantile(gaps, qs, axis=1)
+            ahead = (gaps > 0).mean(axis=1)
+            for k, (a, b) in enumerate(block):
+                pair_cis[(a, b)] = (points[a] - points[b], float(lows[k]), float(highs[k]), float(ahead[k]))
+        return agent_cis, pair_cis
+
+    columns = list(zip(*_replicates_python(counts, totals, replicates, seed)))
+    agent_cis = [(points[a], *_quantiles(columns[a], qs)) for a in range(n_agents)]
+    for a, b in pairs:
+        gaps = [x - y for x, y in zip(columns[a], columns[b])]
+        ahead = sum(1 for g in gaps if g > 0) / len(gaps)
+        pair_cis[(a, b)] = (points[a] - points[b], *_quantiles(gaps, qs), ahead)
+    return agent_cis, pair_cis
+
+
+def group_seed(seed, llm):
+    """Per-group seed, so a group's intervals do not depend on which worker ran it."""
+    return (seed + zlib.crc32(llm.encode("utf-8"))) & 0xFFFFFFFF
+
+
+# ============================================================
+# REPORT
+# ============================================================
+
+@profiling.profiled()
+def report_bootstrap(group, replicates=DEFAULT_REPLICATES, confidence=DEFAULT_CONFIDENCE,
+                     seed=DEFAULT_SEED, all_pairs=False):
+    """
+    % Tests confidence intervals per agent, then the gap between each agent
+    and the next one down the ranking (every pair with all_pairs).
+    """
+    matrix = group.matrix
+    totals = [mask.bit_count() for mask in matrix.instance_masks]
+    if not matrix.agents or not sum(totals):
+        print("  No agent data or meaningful tests; skipping bootstrap.")
+        return
+
+    engine = "numpy" if np is not None else "python"
+    level = f"{confidence * 100:g}%"
+    print(f"  [BOOTSTRAP] {replicates} replicates over {len(totals)} instances ({engine}), {level} intervals")
+
+    agents = matrix.agents
+    ranked = sorted(range(len(agents)), key=lambda a: (-sum(group.counts[a]), agents[a]))
+    if all_pairs:
+        pairs = [(ranked[i], ranked[j]) for i in range(len(ranked)) for j in range(i + 1, len(ranked))]
+    else:
+        pairs = list(zip(ranked, ranked[1:]))
+
+    agent_cis, pair_cis = bootstrap_scores(group.counts, totals, replicates, confidence,
+                                           group_seed(seed, group.llm), pairs)
+
+    row_format = "{:<40} | {:<8} | {:<18}"
+    print(row_format.format("Agent", "% Tests", f"{level} CI"))
+    print("-" * 72)
+    for a in ranked:
+        point, low, high = agent_cis[a]
+        print(row_format.format(agents[a], f"{point:.2f}%", f"[{low:.2f}, {high:.2f}]"))
+
+    if not pairs:
+        return
+
+    print(f"\n  Pairwise gaps ({'all pairs' if all_pairs else 'adjacent ranks'}; * = interval excludes 0):")
+    pair_format = "  {:<40} | {:<40} | {:<8} | {:<18} | {:<6}"
+    print(pair_format.format("Agent A", "Agent B", "A - B", f"{level} CI", "P(A>B)"))
+    print("-" * 125)
+    separated = 0
+    for a, b in pairs:
+        gap, low, high, ahead = pair_cis[(a, b)]
+        mark = "*" if low > 0 or high < 0 else ""
+        separated += bool(mark)
+        print(pair_format.format(agents[a], agents[b], f"{gap:+.2f}", f"[{low:+.2f}, {high:+.2f}]{mark}", f"{ahead:.3f}"))
+    print(f"  {separated}/{len(pairs)} gaps separated at {level}.")
+
+
+def bootstrap_llm_group(store, llm, filenames, gold_files, none_files, replicates, confidence, seed, all_pairs):
+    print(f"\n{'='*80}")
+    print(f"BOOTSTRAP GROUP: Test Generation LLM = {llm}")
+    print(f"{'='*80}")
+
+    group = load_llm_group(store, llm, filenames, gold_files, none_files)
+    if group is None:
+        print(f"  [WARNING] Missing GOLD or NONE file for {llm}. Skipping...")
+        return
+    report_bootstrap(group, replicates, confidence, seed, all_pairs)
+
+
+# ============================================================
+# MAIN
+# ============================================================
+
+@profiling.profiled()
+def main():
+    parser = argparse.ArgumentParser(description="Bootstrap confidence intervals for meaningful-test scores.")
+    parser.add_argument("--data_dir", default=DEFAULT_RESULTS_DIR, help="Directory containing result JSON files.")
+    parser.add_argument("--replicates", type=int, default=DEFAULT_REPLICATES, help="Bootstrap replicates (default: 10000).")
+    parser.add_argument("--confidence", type=float, default=DEFAULT_CONFIDENCE, help="Interval level (default: 0.95).")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--all_pairs", action="store_true", help="Print every pairwise gap, not just adjacent ranks.")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.data_dir):
+        print(f"Error: Directory not found: {args.data_dir}")
+        return
+
+    store = load_store(args.data_dir)
+    files_by_llm, gold_files, none_files = scan_results_dir(args.data_dir)
+    run_groups(bootstrap_llm_group, [
+        (store, llm, files_by_llm[llm], gold_files, none_files, args.replicates, args.confidence, args.seed, args.all_pairs)
+        for llm in sorted(files_by_llm)
+    ])
+
+
+if __name__ == "__main__":
+    main()
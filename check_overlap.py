@@ -1,40 +1,137 @@
-
-import json
 import os
+import csv
+import argparse
+
+from find_benchmark_files import CATALOG_FILENAME, load_catalog, save_catalog, update_catalog
+from group_runner import map_files
+from json_backend import load_path
+from set_sketch import SetSketch, containment, jaccard
 
 RESULTS_DIR = r"c:\Users\naolt\Downloads\class projects\dkang\results\all_results"
 
-def get_instances(filename):
-    path = os.path.join(RESULTS_DIR, filename)
+# Pairs at or above this Jaccard are reported as near-duplicate submissions
+DUPLICATE_JACCARD = 0.95
+
+# Row blocks per worker for the all-pairs pass
+BLOCKS_PER_WORKER = 4
+
+# ID lists the two-file --pair report has always compared
+PAIR_LIST_KEYS = ("resolved", "no_generation", "generated", "with_logs")
+
+def get_instances(filename, results_dir=RESULTS_DIR):
+    """
+    Instance IDs of the --pair report: the "__" top-level keys plus the
+    PAIR_LIST_KEYS lists (unlike the catalog sketches, "no_logs" is not counted).
+    """
     try:
-        with open(path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        instances = set()
-        if isinstance(data, dict):
-            # Check keys
-            for k in data.keys():
-                if "__" in k: instances.add(k)
-            # Check known lists
-            for key in ["resolved", "no_generation", "generated", "with_logs"]:
-                if key in data and isinstance(data[key], list):
-                    instances.update(data[key])
-        return instances
-    except:
+        data = load_path(os.path.join(results_dir, filename))
+    except Exception:
         return set()
+    instances = set()
+    if isinstance(data, dict):
+        instances.update(k for k in data if "__" in k)
+        for key in PAIR_LIST_KEYS:
+            if isinstance(data.get(key), list):
+                instances.update(data[key])
+    return instances
+
+def compare_pair(verified_file, lite_file, results_dir=RESULTS_DIR):
+    """The original two-file report, on exact sets."""
+    v_set = get_instances(verified_file, results_dir)
+    l_set = get_instances(lite_file, results_dir)
+
+    print(f"Verified ({verified_file}): {len(v_set)}")
+    print(f"Lite ({lite_file}): {len(l_set)}")
+    print(f"Intersection: {len(v_set.intersection(l_set))}")
+    print(f"Lite - Verified: {len(l_set - v_set)}")
+    print(f"Verified - Lite: {len(v_set - l_set)}")
+
+    if l_set.issubset(v_set):
+        print("Lite is a subset of Verified.")
+    else:
+        print("Lite is NOT a subset of Verified.")
+
+# ============================================================
+# ALL-PAIRS ENGINE
+# ============================================================
+
+def _pair_block(job):
+    """Rows [start, end) of the upper triangle: [(i, j, jaccard, containment i->j, containment j->i, exact)]."""
+    sketch_data, start, end = job
+    sketches = [SetSketch.from_json(d) for d in sketch_data]
+    rows = []
+    for i in range(start, end):
+        a = sketches[i]
+        for j in range(i + 1, len(sketches)):
+            b = sketches[j]
+            rows.append((i, j, jaccard(a, b), containment(a, b), containment(b, a), a.exact and b.exact))
+    return rows
+
+def all_pairs(sketch_data, workers=None):
+    """Pairwise overlap of every sketch, upper triangle, in (i, j) order."""
+    n = len(sketch_data)
+    n_blocks = max(1, min(n, (workers or os.cpu_count() or 1) * BLOCKS_PER_WORKER))
+    # Later rows have fewer pairs, so blocks get more rows towards the end
+    bounds = [round(n * (1 - (1 - b / n_blocks) ** 0.5)) for b in range(n_blocks + 1)]
+    jobs = [(sketch_data, lo, hi) for lo, hi in zip(bounds, bounds[1:]) if hi > lo]
+    pairs = []
+    for rows in map_files(_pair_block, jobs, workers=workers):
+        pairs.extend(rows)
+    return pairs
+
+def write_matrix(path, names, pairs):
+    """Symmetric Jaccard matrix as CSV (1.0 on the diagonal)."""
+    n = len(names)
+    matrix = [[1.0 if i == j else 0.0 for j in range(n)] for i in range(n)]
+    for i, j, jac, _, _, _ in pairs:
+        matrix[i][j] = matrix[j][i] = jac
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([""] + names)
+        for name, row in zip(names, matrix):
+            writer.writerow([name] + [f"{v:.4f}" for v in row])
+
+def main():
+    parser = argparse.ArgumentParser(description="Instance-ID overlap between results files.")
+    parser.add_argument("--results_dir", default=RESULTS_DIR, help="Directory of results_<agent>.json files.")
+    parser.add_argument("--pair", nargs=2, metavar=("VERIFIED", "LITE"), help="Exact report for two files only.")
+    parser.add_argument("--kind", choices=("submitted", "resolved"), default="submitted",
+                        help="Compare all submitted IDs or only resolved ones (default: submitted).")
+    parser.add_argument("--threshold", type=float, default=DUPLICATE_JACCARD, help="Near-duplicate Jaccard threshold.")
+    parser.add_argument("--matrix", help="Write the full Jaccard matrix to this CSV file.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (1 = sequential).")
+    args = parser.parse_args()
+
+    if args.pair:
+        compare_pair(args.pair[0], args.pair[1], args.results_dir)
+        return
+
+    # Sketches come from the shared benchmark catalog; only changed files are re-scanned
+    catalog_path = os.path.join(args.results_dir, CATALOG_FILENAME)
+    catalog = load_catalog(catalog_path)
+    n_scanned = update_catalog(args.results_dir, catalog, args.workers)
+    save_catalog(catalog, catalog_path)
+
+    key = "sketch" if args.kind == "submitted" else "resolved_sketch"
+    names = sorted(catalog["files"])
+    sketch_data = [catalog["files"][f][key] for f in names]
+    print(f"Comparing {args.kind} IDs of {len(names)} files ({n_scanned} re-scanned)...")
 
-verified_file = "results_rag_gpt4.json"
-lite_file = "results_artemis_agent_v2.json"
+    pairs = all_pairs(sketch_data, args.workers)
+    n_exact = sum(1 for p in pairs if p[5])
+    print(f"{len(pairs)} pairs: {n_exact} exact, {len(pairs) - n_exact} estimated (bottom-k MinHash).")
 
-v_set = get_instances(verified_file)
-l_set = get_instances(lite_file)
+    if args.matrix:
+        write_matrix(args.matrix, names, pairs)
+        print(f"Wrote similarity matrix to {args.matrix}")
 
-print(f"Verified ({verified_file}): {len(v_set)}")
-print(f"Lite ({lite_file}): {len(l_set)}")
-print(f"Intersection: {len(v_set.intersection(l_set))}")
-print(f"Lite - Verified: {len(l_set - v_set)}")
-print(f"Verified - Lite: {len(v_set - l_set)}")
+    dupes = sorted((p for p in pairs if p[2] >= args.threshold), key=lambda p: (-p[2], p[0], p[1]))
+    print(f"\n--- NEAR-DUPLICATES (Jaccard >= {args.threshold:.2f}) ---")
+    if not dupes:
+        print("None found.")
+    for i, j, jac, c_ij, c_ji, exact in dupes:
+        approx = "" if exact else "~"
+        print(f"{approx}{jac:.3f}  {names[i]} <-> {names[j]}  (contained {c_ij:.2f} / {c_ji:.2f})")
 
-if l_set.issubset(v_set):
-    print("Lite is a subset of Verified.")
-else:
-    print("Lite is NOT a subset of Verified.")
+if __name__ == "__main__":
+    main()
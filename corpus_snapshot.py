@@ -0,0 +1,237 @@
+import os
+import sys
+import mmap
+import time
+import pickle
+import struct
+import argparse
+from array import array
+
+import profiling
+from meaningful_cache import load_meaningful_map
+from results_store import (
+    RUN_RESULT_DIR, ResultsStore, is_run_result_file, load_json, load_store, match_baseline_key, scan_results_dir,
+)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+REAL_RESULTS_DIR = os.path.join(BASE_DIR, "filtered_results")
+
+# Written into the run_result directory it snapshots
+SNAPSHOT_FILENAME = ".corpus_snapshot.bin"
+SNAPSHOT_VERSION = 1
+MAGIC = b"CORPSNAP"
+
+# magic, version, header length; the pickled header follows, then the int32 data
+PREAMBLE = struct.Struct("<8sIQ")
+ALIGN = 8
+
+# Per-file column arrays kept as raw int32 sections
+CHUNK_ARRAYS = ("instance", "n_resolved", "offsets", "tests")
+
+
+def snapshot_path(results_dir):
+    return os.path.join(results_dir, SNAPSHOT_FILENAME)
+
+
+def _file_stamp(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def _dir_stamps(results_dir):
+    """{filename: stamp} of every run_result file load_store would look at."""
+    return {f: _file_stamp(os.path.join(results_dir, f)) for f in os.listdir(results_dir) if is_run_result_file(f)}
+
+
+# ============================================================
+# SNAPSHOT-BACKED STORE
+# ============================================================
+
+class SnapshotStore(ResultsStore):
+    """
+    A ResultsStore whose column arrays are read-only int32 views into a
+    memory-mapped snapshot. It also serves the meaningful maps and real
+    leaderboard resolved sets that were captured with it. Pickling sends the
+    snapshot path, and worker processes map the same file again.
+    """
+
+    def __reduce__(self):
+        return _reopen, (self.snapshot_file, self.snapshot_id)
+
+    def cached_meaningful(self, gold_file, none_file):
+        tests_by_inst = self._meaningful.get((gold_file, none_file))
+        if tests_by_inst is None:
+            return None
+        return {inst: set(tests) for inst, tests in tests_by_inst.items()}
+
+    def cached_real_resolved(self, path):
+        entry = self._real.get(os.path.abspath(path))
+        if entry is None:
+            return None
+        stamp, resolved = entry
+        try:
+            if _file_stamp(path) != stamp:
+                return None
+        except OSError:
+            return None
+        return resolved
+
+
+def _read_snapshot(path):
+    """(header, int32 memoryview of the data section), or None if missing or another version."""
+    try:
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    if len(mm) < PREAMBLE.size:
+        return None
+    magic, version, header_len = PREAMBLE.unpack_from(mm, 0)
+    if magic != MAGIC or version != SNAPSHOT_VERSION:
+        return None
+    header = pickle.loads(mm[PREAMBLE.size:PREAMBLE.size + header_len])
+    if header["byteorder"] != sys.byteorder or header["itemsize"] != array("i").itemsize:
+        return None
+    return header, memoryview(mm)[header["data_start"]:].cast("i")
+
+
+def _build_store(path, header, data):
+    store = SnapshotStore.__new__(SnapshotStore)
+    store.__dict__.update(header["state"])
+    store.files = {}
+    for filename, meta in header["files"].items():
+        chunk = {"stamp": meta["stamp"], "agent": meta["agent"], "llm": meta["llm"]}
+        for key, (start, count) in zip(CHUNK_ARRAYS, meta["sections"]):
+            chunk[key] = data[start:start + count]
+        store.files[filename] = chunk
+    store.snapshot_file = path
+    store.snapshot_id = header["created"]
+    store._meaningful = header["meaningful"]
+    store._real = header["real"]
+    return store
+
+
+def _reopen(path, snapshot_id):
+    snap = _read_snapshot(path)
+    if snap is None or snap[0]["created"] != snapshot_id:
+        raise RuntimeError(f"Snapshot {path} changed while in use")
+    return _build_store(path, *snap)
+
+
+@profiling.profiled()
+def open_snapshot(results_dir):
+    """
+    The SnapshotStore for results_dir, or None when there is no snapshot or
+    any result file was added, removed or modified since it was written.
+    """
+    path = snapshot_path(results_dir)
+    snap = _read_snapshot(path)
+    if snap is None:
+        return None
+    header, data = snap
+
+    if _dir_stamps(results_dir) != header["stamps"]:
+        print(f"Note: Snapshot {path} is stale; reading JSON (rerun corpus_snapshot.py to refresh).")
+        return None
+
+    store = _build_store(path, header, data)
+    store.results_dir = results_dir
+    return store
+
+
+# ============================================================
+# WRITING
+# ============================================================
+
+def _real_resolved(real_dir):
+    """{abs path: (stamp, set of resolved IDs)} for every leaderboard results file in real_dir."""
+    real = {}
+    if not real_dir or not os.path.isdir(real_dir):
+        return real
+    for f in sorted(os.listdir(real_dir)):
+        if not f.endswith(".json") or f.startswith("."):
+            continue
+        path = os.path.join(real_dir, f)
+        data = load_json(path)
+        resolved = set(data.get("resolved", [])) if isinstance(data, dict) else set()
+        real[os.path.abspath(path)] = (_file_stamp(path), resolved)
+    return real
+
+
+def write_snapshot(results_dir, real_dir=REAL_RESULTS_DIR):
+    """Snapshots the store, every LLM group's meaningful map and real_dir's resolved sets. Returns the path."""
+    stamps = _dir_stamps(results_dir)
+    store = load_store(results_dir, snapshot=False)
+
+    meaningful = {}
+    files_by_llm, gold_files, none_files = scan_results_dir(results_dir)
+    for llm in sorted(files_by_llm):
+        gold_key = match_baseline_key(llm, gold_files)
+        none_key = match_baseline_key(llm, none_files)
+        if not gold_key or not none_key:
+            continue
+        pair = (gold_files[gold_key], none_files[none_key])
+        if pair not in meaningful and store.has(pair[0]) and store.has(pair[1]):
+            tests_by_inst = load_meaningful_map(store, *pair)
+            meaningful[pair] = {inst: sorted(tests) for inst, tests in tests_by_inst.items()}
+
+    data = array("i")
+    files = {}
+    for filename, chunk in store.files.items():
+        sections = []
+        for key in CHUNK_ARRAYS:
+            sections.append((len(data), len(chunk[key])))
+            data.extend(chunk[key])
+        files[filename] = {"stamp": chunk["stamp"], "agent": chunk["agent"], "llm": chunk["llm"], "sections": sections}
+
+    header = {
+        "created": time.time_ns(),
+        "byteorder": sys.byteorder,
+        "itemsize": data.itemsize,
+        "stamps": stamps,
+        "state": {k: v for k, v in vars(store).items() if k not in ("files", "results_dir")},
+        "files": files,
+        "meaningful": meaningful,
+        "real": _real_resolved(real_dir),
+        "data_start": 0,
+    }
+    # data_start depends on the header length, which depends on data_start
+    blob = pickle.dumps(header, protocol=pickle.HIGHEST_PROTOCOL)
+    while True:
+        data_start = -(-(PREAMBLE.size + len(blob)) // ALIGN) * ALIGN
+        if header["data_start"] == data_start:
+            break
+        header["data_start"] = data_start
+        blob = pickle.dumps(header, protocol=pickle.HIGHEST_PROTOCOL)
+
+    path = snapshot_path(results_dir)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, SNAPSHOT_VERSION, len(blob)))
+        f.write(blob)
+        f.write(b"\0" * (data_start - PREAMBLE.size - len(blob)))
+        data.tofile(f)
+    os.replace(tmp_path, path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a memory-mapped snapshot of a run_result corpus.")
+    parser.add_argument("--data_dir", default=RUN_RESULT_DIR, help="run_result directory to snapshot.")
+    parser.add_argument("--real_dir", default=REAL_RESULTS_DIR, help="Leaderboard results_<agent>.json directory.")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    path = write_snapshot(args.data_dir, args.real_dir)
+    size_mb = os.path.getsize(path) / (1 << 20)
+    print(f"Wrote {path} ({size_mb:.1f} MB) in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    store = open_snapshot(args.data_dir)
+    print(f"  Files: {len(store.files)} | Meaningful maps: {len(store._meaningful)} | "
+          f"Real results: {len(store._real)} | Open: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
 import os
-import json
 import glob
+import time
 from collections import defaultdict
 
+import profiling
+from json_backend import load_path
+
+@profiling.profiled()
 def count_instances():
     # Define the directory containing the result files
     target_dir = os.path.join("results", "run_result")
@@ -56,8 +60,9 @@ def count_instances():
             continue
 
         try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
+            start = time.perf_counter()
+            data = load_path(file_path)
+            profiling.record_file(file_path, time.perf_counter() - start)
             
             # Count total instances for this agent
             agent_totals_by_llm[llm][agent] = len(data)
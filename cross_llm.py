@@ -0,0 +1,278 @@
+import os
+import json
+import argparse
+
+from llm_group import load_llm_group
+import profiling
+from results_store import RUN_RESULT_DIR, load_store, scan_results_dir
+
+# Per-group verdict of an agent on an instance: solved at least one / all of its meaningful tests
+CRITERIA = ("any", "all")
+DEFAULT_TOP = 20
+
+
+# ============================================================
+# JOIN
+# ============================================================
+
+class CrossLLMJoin:
+    """
+    Every TestGen LLM group's (agent, instance) verdicts joined on one
+    interned key space.
+
+    Agents are numbered in sorted name order and instances by the store's
+    intern table; key = agent_id * stride + instance_id, with the stride
+    padded to whole bytes so each agent owns a byte range. Each LLM
+    contributes two key bitsets: the keys it judged (instances with
+    meaningful tests under that LLM) and the keys it passed. Agreement,
+    disagreement and flips are integer ops over those bitsets, so the join
+    is linear in the number of (agent, instance, LLM) verdicts.
+    """
+
+    def __init__(self, store, groups, criterion="any"):
+        self.store = store
+        self.criterion = criterion
+        self.llms = [group.llm for group in groups]
+        self.agents = sorted({agent for group in groups for agent in group.matrix.agents})
+        self.stride = (len(store.instances) + 7) // 8 * 8
+        self.judged = []
+        self.passed = []
+
+        agent_id = {agent: i for i, agent in enumerate(self.agents)}
+        n_bytes = len(self.agents) * self.stride // 8
+        for group in groups:
+            matrix = group.matrix
+            inst_ids = [store.lookup_instance(inst) for inst in matrix.instances]
+            totals = [mask.bit_count() for mask in matrix.instance_masks]
+            judged = bytearray(n_bytes)
+            passed = bytearray(n_bytes)
+            for agent, counts in zip(matrix.agents, group.counts):
+                base = agent_id[agent] * self.stride
+                for inst_id, count, total in zip(inst_ids, counts, totals):
+                    if not total:
+                        continue
+                    key = base + inst_id
+                    judged[key >> 3] |= 1 << (key & 7)
+                    if count and (criterion == "any" or count == total):
+                        passed[key >> 3] |= 1 << (key & 7)
+            self.judged.append(int.from_bytes(judged, "little"))
+            self.passed.append(int.from_bytes(passed, "little"))
+
+        # Keys judged by two or more LLMs, and those whose verdicts differ
+        once = twice = flipped = 0
+        for g, judged in enumerate(self.judged):
+            twice |= once & judged
+            once |= judged
+            for h in range(g):
+                flipped |= self.shared(g, h) & (self.passed[g] ^ self.passed[h])
+        self.compared = twice
+        self.flipped = flipped
+
+    def key(self, key):
+        """(agent, instance) of a key."""
+        agent_idx, inst_id = divmod(key, self.stride)
+        return self.agents[agent_idx], self.store.instances[inst_id]
+
+    def keys(self, mask):
+        """Yields the set keys of a bitset, lowest (sorted agent, then instance) first."""
+        for byte_idx, b in enumerate(mask.to_bytes((mask.bit_length() + 7) // 8, "little")):
+            while b:
+                low = b & -b
+                yield (byte_idx << 3) + low.bit_length() - 1
+                b ^= low
+
+    def shared(self, g, h):
+        return self.judged[g] & self.judged[h]
+
+    # ---------------------------- reductions ----------------------------
+
+    def pair_matrices(self):
+        """
+        (agree, differ): agree[g][h] = (matching verdicts, keys judged by
+        both); differ[g][h] = keys g passed and h failed.
+        """
+        n = len(self.llms)
+        agree = [[None] * n for _ in range(n)]
+        differ = [[0] * n for _ in range(n)]
+        for g in range(n):
+            for h in range(n):
+                both = self.shared(g, h)
+                mismatch = both & (self.passed[g] ^ self.passed[h])
+                agree[g][h] = (both.bit_count() - mismatch.bit_count(), both.bit_count())
+                differ[g][h] = (both & self.passed[g] & ~self.passed[h]).bit_count()
+        return agree, differ
+
+    def agent_flips(self):
+        """{agent: (keys judged by 2+ LLMs, flipped keys)}."""
+        n_bytes = len(self.agents) * self.stride // 8
+        compared = self.compared.to_bytes(n_bytes, "little")
+        flipped = self.flipped.to_bytes(n_bytes, "little")
+        width = self.stride // 8
+        stats = {}
+        for i, agent in enumerate(self.agents):
+            span = slice(i * width, (i + 1) * width)
+            stats[agent] = (
+                int.from_bytes(compared[span], "little").bit_count(),
+                int.from_bytes(flipped[span], "little").bit_count(),
+            )
+        return stats
+
+    def instance_flips(self):
+        """
+        {instance: {"compared": agents judged by 2+ LLMs, "flipped": agents
+        whose verdict differs, "passes": per-LLM passes among the flipped
+        agents, "pairs": {(g, h): flipped agents where g and h disagree}}}
+        for every instance with at least one flip.
+        """
+        # Byte views, so each flipped key is tested without big-int shifts
+        n_bytes = len(self.agents) * self.stride // 8
+        passed = [mask.to_bytes(n_bytes, "little") for mask in self.passed]
+        pairs = [
+            ((h, g), (self.shared(g, h) & (self.passed[g] ^ self.passed[h])).to_bytes(n_bytes, "little"))
+            for g in range(len(self.llms)) for h in range(g)
+        ]
+
+        stats = {}
+        for key in self.keys(self.flipped):
+            byte, bit = key >> 3, 1 << (key & 7)
+            inst = self.store.instances[key % self.stride]
+            entry = stats.setdefault(inst, {"compared": 0, "flipped": 0, "passes": [0] * len(self.llms), "pairs": {}})
+            entry["flipped"] += 1
+            for g, view in enumerate(passed):
+                if view[byte] & bit:
+                    entry["passes"][g] += 1
+            for pair, view in pairs:
+                if view[byte] & bit:
+                    entry["pairs"][pair] = entry["pairs"].get(pair, 0) + 1
+        if stats:
+            for key in self.keys(self.compared):
+                inst = self.store.instances[key % self.stride]
+                if inst in stats:
+                    stats[inst]["compared"] += 1
+        return stats
+
+
+def build_join(store, results_dir, criterion="any"):
+    """CrossLLMJoin over every group of results_dir with both baselines; groups without them are reported and skipped."""
+    files_by_llm, gold_files, none_files = scan_results_dir(results_dir)
+    groups = []
+    for llm in sorted(files_by_llm):
+        group = load_llm_group(store, llm, files_by_llm[llm], gold_files, none_files)
+        if group is None:
+            print(f"  [WARNING] Missing GOLD or NONE file for {llm}. Left out of the join.")
+            continue
+        groups.append(group)
+    return CrossLLMJoin(store, groups, criterion)
+
+
+# ============================================================
+# REPORT
+# ============================================================
+
+@profiling.profiled()
+def report_cross_llm(join, top=DEFAULT_TOP):
+    """LLM x LLM agreement, per-agent flip rates and the instances whose verdict depends on the TestGen LLM."""
+    llms = join.llms
+    print(f"\n{'='*80}")
+    print(f"CROSS-LLM JOIN: {len(llms)} TestGen LLMs | {len(join.agents)} agents | criterion = {join.criterion}")
+    print(f"{'='*80}")
+    if len(llms) < 2:
+        print("  Need at least two TestGen LLM groups to compare.")
+        return
+
+    n_compared = join.compared.bit_count()
+    n_flipped = join.flipped.bit_count()
+    share = n_flipped / n_compared * 100 if n_compared else 0.0
+    print(f"  (agent, instance) pairs judged by 2+ LLMs: {n_compared} | verdict flips: {n_flipped} ({share:.2f}%)")
+
+    agree, differ = join.pair_matrices()
+    width = max(12, max(len(llm) for llm in llms) + 2)
+    print("\n  [AGREEMENT] Matching verdicts / (agent, instance) pairs judged by both")
+    print(f"  {'':<{width}}" + "".join(f"{llm:>{width}}" for llm in llms))
+    for g, llm in enumerate(llms):
+        cells = []
+        for h in range(len(llms)):
+            same, both = agree[g][h]
+            cells.append(f"{same / both * 100:.1f}%" if both else "-")
+        print(f"  {llm:<{width}}" + "".join(f"{c:>{width}}" for c in cells))
+
+    print("\n  [DISAGREEMENT] Pairs the row LLM's tests pass and the column LLM's tests fail")
+    print(f"  {'':<{width}}" + "".join(f"{llm:>{width}}" for llm in llms))
+    for g, llm in enumerate(llms):
+        print(f"  {llm:<{width}}" + "".join(f"{differ[g][h] if g != h else '-':>{width}}" for h in range(len(llms))))
+
+    print("\n  [FLIP RATE PER AGENT] Share of its compared instances where the verdict depends on the LLM")
+    row_format = "  {:<40} | {:<9} | {:<6} | {:<7}"
+    print(row_format.format("Agent", "Compared", "Flips", "Flip %"))
+    print("  " + "-" * 70)
+    flips = join.agent_flips()
+    for agent, (compared, flipped) in sorted(flips.items(), key=lambda x: (-x[1][1], x[0])):
+        rate = f"{flipped / compared * 100:.2f}%" if compared else "-"
+        print(row_format.format(agent, compared, flipped, rate))
+
+    instances = join.instance_flips()
+    print(f"\n  [LLM-DEPENDENT INSTANCES] {len(instances)} instances with a verdict flip (top {top}):")
+    if not instances:
+        print("    None found.")
+        return
+    col = max(7, max(len(llm) for llm in llms))
+    pass_header = " | ".join(f"{llm:<{col}}" for llm in llms)
+    print(f"  {'Instance':<45} | {'Flipped':<9} | {pass_header}")
+    print("  " + "-" * (60 + (col + 3) * len(llms)))
+    ranked = sorted(instances.items(), key=lambda x: (-x[1]["flipped"], -x[1]["flipped"] / x[1]["compared"], x[0]))
+    for inst, entry in ranked[:top]:
+        passes = " | ".join(f"{p:<{col}}" for p in entry["passes"])
+        print(f"  {inst:<45} | {entry['flipped']:>3}/{entry['compared']:<5} | {passes}")
+    print("  (per-LLM columns: flipped agents that pass under that LLM's tests)")
+
+
+def join_to_json(join):
+    agree, differ = join.pair_matrices()
+    return {
+        "llms": join.llms,
+        "criterion": join.criterion,
+        "agreement": agree,
+        "pass_fail": differ,
+        "agents": {agent: {"compared": c, "flipped": f} for agent, (c, f) in join.agent_flips().items()},
+        "instances": {
+            inst: {
+                "compared": entry["compared"],
+                "flipped": entry["flipped"],
+                "passes": dict(zip(join.llms, entry["passes"])),
+                "pairs": {f"{join.llms[g]}|{join.llms[h]}": n for (g, h), n in entry["pairs"].items()},
+            }
+            for inst, entry in join.instance_flips().items()
+        },
+    }
+
+
+# ============================================================
+# MAIN
+# ============================================================
+
+@profiling.profiled()
+def main():
+    parser = argparse.ArgumentParser(description="Join every TestGen LLM group on (agent, instance) and compare verdicts.")
+    parser.add_argument("--data_dir", default=RUN_RESULT_DIR, help="Directory containing run_result JSON files.")
+    parser.add_argument("--criterion", choices=CRITERIA, default="any",
+                        help="Verdict = solved at least one (any) or all meaningful tests (default: any).")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="LLM-dependent instances to list (default: 20).")
+    parser.add_argument("--json", help="Also write the matrices and per-agent/per-instance flips to this JSON file.")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.data_dir):
+        print(f"Error: Directory not found: {args.data_dir}")
+        return
+
+    store = load_store(args.data_dir)
+    join = build_join(store, args.data_dir, args.criterion)
+    report_cross_llm(join, args.top)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(join_to_json(join), f, indent=2)
+        print(f"\nJoin written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,118 @@
-
 import os
 import json
 import sys
+import argparse
 
-# Try to import datasets, if fails, print instruction
-try:
-    from datasets import load_dataset
-except ImportError:
-    print("Error: 'datasets' library not found. Please run: pip install datasets")
-    sys.exit(1)
+from group_runner import map_files
+from solution_index import extract_instance_id
 
-def main():
-    print("Loading datasets from Hugging Face...")
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Instance IDs of the Hugging Face splits, cached locally so filtering runs offline
+MANIFEST_PATH = os.path.join(BASE_DIR, "swebench_instance_manifest.json")
+MANIFEST_VERSION = 1
+MANIFEST_DATASETS = ("princeton-nlp/SWE-bench_Verified", "princeton-nlp/SWE-bench_Lite")
+MANIFEST_SPLIT = "test"
+
+# ============================================================
+# INSTANCE-ID MANIFEST
+# ============================================================
+
+def build_manifest(path=MANIFEST_PATH):
+    """Downloads the datasets once and writes their instance IDs to the manifest."""
+    # Only needed to (re)build the manifest, so imported here
     try:
-        # Load Verified
-        print("Fetching princeton-nlp/SWE-bench_Verified...")
-        ds_verified = load_dataset("princeton-nlp/SWE-bench_Verified", split="test")
-        verified_ids = set(ds_verified["instance_id"])
-        print(f"Loaded {len(verified_ids)} Verified instances.")
-
-        # Load Lite
-        print("Fetching princeton-nlp/SWE-bench_Lite...")
-        ds_lite = load_dataset("princeton-nlp/SWE-bench_Lite", split="test")
-        lite_ids = set(ds_lite["instance_id"])
-        print(f"Loaded {len(lite_ids)} Lite instances.")
+        from datasets import load_dataset
+    except ImportError:
+        print("Error: 'datasets' library not found. Please run: pip install datasets")
+        sys.exit(1)
 
+    print("Loading datasets from Hugging Face...")
+    datasets = {}
+    try:
+        for name in MANIFEST_DATASETS:
+            print(f"Fetching {name}...")
+            ds = load_dataset(name, split=MANIFEST_SPLIT)
+            datasets[name] = sorted(set(ds["instance_id"]))
+            print(f"Loaded {len(datasets[name])} instances.")
     except Exception as e:
         print(f"Error loading datasets: {e}")
-        return
+        sys.exit(1)
+
+    manifest = {"version": MANIFEST_VERSION, "split": MANIFEST_SPLIT, "datasets": datasets}
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, path)
+    print(f"Wrote instance manifest to {path}")
+    return manifest
+
+def load_manifest(path=MANIFEST_PATH):
+    """The cached manifest, or None if it is missing, stale or for other datasets."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("split") != MANIFEST_SPLIT:
+        return None
+    if set(manifest.get("datasets", {})) != set(MANIFEST_DATASETS):
+        return None
+    return manifest
+
+# ============================================================
+# STREAMING FILTER
+# ============================================================
+
+def filter_jsonl(in_path, out_path, valid_ids):
+    """
+    Copies the lines of in_path whose instance_id is in valid_ids to out_path.
+    instance_id is read straight off the raw line, so the model_patch payload
+    is never decoded; truncated or invalid lines are dropped. Returns (kept,
+    original) line counts.
+    """
+    kept_count = 0
+    original_count = 0
+    tmp_path = out_path + ".tmp"
+
+    with open(in_path, 'rb') as fin, open(tmp_path, 'wb') as fout:
+        for line in fin:
+            line = line.strip()
+            if not line: continue
+            original_count += 1
+            if extract_instance_id(line) in valid_ids:
+                fout.write(line + b"\n")
+                kept_count += 1
+    os.replace(tmp_path, out_path)
+
+    return kept_count, original_count
+
+def _filter_job(job):
+    in_path, out_path, valid_ids = job
+    return filter_jsonl(in_path, out_path, valid_ids)
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep only SWE-bench Verified & Lite instances in agents_solution JSONL files.")
+    parser.add_argument("--refresh-manifest", action="store_true", help="Re-download the datasets and rebuild the instance manifest.")
+    parser.add_argument("--manifest", default=MANIFEST_PATH, help="Instance-ID manifest path.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (1 = sequential).")
+    args = parser.parse_args()
+
+    manifest = None if args.refresh_manifest else load_manifest(args.manifest)
+    if manifest is None:
+        manifest = build_manifest(args.manifest)
+    else:
+        print(f"Using cached instance manifest {args.manifest}")
+
+    verified_ids = set(manifest["datasets"]["princeton-nlp/SWE-bench_Verified"])
+    print(f"Loaded {len(verified_ids)} Verified instances.")
+    lite_ids = set(manifest["datasets"]["princeton-nlp/SWE-bench_Lite"])
+    print(f"Loaded {len(lite_ids)} Lite instances.")
 
     # Intersection (Should be Lite since Lite subset Verified)
     valid_ids = verified_ids.intersection(lite_ids)
     print(f"Intersection (Verified & Lite): {len(valid_ids)} instances.")
-    
+
     if not valid_ids:
         print("Warning: Intersection is empty! Proceeding to create empty files or abort?")
         # Just abort to be safe implies something went wrong
@@ -40,9 +120,8 @@ def main():
 
     # Paths - using absolute path from knowledge or relative to script location
     # User's path: c:\Users\naolt\Downloads\class projects\dkang\results
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    input_dir = os.path.join(base_dir, "agents_solution")
-    output_dir = os.path.join(base_dir, "filtered_agents_solution")
+    input_dir = os.path.join(BASE_DIR, "agents_solution")
+    output_dir = os.path.join(BASE_DIR, "filtered_agents_solution")
 
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
@@ -56,27 +135,11 @@ def main():
     print(f"Filtering JSONL files from {input_dir}...")
     files = [f for f in os.listdir(input_dir) if f.endswith(".jsonl")]
 
-    for filename in files:
-        in_path = os.path.join(input_dir, filename)
-        out_path = os.path.join(output_dir, filename)
-        
-        kept_count = 0
-        original_count = 0
-        
-        with open(in_path, 'r', encoding='utf-8') as fin, open(out_path, 'w', encoding='utf-8') as fout:
-            for line in fin:
-                line = line.strip()
-                if not line: continue
-                original_count += 1
-                try:
-                    record = json.loads(line)
-                    inst_id = record.get("instance_id")
-                    if inst_id in valid_ids:
-                        fout.write(line + "\n")
-                        kept_count += 1
-                except json.JSONDecodeError:
-                    continue
-        
+    # One file per job; counts come back in input order
+    jobs = [(os.path.join(input_dir, f), os.path.join(output_dir, f), valid_ids) for f in files]
+    counts = map_files(_filter_job, jobs, workers=args.workers)
+
+    for filename, (kept_count, original_count) in zip(files, counts):
         print(f"  {filename}: Kept {kept_count}/{original_count} instances.")
 
     print(f"Done. Filtered files saved to {output_dir}")
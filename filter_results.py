@@ -1,4 +1,6 @@
 import os
+import json
+import hashlib
 import shutil
 import re
 
@@ -11,6 +13,21 @@ def normalize_name(name):
     clean = re.sub(r'[+_\-.]', ' ', name.lower())
     return " ".join(clean.split())
 
+# Common model terms to ignore for fuzzy matching
+IGNORED_TOKENS = frozenset({
+    'gpt', 'claude', 'sonnet', 'opus', 'haiku', 'gemini', 'pro', 'flash', 'preview', 
+    'mini', 'turbo', '4', '3', '3.5', '5', '4o', 'o1', 'step', 'v1', 'v2', 'plus', 'tools'
+})
+
+# Persisted scraped-name -> wanted-agent decisions, next to the scraped files
+MATCH_CACHE_FILENAME = ".agent_match_cache.json"
+MATCH_CACHE_VERSION = 1
+
+def match_tokens(norm):
+    """Tokens is_match compares: ignored model terms dropped unless that leaves nothing."""
+    tokens = [t for t in norm.split() if t not in IGNORED_TOKENS]
+    return tokens or norm.split()
+
 def is_match(wanted_norm, scraped_norm):
     """
     Stricter Heuristic:
@@ -23,18 +40,10 @@ def is_match(wanted_norm, scraped_norm):
     if wanted_norm == scraped_norm:
         return True
     
-    # 0. Common model terms to ignore for fuzzy matching
-    ignored_tokens = {
-        'gpt', 'claude', 'sonnet', 'opus', 'haiku', 'gemini', 'pro', 'flash', 'preview', 
-        'mini', 'turbo', '4', '3', '3.5', '5', '4o', 'o1', 'step', 'v1', 'v2', 'plus', 'tools'
-    }
-
-    w_tokens = [t for t in wanted_norm.split() if t not in ignored_tokens]
-    s_tokens = [t for t in scraped_norm.split() if t not in ignored_tokens]
-
+    # 0. Common model terms (IGNORED_TOKENS) are dropped for fuzzy matching.
     # If all tokens were ignored (e.g. just "claude 4"), fall back to original tokens
-    if not w_tokens: w_tokens = wanted_norm.split()
-    if not s_tokens: s_tokens = scraped_norm.split()
+    w_tokens = match_tokens(wanted_norm)
+    s_tokens = match_tokens(scraped_norm)
     
     # 1. Primary Check: First token MUST match (or be very similar)
     # This prevents "Epam..." matching "Moatless..." just because of "claude"
@@ -61,6 +70,94 @@ def is_match(wanted_norm, scraped_norm):
         
     return False
 
+class AgentMatcher:
+    """
+    Resolves scraped agent names to wanted agents with is_match semantics
+    (first wanted agent in insertion order that matches) without comparing
+    against every wanted agent.
+
+    A fuzzy match needs at least one shared token, so candidates come from an
+    inverted index over match_tokens, narrowed to wanted agents whose first
+    token is compatible (equal or substring) via first-token buckets. The
+    survivors are confirmed with is_match. Decisions are memoized and can be
+    persisted; the cache is keyed on the wanted list, so it is dropped as
+    soon as the set of wanted agents changes.
+    """
+
+    def __init__(self, wanted_agents):
+        self.wanted = list(wanted_agents.items()) # [(norm, original)] in priority order
+        self.exact = {}
+        self.token_index = {}   # token -> [wanted idx]
+        self.first_buckets = {} # first token -> [wanted idx]
+        self._compatible_firsts = {}
+
+        for idx, (norm, _) in enumerate(self.wanted):
+            self.exact.setdefault(norm, idx)
+            tokens = match_tokens(norm)
+            for t in set(tokens):
+                self.token_index.setdefault(t, []).append(idx)
+            if tokens:
+                self.first_buckets.setdefault(tokens[0], []).append(idx)
+
+        self.fingerprint = hashlib.sha1(
+            json.dumps([MATCH_CACHE_VERSION, self.wanted]).encode("utf-8")
+        ).hexdigest()
+        self.decisions = {} # scraped norm -> wanted original or None
+
+    def _first_token_candidates(self, first):
+        """Wanted idx whose first token equals, contains or is contained in `first`."""
+        if first not in self._compatible_firsts:
+            idxs = set()
+            for w_first, bucket in self.first_buckets.items():
+                if w_first in first or first in w_first:
+                    idxs.update(bucket)
+            self._compatible_firsts[first] = idxs
+        return self._compatible_firsts[first]
+
+    def match(self, scraped_norm):
+        """Original name of the first wanted agent matching scraped_norm, or None."""
+        if scraped_norm in self.decisions:
+            return self.decisions[scraped_norm]
+
+        candidates = set()
+        if scraped_norm in self.exact:
+            candidates.add(self.exact[scraped_norm])
+
+        s_tokens = match_tokens(scraped_norm)
+        if s_tokens:
+            shared = set()
+            for t in set(s_tokens):
+                shared.update(self.token_index.get(t, ()))
+            candidates.update(shared & self._first_token_candidates(s_tokens[0]))
+
+        found = None
+        for idx in sorted(candidates):
+            wanted_norm, original_name = self.wanted[idx]
+            if is_match(wanted_norm, scraped_norm):
+                found = original_name
+                break
+
+        self.decisions[scraped_norm] = found
+        return found
+
+    def load_decisions(self, path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return
+        if cached.get("fingerprint") == self.fingerprint:
+            self.decisions.update(cached.get("decisions", {}))
+
+    def save_decisions(self, path):
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"fingerprint": self.fingerprint, "decisions": self.decisions}, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: Could not write match cache {path}: {e}", flush=True)
+
 def main():
     print("Starting Smart Result Filter...", flush=True)
     
@@ -101,6 +198,10 @@ def main():
     copied_count = 0
     matched_scraped_files = set()
     
+    matcher = AgentMatcher(wanted_agents)
+    match_cache_path = os.path.join(scraped_results_dir, MATCH_CACHE_FILENAME)
+    matcher.load_decisions(match_cache_path)
+    
     try:
         scraped_files = os.listdir(scraped_results_dir)
         
@@ -112,12 +213,8 @@ def main():
             agent_part = f[8:-5]
             scraped_norm = normalize_name(agent_part)
             
-            # Check against all wanted agents
-            match_found = None
-            for wanted_norm, original_name in wanted_agents.items():
-                if is_match(wanted_norm, scraped_norm):
-                    match_found = original_name
-                    break
+            # Indexed lookup; same result as trying every wanted agent with is_match
+            match_found = matcher.match(scraped_norm)
             
             if match_found:
                 # User wants to rename files to match local agent name
@@ -157,6 +254,7 @@ def main():
         print(f"Error: Directory {scraped_results_dir} not found.", flush=True)
         return
 
+    matcher.save_decisions(match_cache_path)
     print(f"\nFiltering completed. Copied {copied_count} files to '{output_dir}'.", flush=True)
 
 if __name__ == "__main__":
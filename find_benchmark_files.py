@@ -1,66 +1,185 @@
-
 import os
 import json
+import argparse
+import hashlib
+
+from filter_jsonl_hf import MANIFEST_PATH, load_manifest
+from group_runner import map_files
+from set_sketch import SetSketch, containment, jaccard
+from submission_scan import scan_submission
 
 RESULTS_DIR = r"c:\Users\naolt\Downloads\class projects\dkang\results\all_results"
 
+# Per-file scan results, kept next to the scanned files
+CATALOG_FILENAME = ".benchmark_catalog.json"
+CATALOG_VERSION = 3
+
+# Scans fan out to worker processes once at least this many files changed
+PARALLEL_SCAN_MIN_FILES = 8
+
+# Manifest match: this share of the file's IDs must belong to the benchmark
+MIN_CONTAINMENT = 0.98
+
 def count_instances_in_file(filepath):
+    # Collect all instance IDs from lists in the JSON
+    # Handle different schemas
+    # Schema 1: {"resolved": [...], "no_generation": [...]} (used in some files)
+    # Schema 2: {"instance_id": {...}, ...} (map logic)
+    return len(scan_submission(filepath).submitted_ids())
+
+def count_label(count):
+    # Check for interesting counts
+    # Lite ~ 300
+    # Verified ~ 500
+    # Full ~ 2294
+    if 290 <= count <= 310:
+        return "Likely Lite"
+    if 490 <= count <= 510:
+        return "Likely Verified"
+    # Just to see if we have full runs (> 1000) we would need a Full manifest
+    return None
+
+# ============================================================
+# CATALOG
+# ============================================================
+
+def _file_stamp(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+def _scan_entry(path):
+    scan = scan_submission(path)
+    submitted, resolved = scan.submitted_ids(), scan.resolved_ids()
+    return {
+        "schema": scan.schema,
+        "count": len(submitted),
+        "sketch": SetSketch.from_ids(submitted).to_json(),
+        "resolved_sketch": SetSketch.from_ids(resolved).to_json(),
+    }
+
+def load_catalog(path):
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Collect all instance IDs from lists in the JSON
-        instances = set()
-        
-        # Handle different schemas
-        # Schema 1: {"resolved": [...], "no_generation": [...]} (used in some files)
-        # Schema 2: {"instance_id": {...}, ...} (map logic)
-        
-        if isinstance(data, list):
-             # Some might be list of dicts?
-             pass
-        elif isinstance(data, dict):
-            for key, value in data.items():
-                if isinstance(value, list):
-                    # Likely a list of instance IDs
-                    for item in value:
-                        if isinstance(item, str) and "__" in item: # Heuristic for instance_id
-                            instances.add(item)
-                elif isinstance(value, dict):
-                    # Maybe {instance: {details...}}
-                    if "__" in key:
-                        instances.add(key)
-        
-        return len(instances)
-    except Exception as e:
-        return 0
+        with open(path, "r", encoding="utf-8") as f:
+            catalog = json.load(f)
+    except (OSError, ValueError):
+        return {"version": CATALOG_VERSION, "files": {}}
+    if catalog.get("version") != CATALOG_VERSION:
+        return {"version": CATALOG_VERSION, "files": {}}
+    return catalog
+
+def save_catalog(catalog, path):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(catalog, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Warning: Could not write catalog {path}: {e}")
+
+def update_catalog(results_dir, catalog, workers=None):
+    """Re-scans only files whose size/mtime changed; drops vanished ones. Returns the number scanned."""
+    files = sorted(f for f in os.listdir(results_dir) if f.endswith(".json") and not f.startswith("."))
+    entries = catalog["files"]
+
+    for fname in set(entries) - set(files):
+        del entries[fname]
+
+    stale = []
+    for f in files:
+        stamp = _file_stamp(os.path.join(results_dir, f))
+        if entries.get(f, {}).get("stamp") != stamp:
+            stale.append((f, stamp))
+
+    if len(stale) < PARALLEL_SCAN_MIN_FILES:
+        workers = 1
+    scanned = map_files(_scan_entry, [os.path.join(results_dir, f) for f, _ in stale], workers=workers)
+    for (f, stamp), entry in zip(stale, scanned):
+        entry["stamp"] = stamp
+        entries[f] = entry
+    return len(stale)
+
+# ============================================================
+# MANIFEST MATCHING
+# ============================================================
+
+def manifest_sketches(manifest):
+    """{benchmark name: SetSketch} plus a fingerprint of the manifest contents."""
+    sketches = {}
+    h = hashlib.sha1()
+    for name in sorted(manifest["datasets"]):
+        ids = manifest["datasets"][name]
+        sketches[name] = SetSketch.from_ids(ids)
+        h.update(json.dumps([name, sorted(ids)]).encode("utf-8"))
+    return sketches, h.hexdigest()
+
+def classify(entry, sketches):
+    """
+    Best benchmark for a file: highest Jaccard among those containing at least
+    MIN_CONTAINMENT of its IDs. Returns {"benchmark", "jaccard", "containment"} or None.
+    """
+    sketch = SetSketch.from_json(entry["sketch"])
+    best = None
+    for name, bench in sketches.items():
+        c = containment(sketch, bench)
+        if c < MIN_CONTAINMENT:
+            continue
+        j = jaccard(sketch, bench)
+        if best is None or j > best["jaccard"]:
+            best = {"benchmark": name, "jaccard": round(j, 4), "containment": round(c, 4)}
+    return best
 
 def main():
-    print(f"Scanning {RESULTS_DIR}...")
-    files = [f for f in os.listdir(RESULTS_DIR) if f.endswith(".json")]
-    
+    parser = argparse.ArgumentParser(description="Guess which SWE-bench split each results file covers.")
+    parser.add_argument("--results_dir", default=RESULTS_DIR, help="Directory of results_<agent>.json files.")
+    parser.add_argument("--manifest", default=MANIFEST_PATH, help="Instance-ID manifest (see filter_jsonl_hf.py).")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for scanning (1 = sequential).")
+    args = parser.parse_args()
+
+    print(f"Scanning {args.results_dir}...")
+    catalog_path = os.path.join(args.results_dir, CATALOG_FILENAME)
+    catalog = load_catalog(catalog_path)
+    n_scanned = update_catalog(args.results_dir, catalog, args.workers)
+    print(f"Scanned {n_scanned} new/changed file(s), {len(catalog['files']) - n_scanned} unchanged.")
+
+    # Manifest matches only depend on the stored sketches, so they are redone
+    # without reading any file when the manifest changes
+    manifest = load_manifest(args.manifest)
+    if manifest is not None:
+        sketches, fingerprint = manifest_sketches(manifest)
+        refresh_all = catalog.get("manifest") != fingerprint
+        for entry in catalog["files"].values():
+            if refresh_all or "match" not in entry:
+                entry["match"] = classify(entry, sketches)
+        catalog["manifest"] = fingerprint
+    save_catalog(catalog, catalog_path)
+
     candidates = []
-    
-    for f in files:
-        path = os.path.join(RESULTS_DIR, f)
-        count = count_instances_in_file(path)
-        
-        # Check for interesting counts
-        # Lite ~ 300
-        # Verified ~ 500
-        # Full ~ 2294
-        
-        if 290 <= count <= 310:
-            candidates.append((f, count, "Likely Lite"))
-        elif 490 <= count <= 510:
-            candidates.append((f, count, "Likely Verified"))
-        elif count > 1000:
-             # Just to see if we have full runs
-             pass
-             
+    for f, entry in sorted(catalog["files"].items()):
+        label = count_label(entry["count"])
+        if label:
+            candidates.append((f, entry["count"], label))
+
     print("\n--- POSIBLE DATASET DEFINITION FILES ---")
     for fname, count, label in candidates:
         print(f"{label}: {fname} ({count} instances)")
 
+    schemas = {}
+    for entry in catalog["files"].values():
+        schemas[entry["schema"]] = schemas.get(entry["schema"], 0) + 1
+    print("\n--- SCHEMA VARIANTS ---")
+    for schema, n in sorted(schemas.items()):
+        print(f"{schema}: {n} files")
+
+    if manifest is None:
+        print(f"\n(No instance manifest at {args.manifest}; run filter_jsonl_hf.py --refresh-manifest for benchmark matching.)")
+        return
+
+    print("\n--- MANIFEST MATCHES ---")
+    for f, entry in sorted(catalog["files"].items()):
+        match = entry.get("match")
+        if match:
+            print(f"{match['benchmark']}: {f} ({entry['count']} instances, "
+                  f"Jaccard {match['jaccard']:.3f}, containment {match['containment']:.3f})")
+
 if __name__ == "__main__":
     main()
@@ -1,78 +1,19 @@
-import json
-import os
 import re
 from collections import defaultdict
 
-RESULTS_DIR = r"c:\Users\naolt\Downloads\class projects\dkang\results\run_result"
-
-def load_json(filepath):
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error reading {filepath}: {e}")
-        return None
-
-def parse_filename(filename):
-    """
-    Parses the filename to extract Agent Name and TestGen LLM.
-    Handles 'gold_' and 'none_' special cases.
-    """
-    name_no_ext = os.path.splitext(filename)[0]
-    
-    if name_no_ext.startswith("gold_"):
-        return "GOLD", name_no_ext.replace("gold_", "")
-    if name_no_ext.startswith("none_"):
-        return "NONE", name_no_ext.replace("none_", "")
-    
-    # Pattern: [Agent]__[LLM]
-    # We need to be careful as Agent or LLM might contain underscores or other separators.
-    # Based on file list: "JoyCode__gpt-5.1-500-1.json" -> Agent: JoyCode, LLM: gpt-5.1-500-1
-    parts = name_no_ext.split("__")
-    if len(parts) == 2:
-        return parts[0], parts[1]
-    
-    # Fallback for complex names if standard split fails, or return as is
-    return name_no_ext, "Unknown"
+from meaningful_cache import load_meaningful_map
+import profiling
+from results_store import load_store, parse_filename, scan_results_dir
 
-def get_meaningful_tests(gold_data, none_data):
-    """
-    Identifies 'meaningful' tests for each instance.
-    Meaningful Test = (Resolved in Gold) - (Resolved in None)
-    Returns a dict: { instance_id: set(meaningful_test_names) }
-    """
-    meaningful_map = {}
-    
-    all_instances = set(gold_data.keys()) | set(none_data.keys())
-    
-    for instance_id in all_instances:
-        gold_resolved = set(gold_data.get(instance_id, {}).get("details", {}).get("resolved", []))
-        none_resolved = set(none_data.get(instance_id, {}).get("details", {}).get("resolved", []))
-        
-        # Meaningful = Gold resolved BUT None failed (or didn't resolve)
-        meaningful = gold_resolved - none_resolved
-        if meaningful:
-            meaningful_map[instance_id] = meaningful
-            
-    return meaningful_map
+RESULTS_DIR = r"c:\Users\naolt\Downloads\class projects\dkang\results\run_result"
 
+@profiling.profiled()
 def get_all_instance():
-    files = [f for f in os.listdir(RESULTS_DIR) if f.endswith(".json")]
+    store = load_store(RESULTS_DIR)
     # 1. Group files by LLM to find pairs
-    files_by_llm = defaultdict(list)
-    gold_files = {}
-    none_files = {}
+    files_by_llm, gold_files, none_files = scan_results_dir(RESULTS_DIR)
     union = set()
     
-    # Pre-scan to identify Gold/None baselines
-    for f in files:
-        agent, llm = parse_filename(f)
-        if agent == "GOLD":
-            gold_files[llm] = f
-        elif agent == "NONE":
-            none_files[llm] = f
-        else:
-            files_by_llm[llm].append(f)
     # 2. Analyze per LLM group
     for llm in files_by_llm:
         # print(f"\n{'='*80}")
@@ -109,10 +50,7 @@ def get_all_instance():
 
         # print(f"  Using Baseline: Gold='{gold_files[matched_gold_key]}' | None='{none_files[matched_none_key]}'")
         
-        gold_data = load_json(os.path.join(RESULTS_DIR, gold_files[matched_gold_key]))
-        none_data = load_json(os.path.join(RESULTS_DIR, none_files[matched_none_key]))
-        
-        meaningful_tests_map = get_meaningful_tests(gold_data, none_data)
+        meaningful_tests_map = load_meaningful_map(store, gold_files[matched_gold_key], none_files[matched_none_key])
         
         total_meaningful_instances = len(meaningful_tests_map)
         total_meaningful_tests_count = sum(len(tests) for tests in meaningful_tests_map.values())
@@ -125,23 +63,12 @@ def get_all_instance():
     print(len(union))
 
 
+@profiling.profiled()
 def analyze_results():
-    files = [f for f in os.listdir(RESULTS_DIR) if f.endswith(".json")]
-    
+    store = load_store(RESULTS_DIR)
+
     # 1. Group files by LLM to find pairs
-    files_by_llm = defaultdict(list)
-    gold_files = {}
-    none_files = {}
-    
-    # Pre-scan to identify Gold/None baselines
-    for f in files:
-        agent, llm = parse_filename(f)
-        if agent == "GOLD":
-            gold_files[llm] = f
-        elif agent == "NONE":
-            none_files[llm] = f
-        else:
-            files_by_llm[llm].append(f)
+    files_by_llm, gold_files, none_files = scan_results_dir(RESULTS_DIR)
 
     # 2. Analyze per LLM group
     for llm in files_by_llm:
@@ -179,10 +106,7 @@ def analyze_results():
 
         print(f"  Using Baseline: Gold='{gold_files[matched_gold_key]}' | None='{none_files[matched_none_key]}'")
         
-        gold_data = load_json(os.path.join(RESULTS_DIR, gold_files[matched_gold_key]))
-        none_data = load_json(os.path.join(RESULTS_DIR, none_files[matched_none_key]))
-        
-        meaningful_tests_map = get_meaningful_tests(gold_data, none_data)
+        meaningful_tests_map = load_meaningful_map(store, gold_files[matched_gold_key], none_files[matched_none_key])
         
         total_meaningful_instances = len(meaningful_tests_map)
         total_meaningful_tests_count = sum(len(tests) for tests in meaningful_tests_map.values())
@@ -199,17 +123,15 @@ def analyze_results():
 
         for filename in files_by_llm[llm]:
             agent_name, _ = parse_filename(filename)
-            filepath = os.path.join(RESULTS_DIR, filename)
-            data = load_json(filepath)
-            
-            if not data:
+            if not store.has(filename):
                 continue
+            agent_resolved_map = store.resolved_sets(filename)
 
             resolved_meaningful_count = 0
             resolved_meaningful_instances_count = 0
             
             for instance_id, needed_tests in meaningful_tests_map.items():
-                agent_resolved = set(data.get(instance_id, {}).get("details", {}).get("resolved", []))
+                agent_resolved = agent_resolved_map.get(instance_id, set())
                 
                 # Check which meaningful tests this agent resolved
                 solved_here = needed_tests.intersection(agent_resolved)
@@ -223,9 +145,7 @@ def analyze_results():
                     unique_solver_tracker[instance_id][t].append(agent_name)
 
             # Metadata stats
-            total_resolved_raw = 0
-            for k, v in data.items():
-                total_resolved_raw += v.get("n_resolved_tests", 0)
+            total_resolved_raw = sum(store.n_resolved(filename).values())
 
             stats = {
                 "Agent": agent_name,
@@ -0,0 +1,87 @@
+import io
+import os
+import sys
+import functools
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+
+import profiling
+
+# Worker processes for independent groups; 0/unset means one per CPU, 1 runs inline
+MAX_WORKERS = int(os.environ.get("ANALYSIS_WORKERS", "0")) or None
+
+
+def _group_tags(args):
+    """Profile tag for a group task: its first string argument (usually the LLM name)."""
+    for arg in args:
+        if isinstance(arg, str):
+            return {"group": arg}
+    return {}
+
+
+def _run_one(func, args):
+    with profiling.phase(func.__name__, **_group_tags(args)):
+        return func(*args)
+
+
+def _capture(func, args):
+    """Runs func(*args) in a worker, returning (result, everything it printed, profile records)."""
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        result = _run_one(func, args)
+    return result, buf.getvalue(), profiling.drain()
+
+
+def _collect(func, item):
+    return func(item), profiling.drain()
+
+
+def _worker_count(n_tasks, workers):
+    workers = workers or MAX_WORKERS or os.cpu_count() or 1
+    return max(1, min(workers, n_tasks))
+
+
+def run_groups(func, arg_tuples, workers=None):
+    """
+    Calls func(*args) for every args tuple, fanning out to a process pool.
+
+    Each call's printed output is captured in the worker and replayed here in
+    input order, so reports read exactly as a sequential run would. Returns
+    the results in input order. func must be a module-level function.
+    """
+    arg_tuples = list(arg_tuples)
+    n_workers = _worker_count(len(arg_tuples), workers)
+
+    if n_workers == 1:
+        return [_run_one(func, args) for args in arg_tuples]
+
+    results = []
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        futures = [pool.submit(_capture, func, args) for args in arg_tuples]
+        for future in futures:
+            result, text, profile = future.result()
+            profiling.merge(profile)
+            sys.stdout.write(text)
+            sys.stdout.flush()
+            results.append(result)
+    return results
+
+
+def map_files(func, items, workers=None):
+    """Order-preserving parallel map for per-file work (no output capture)."""
+    items = list(items)
+    n_workers = _worker_count(len(items), workers)
+
+    if n_workers == 1:
+        return [func(item) for item in items]
+
+    chunksize = max(1, len(items) // (4 * n_workers))
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        if not profiling.enabled():
+            return list(pool.map(func, items, chunksize=chunksize))
+        # Ship each worker's phase/file records back with its result
+        results = []
+        for result, profile in pool.map(functools.partial(_collect, func), items, chunksize=chunksize):
+            profiling.merge(profile)
+            results.append(result)
+        return results
@@ -0,0 +1,360 @@
+import os
+import sys
+import json
+import argparse
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Creation year of every SWE-bench instance, cached locally so slicing runs offline
+YEARS_PATH = os.path.join(BASE_DIR, "swebench_instance_years.json")
+YEARS_VERSION = 1
+YEARS_DATASETS = ("princeton-nlp/SWE-bench_Verified", "princeton-nlp/SWE-bench")
+YEARS_SPLIT = "test"
+
+# Leaderboard submissions (<exp>/results/results.json + resolved_by_time.json)
+# the years are derived from when the cache is built
+LEADERBOARD_DIRS = tuple(
+    os.path.join(BASE_DIR, clone, "evaluation", "verified")
+    for clone in ("temp_experiments_clone_v2", "temp_experiments_clone")
+)
+# Random restarts of the year-boundary fit before giving up on a year
+FIT_RESTARTS = 20
+
+SLICE_KINDS = ("repo", "year")
+# Slice of instances whose key is not known (e.g. no cached creation year)
+UNKNOWN = "unknown"
+
+
+def repo_of(instance_id):
+    """'django__django-11790' -> 'django/django' (the leaderboard's resolved_by_repo keys)."""
+    return instance_id.rsplit("-", 1)[0].replace("__", "/", 1)
+
+
+# ============================================================
+# YEARS FROM THE LEADERBOARD
+# ============================================================
+
+def _pr_number(instance_id):
+    return int(instance_id.rsplit("-", 1)[1])
+
+
+def _read_submissions(dirs):
+    """(instance IDs, [(resolved IDs, {year: {"resolved", "total"}})]) of every leaderboard submission found."""
+    ids = set()
+    submissions = {}
+    for root in dirs:
+        try:
+            names = sorted(os.listdir(root))
+        except OSError:
+            continue
+        for name in names:
+            results_dir = os.path.join(root, name, "results")
+            try:
+                with open(os.path.join(results_dir, "results.json"), "r", encoding="utf-8") as f:
+                    results = json.load(f)
+                with open(os.path.join(results_dir, "resolved_by_time.json"), "r", encoding="utf-8") as f:
+                    by_time = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if not isinstance(results, dict) or not isinstance(by_time, dict):
+                continue
+            for values in results.values():
+                if isinstance(values, list):
+                    ids.update(v for v in values if isinstance(v, str) and "__" in v)
+            # The same experiment can sit in both clones
+            submissions.setdefault(name, (set(results.get("resolved", [])), by_time))
+    return ids, list(submissions.values())
+
+
+def _fit_cuts(prefix, target, rng):
+    """
+    Per-repo cut k_r with sum_r prefix[r][k_r] == target, or None.
+
+    Coordinate descent on the squared error, then joint moves over every
+    pair of repos to escape local minima, from random starts.
+    """
+    repos = list(prefix)
+    for _ in range(FIT_RESTARTS):
+        cut = {r: int(rng.integers(0, len(prefix[r]))) for r in repos}
+        acc = sum(prefix[r][cut[r]] for r in repos)
+        improved = True
+        while improved:
+            improved = False
+            for r in repos:
+                rest = acc - prefix[r][cut[r]]
+                err = ((rest + prefix[r] - target) ** 2).sum(axis=1)
+                best = int(err.argmin())
+                if err[best] < err[cut[r]]:
+                    cut[r], acc, improved = best, rest + prefix[r][best], True
+            if improved:
+                continue
+            base = int(((acc - target) ** 2).sum())
+            for i, r1 in enumerate(repos):
+                for r2 in repos[i + 1:]:
+                    if not base:
+                        break
+                    rest = acc - prefix[r1][cut[r1]] - prefix[r2][cut[r2]] - target
+                    err = ((rest + prefix[r1][:, None, :] + prefix[r2][None, :, :]) ** 2).sum(axis=2)
+                    k1, k2 = np.unravel_index(int(err.argmin()), err.shape)
+                    if err[k1, k2] < base:
+                        cut[r1], cut[r2], base, improved = int(k1), int(k2), int(err[k1, k2]), True
+                        acc = rest + target + prefix[r1][k1] + prefix[r2][k2]
+        if not ((acc - target) ** 2).sum():
+            return cut
+    return None
+
+
+def _cut_ranges(prefix, target, cut):
+    """{repo: (lowest, highest) cut} over the exact fits reachable by moving one or two cuts."""
+    repos = list(prefix)
+    ranges = {r: (cut[r], cut[r]) for r in repos}
+    acc = sum(prefix[r][cut[r]] for r in repos)
+    for i, r1 in enumerate(repos):
+        for r2 in repos[i + 1:]:
+            rest = acc - prefix[r1][cut[r1]] - prefix[r2][cut[r2]] - target
+            exact = ~(rest + prefix[r1][:, None, :] + prefix[r2][None, :, :]).any(axis=2)
+            for r, ks in ((r1, exact.any(axis=1).nonzero()[0]), (r2, exact.any(axis=0).nonzero()[0])):
+                lo, hi = ranges[r]
+                ranges[r] = (min(lo, int(ks.min())), max(hi, int(ks.max())))
+    return ranges
+
+
+def derive_years(dirs=LEADERBOARD_DIRS):
+    """
+    {instance_id: creation year} of the SWE-bench Verified instances,
+    derived from the leaderboard submissions in the tree; None if they
+    do not pin the years down (or NumPy is missing).
+
+    A repo's PR numbers grow with creation time, so the instances created
+    up to year Y are a prefix of each repo's instances in PR order. Every
+    submission's resolved_by_time.json gives how many of its resolved
+    instances fall in each year, so each year boundary is the set of
+    per-repo cuts that reproduces all those counts at once. Instances
+    whose year differs between equally exact fits are left out (their
+    slice is UNKNOWN).
+    """
+    if np is None:
+        return None
+    ids, submissions = _read_submissions(dirs)
+    if not ids:
+        return None
+
+    # Verified-shaped submissions with self-consistent counts, all on the most common per-year totals
+    usable = [
+        (resolved, by_time) for resolved, by_time in submissions
+        if sum(v.get("total", 0) for v in by_time.values()) == len(ids)
+        and sum(v.get("resolved", 0) for v in by_time.values()) == len(resolved)
+    ]
+    if not usable:
+        return None
+    totals = {}
+    for _, by_time in usable:
+        key = json.dumps({y: v["total"] for y, v in by_time.items() if v["total"]}, sort_keys=True)
+        totals[key] = totals.get(key, 0) + 1
+    year_totals = json.loads(max(totals, key=lambda k: (totals[k], k)))
+    usable = [(res, bt) for res, bt in usable if {y: v["total"] for y, v in bt.items() if v["total"]} == year_totals]
+    years = sorted(year_totals)
+
+    repos = {}
+    for inst in sorted(ids, key=lambda i: (repo_of(i), _pr_number(i))):
+        repos.setdefault(repo_of(inst), []).append(inst)
+
+    # prefix[r][k] = (k, resolved count of each submission among the repo's first k instances)
+    prefix = {}
+    for repo, instances in repos.items():
+        rows = np.zeros((len(instances) + 1, 1 + len(usable)), dtype=np.int64)
+        for k, inst in enumerate(instances):
+            rows[k + 1] = rows[k]
+            rows[k + 1, 0] += 1
+            for s, (resolved, _) in enumerate(usable):
+                if inst in resolved:
+                    rows[k + 1, 1 + s] += 1
+        prefix[repo] = rows
+
+    rng = np.random.default_rng(0)
+    target = np.zeros(1 + len(usable), dtype=np.int64)
+    bounds = []  # per year: {repo: (lowest, highest) cut}
+    for year in years:
+        target = target + np.array([year_totals[year]] + [bt.get(year, {}).get("resolved", 0) for _, bt in usable])
+        cut = _fit_cuts(prefix, target, rng)
+        if cut is None:
+            return None
+        bounds.append(_cut_ranges(prefix, target, cut))
+
+    derived = {}
+    for repo, instances in repos.items():
+        for pos, inst in enumerate(instances):
+            # Ambiguous when some boundary may fall on either side of it
+            if any(lo <= pos < hi for lo, hi in (b[repo] for b in bounds)):
+                continue
+            derived[inst] = next(year for year, b in zip(years, bounds) if pos < b[repo][0])
+    return derived
+
+
+# ============================================================
+# CREATION-YEAR CACHE
+# ============================================================
+
+def _write_years(cache, path):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+    print(f"Wrote creation years to {path}")
+
+
+def build_years(path=YEARS_PATH, download=False):
+    """
+    Writes {instance_id: creation year} to the cache: derived from the
+    leaderboard submissions in the tree, or downloaded from the datasets
+    when that fails (or download is set).
+    """
+    if not download:
+        years = derive_years()
+        if years is not None:
+            print(f"Derived creation years of {len(years)} instances from the leaderboard submissions.")
+            _write_years({"version": YEARS_VERSION, "split": YEARS_SPLIT, "source": "leaderboard", "years": years}, path)
+            return years
+        print("Could not derive creation years from the leaderboard submissions; downloading the datasets.")
+
+    # Only needed to download the years, so imported here
+    try:
+        from datasets import load_dataset
+    except ImportError:
+        print("Error: 'datasets' library not found. Please run: pip install datasets")
+        sys.exit(1)
+
+    years = {}
+    for name in YEARS_DATASETS:
+        print(f"Fetching {name}...")
+        ds = load_dataset(name, split=YEARS_SPLIT)
+        for inst, created in zip(ds["instance_id"], ds["created_at"]):
+            years.setdefault(inst, str(created)[:4])
+    print(f"Loaded creation years of {len(years)} instances.")
+
+    _write_years({"version": YEARS_VERSION, "split": YEARS_SPLIT, "source": "datasets",
+                  "datasets": list(YEARS_DATASETS), "years": years}, path)
+    return years
+
+
+def load_years(path=YEARS_PATH):
+    """The cached {instance_id: year}, or None if it is missing or stale."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cache.get("version") != YEARS_VERSION or cache.get("split") != YEARS_SPLIT:
+        return None
+    return cache.get("years")
+
+
+# ============================================================
+# SLICE INDEX
+# ============================================================
+
+class SliceIndex:
+    """
+    instance_id -> slice key ("django/django", "2019", ...) for one slice kind.
+
+    Keys are derived once per instance and memoized, so every report slices
+    the per-instance vectors and bitsets it already has with dict lookups
+    instead of re-reading or re-filtering any file.
+    """
+
+    def __init__(self, kind, years=None):
+        if kind not in SLICE_KINDS:
+            raise ValueError(f"Unknown slice kind {kind!r} (expected one of {SLICE_KINDS})")
+        self.kind = kind
+        self.years = years or {}
+        self._keys = {}
+
+    def key(self, instance_id):
+        key = self._keys.get(instance_id)
+        if key is None:
+            if self.kind == "repo":
+                key = repo_of(instance_id)
+            else:
+                key = self.years.get(instance_id, UNKNOWN)
+            self._keys[instance_id] = key
+        return key
+
+    def order(self, keys):
+        """Slice keys in display order: sorted, with UNKNOWN last."""
+        return sorted(set(keys), key=lambda k: (k == UNKNOWN, k))
+
+    # ---------------------------- grouped reductions ----------------------------
+
+    def count_by(self, instances):
+        """{slice: number of instances}."""
+        counts = {}
+        for inst in instances:
+            key = self.key(inst)
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def sum_by(self, instances, values):
+        """{slice: sum of a per-instance vector aligned with instances}."""
+        sums = {}
+        for inst, value in zip(instances, values):
+            key = self.key(inst)
+            sums[key] = sums.get(key, 0) + value
+        return sums
+
+    def mask_by(self, instances, masks):
+        """{slice: OR of per-instance bitsets aligned with instances}."""
+        out = {}
+        for inst, mask in zip(instances, masks):
+            key = self.key(inst)
+            out[key] = out.get(key, 0) | mask
+        return out
+
+
+_indexes = {}  # kind -> SliceIndex
+
+def slice_index(kind):
+    """The process-wide SliceIndex of a kind; the year cache is read (or derived) on first use."""
+    if kind not in _indexes:
+        years = None
+        if kind == "year":
+            years = load_years()
+            if years is None:
+                years = derive_years()
+                if years is None:
+                    print(f"  [NOTE] No cached creation years at {YEARS_PATH} and none derivable from the leaderboard; "
+                          f"every instance slices as '{UNKNOWN}' (run instance_slices.py --refresh-years --download).")
+                else:
+                    try:
+                        _write_years({"version": YEARS_VERSION, "split": YEARS_SPLIT, "source": "leaderboard", "years": years}, YEARS_PATH)
+                    except OSError as e:
+                        print(f"Warning: Could not write creation years {YEARS_PATH}: {e}")
+        _indexes[kind] = SliceIndex(kind, years)
+    return _indexes[kind]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the instance creation-year cache used for year slicing.")
+    parser.add_argument("--refresh-years", action="store_true", help="Rebuild the cache.")
+    parser.add_argument("--download", action="store_true", help="Download the years from the datasets instead of deriving them from the leaderboard.")
+    parser.add_argument("--years", default=YEARS_PATH, help="Creation-year cache path.")
+    args = parser.parse_args()
+
+    years = None if args.refresh_years else load_years(args.years)
+    if years is None:
+        years = build_years(args.years, download=args.download)
+    else:
+        print(f"Using cached creation years {args.years}")
+
+    index = SliceIndex("year", years)
+    counts = index.count_by(years)
+    for year in index.order(counts):
+        print(f"  {year}: {counts[year]} instances")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+import os
+import json
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Force a decoder (msgspec / orjson / json); unset picks the fastest installed one
+BACKEND_ENV = "ANALYSIS_JSON_BACKEND"
+
+# Read size of the iterative decoder
+CHUNK_SIZE = 1 << 20
+
+# run_result "details" lists, in the order of results_store.OUTCOME_KEYS
+RUN_OUTCOMES = ("resolved", "unresolved", "missing")
+
+
+# ============================================================
+# BACKEND SELECTION
+# ============================================================
+
+def _available():
+    names = []
+    if msgspec is not None:
+        names.append("msgspec")
+    if orjson is not None:
+        names.append("orjson")
+    names.append("json")
+    return names
+
+
+def _pick_backend():
+    wanted = os.environ.get(BACKEND_ENV)
+    available = _available()
+    return wanted if wanted in available else available[0]
+
+
+BACKEND = _pick_backend()
+
+if BACKEND == "msgspec":
+    _fast_loads = msgspec.json.decode
+    _fast_errors = (msgspec.DecodeError,)
+elif BACKEND == "orjson":
+    _fast_loads = orjson.loads
+    _fast_errors = (orjson.JSONDecodeError,)
+else:
+    _fast_loads = json.loads
+    _fast_errors = ()
+
+
+# ============================================================
+# WHOLE-DOCUMENT DECODING
+# ============================================================
+
+def loads(data):
+    """
+    Decodes a JSON document (bytes or str) with the active backend.
+
+    Anything the fast decoder rejects (NaN, integers beyond 64 bits, ...) is
+    retried with the stdlib, so results and errors match json.loads.
+    """
+    if _fast_errors:
+        try:
+            return _fast_loads(data)
+        except _fast_errors:
+            pass
+    return json.loads(data)
+
+
+def load_path(path):
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+# ============================================================
+# ITERATIVE DECODING
+# ============================================================
+
+def iter_items(path):
+    """
+    Yields the (key, value) pairs of a top-level JSON object one at a time,
+    holding only the current value and a read buffer in memory.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf = ""
+        pos = 0
+        eof = False
+
+        def fill():
+            nonlocal buf, pos, eof
+            chunk = f.read(CHUNK_SIZE)
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            pos = 0
+
+        def skip_ws():
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in " \t\r\n":
+                    pos += 1
+                if pos < len(buf) or eof:
+                    return
+                fill()
+
+        def expect(chars):
+            nonlocal pos
+            skip_ws()
+            if pos >= len(buf) or buf[pos] not in chars:
+                raise ValueError(f"Expected one of {chars!r} in {path}")
+            pos += 1
+            return buf[pos - 1]
+
+        def value():
+            # A value cut by the end of the buffer may still decode (e.g. "2.5" of
+            # "2.5e3"), so it only counts once a delimiter follows it in the buffer
+            nonlocal pos
+            skip_ws()
+            while True:
+                try:
+                    obj, end = decoder.raw_decode(buf, pos)
+                    nxt = end
+                    while nxt < len(buf) and buf[nxt] in " \t\r\n":
+                        nxt += 1
+                    if eof or (nxt < len(buf) and buf[nxt] in ",:}"):
+                        pos = end
+                        return obj
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                fill()
+
+        fill()
+        expect("{")
+        skip_ws()
+        if buf[pos:pos + 1] == "}":
+            return
+        while True:
+            key = value()
+            if not isinstance(key, str):
+                raise ValueError(f"Object key is not a string in {path}")
+            expect(":")
+            yield key, value()
+            if expect(",}") == "}":
+                break
+        skip_ws()
+        if pos < len(buf):
+            raise ValueError(f"Extra data after the top-level object in {path}")
+
+
+# ============================================================
+# TYPED RUN_RESULT DECODING
+# ============================================================
+
+def _normalize_entry(info):
+    details = info.get("details") or {}
+    return info.get("n_resolved_tests", 0), tuple(details.get(key, []) for key in RUN_OUTCOMES)
+
+
+if msgspec is not None:
+    class _RunDetails(msgspec.Struct):
+        resolved: list[str] = msgspec.field(default_factory=list)
+        unresolved: list[str] = msgspec.field(default_factory=list)
+        missing: list[str] = msgspec.field(default_factory=list)
+
+    class _RunEntry(msgspec.Struct):
+        n_resolved_tests: int = 0
+        details: _RunDetails = msgspec.field(default_factory=_RunDetails)
+
+    _run_decoder = msgspec.json.Decoder(dict[str, _RunEntry])
+
+    def _decode_run_typed(data):
+        return {
+            inst: (e.n_resolved_tests, (e.details.resolved, e.details.unresolved, e.details.missing))
+            for inst, e in _run_decoder.decode(data).items()
+        }
+else:
+    _decode_run_typed = None
+
+
+def iter_run_result(path):
+    """Streams a run_result file as (instance_id, (n_resolved_tests, (resolved, unresolved, missing))) pairs."""
+    for inst, info in iter_items(path):
+        yield inst, _normalize_entry(info)
+
+
+def load_run_result(path):
+    """
+    Decodes a run_result file into {instance_id: (n_resolved_tests, (resolved,
+    unresolved, missing))}; absent fields become 0 / [].
+
+    With msgspec the per-instance schema is decoded straight into typed
+    structs; files that do not fit it, and other backends, go through plain
+    dicts.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if _decode_run_typed is not None and BACKEND == "msgspec":
+        try:
+            return _decode_run_typed(data)
+        except msgspec.DecodeError:
+            pass
+    return {inst: _normalize_entry(info) for inst, info in loads(data).items()}
+
+if __name__ == "__main__":
+    print(f"JSON backend: {BACKEND} (available: {', '.join(_available())})")
@@ -0,0 +1,47 @@
+import os
+import json
+
+# Write buffer for streamed JSONL outputs
+BUFFER_SIZE = 1 << 20
+
+
+class AtomicJsonlWriter:
+    """
+    Streams JSON records, one per line, into <path>.tmp and renames it over
+    <path> only when the block exits cleanly. A crash or exception mid-run
+    leaves the previous file untouched instead of a truncated one.
+
+        with AtomicJsonlWriter(path) as out:
+            out.write(record)
+    """
+
+    def __init__(self, path, buffer_size=BUFFER_SIZE):
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        self.buffer_size = buffer_size
+        self.count = 0
+        self._f = None
+
+    def __enter__(self):
+        self._f = open(self.tmp_path, "w", encoding="utf-8", buffering=self.buffer_size)
+        return self
+
+    def write(self, record):
+        self._f.write(json.dumps(record) + "\n")
+        self.count += 1
+
+    def __exit__(self, exc_type, exc, tb):
+        f, self._f = self._f, None
+        if exc_type is not None:
+            f.close()
+            try:
+                os.remove(self.tmp_path)
+            except OSError:
+                pass
+            return False
+
+        f.flush()
+        os.fsync(f.fileno())
+        f.close()
+        os.replace(self.tmp_path, self.path)
+        return False
@@ -0,0 +1,196 @@
+from instance_slices import slice_index
+from meaningful_cache import get_meaningful_tests, load_meaningful_map
+from results_store import match_baseline_key, parse_filename
+from solve_matrix import build_regression_matrix, build_solve_matrix, column_index, solve_row
+
+# A meaningful test solved by fewer than this share of agents is "hard"
+HARD_SOLVE_RATE = 0.2
+
+
+# ============================================================
+# SHARED PER-LLM MODEL
+# ============================================================
+
+class LLMGroup:
+    """
+    Everything the reports need about one TestGen LLM group, built once.
+
+    The baseline match and meaningful map are computed up front; resolved
+    bitmaps, the solve matrix and the derived count/difficulty data are built
+    on first use and then shared by every report that runs on the group.
+
+    Test names are interned once per group: each instance's tests get small
+    bit positions shared by every file of the group, so a file's per-instance
+    resolved set is a single int and set operations are integer ops.
+    """
+
+    def __init__(self, store, llm, filenames, gold_file, none_file):
+        self.store = store
+        self.llm = llm
+        self.filenames = list(filenames)
+        self.gold_file = gold_file
+        self.none_file = none_file
+        self.agent_files = [(parse_filename(f)[0], f) for f in filenames]
+
+        if store.has(gold_file) and store.has(none_file):
+            self.meaningful_map = load_meaningful_map(store, gold_file, none_file)
+        else:
+            self.meaningful_map = get_meaningful_tests(self.resolved(gold_file), self.resolved(none_file))
+        self.total_meaningful = sum(len(t) for t in self.meaningful_map.values())
+
+        self._test_bits = {}  # instance_id -> {interned test: bit}
+        # Meaningful tests are encoded first so they take the lowest bits
+        self.meaningful_bits = {
+            inst: self._encode(inst, sorted(store.lookup_test(t) for t in tests))
+            for inst, tests in self.meaningful_map.items()
+        }
+
+        self._resolved = {}
+        self._bit_of = None
+        self._matrix = None
+        self._counts = None
+        self._masks = None
+        self._slice_masks = {}
+        self._regressions = None
+        # Report-specific data derived from the group (e.g. the correlation sweep),
+        # shared by every report that runs on it; cleared when an agent file changes
+        self.derived = {}
+
+    def _encode(self, inst, test_ids):
+        table = self._test_bits.setdefault(inst, {})
+        mask = 0
+        for t in test_ids:
+            bit = table.get(t)
+            if bit is None:
+                bit = table[t] = len(table)
+            mask |= 1 << bit
+        return mask
+
+    def resolved(self, filename):
+        """{instance_id: set(resolved test names)} for a file, {} if it is not in the store."""
+        return self.store.resolved_sets(filename) if self.store.has(filename) else {}
+
+    def resolved_bits(self, filename):
+        """{instance_id: resolved-test bitmap} for a file, {} if it is not in the store."""
+        if filename not in self._resolved:
+            runs = self.store.outcome_ids(filename) if self.store.has(filename) else {}
+            self._resolved[filename] = {inst: self._encode(inst, run) for inst, run in runs.items()}
+        return self._resolved[filename]
+
+    def test_names(self, inst, mask):
+        """Decodes an instance bitmap back into test names."""
+        tests = self.store.tests
+        return {tests[t] for t, bit in self._test_bits.get(inst, {}).items() if mask >> bit & 1}
+
+    @property
+    def matrix(self):
+        """Agent x meaningful-test SolveMatrix (files missing from the store are skipped)."""
+        if self._matrix is None:
+            self._matrix = build_solve_matrix(self.store, self.meaningful_map, self.agent_files)
+        return self._matrix
+
+    @property
+    def counts(self):
+        """agents x instances meaningful tests solved, aligned with matrix.agents/instances."""
+        if self._counts is None:
+            self._counts = self.matrix.count_matrix()
+        return self._counts
+
+    def difficulty_masks(self):
+        """(hard_mask, unique_mask) bitsets over the matrix columns."""
+        if self._masks is None:
+            matrix = self.matrix
+            possible_agents = len(matrix.agents)
+            solve_counts = [0] * len(matrix.columns) # bit -> number of agents
+            for row in matrix.rows:
+                for bit in matrix.bits(row):
+                    solve_counts[bit] += 1
+
+            hard_mask = unique_mask = 0
+            for bit, count in enumerate(solve_counts):
+                if count == 1:
+                    unique_mask |= 1 << bit
+                if count and (count / possible_agents) < HARD_SOLVE_RATE:
+                    hard_mask |= 1 << bit
+            self._masks = (hard_mask, unique_mask)
+        return self._masks
+
+    def slice_masks(self, kind):
+        """
+        {slice key: bitset of its matrix columns} for "repo" or "year" slices.
+        The meaningful columns never change, so this is built once per group.
+        """
+        if kind not in self._slice_masks:
+            matrix = self.matrix
+            self._slice_masks[kind] = slice_index(kind).mask_by(matrix.instances, matrix.instance_masks)
+        return self._slice_masks[kind]
+
+    @property
+    def regressions(self):
+        """Agent x None-passed-test RegressionMatrix (files missing from the store are skipped)."""
+        if self._regressions is None:
+            self._regressions = build_regression_matrix(self.store, self.resolved(self.none_file), self.agent_files)
+        return self._regressions
+
+    # ---------------------------- incremental updates ----------------------------
+
+    def update_agent_file(self, filename):
+        """
+        Re-reads one agent file (new or changed in the store) into what is
+        already built: its resolved bitmaps, matrix row and count row. The
+        difficulty masks are rebuilt on next use. Returns the agent's matrix
+        row index, or None if the file is not in the store.
+        """
+        if not self.store.has(filename):
+            self.remove_agent_file(filename)
+            return None
+
+        agent = parse_filename(filename)[0]
+        if filename not in self.filenames:
+            self.filenames.append(filename)
+            self.agent_files.append((agent, filename))
+        self._resolved.pop(filename, None)
+        self._masks = None
+        self.derived.clear()
+        if self._regressions is not None:
+            self._regressions.set_agent(agent, filename)
+
+        if self._matrix is None:
+            return self.matrix.agents.index(agent)
+
+        if self._bit_of is None:
+            self._bit_of = column_index(self.store, self._matrix)
+        row = solve_row(self.store, filename, self._bit_of, self._matrix.n_bytes)
+        idx = self._matrix.set_agent(agent, row)
+        if self._counts is not None:
+            row_counts = self._matrix.instance_counts(row)
+            if idx < len(self._counts):
+                self._counts[idx] = row_counts
+            else:
+                self._counts.append(row_counts)
+        return idx
+
+    def remove_agent_file(self, filename):
+        agent = parse_filename(filename)[0]
+        if filename in self.filenames:
+            self.filenames.remove(filename)
+            self.agent_files.remove((agent, filename))
+        self._resolved.pop(filename, None)
+        self._masks = None
+        self.derived.clear()
+        if self._regressions is not None:
+            self._regressions.remove_agent(agent)
+
+        if self._matrix is not None:
+            idx = self._matrix.remove_agent(agent)
+            if idx is not None and self._counts is not None:
+                del self._counts[idx]
+
+
+def load_llm_group(store, llm, filenames, gold_files, none_files):
+    """Matches the group's Gold/None baselines; returns an LLMGroup, or None if either is missing."""
+    gold_key = match_baseline_key(llm, gold_files)
+    none_key = match_baseline_key(llm, none_files)
+    if not gold_key or not none_key:
+        return None
+    return LLMGroup(store, llm, filenames, gold_files[gold_key], none_files[none_key])
@@ -0,0 +1,118 @@
+import os
+import json
+import hashlib
+
+import profiling
+from json_backend import load_path
+
+CACHE_VERSION = 2
+CACHE_DIRNAME = "meaningful_tests"
+
+
+# ============================================================
+# MEANINGFUL TESTS
+# ============================================================
+
+def get_meaningful_tests(gold_resolved, none_resolved):
+    """
+    Identifies 'meaningful' tests for each instance.
+    Meaningful Test = (Resolved in Gold) - (Resolved in None)
+    Takes { instance_id: set(resolved_tests) } maps for the two baselines.
+    Returns a dict: { instance_id: set(meaningful_test_names) }
+    """
+    meaningful_map = {}
+    for instance_id in sorted(set(gold_resolved) | set(none_resolved)):
+        # Meaningful = Gold resolved BUT None failed (or didn't resolve)
+        meaningful = gold_resolved.get(instance_id, set()) - none_resolved.get(instance_id, set())
+        if meaningful:
+            meaningful_map[instance_id] = meaningful
+    return meaningful_map
+
+
+# ============================================================
+# CACHE HELPERS
+# ============================================================
+
+def _file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+            profiling.add_bytes(len(block))
+    return h.hexdigest()
+
+
+def _baseline_hash(store, filename, cached):
+    """Content hash of a baseline file, reusing the cached one while size/mtime are unchanged."""
+    stamp = list(store.files[filename]["stamp"])
+    if cached and cached.get("file") == filename and cached.get("stamp") == stamp:
+        return cached
+    path = os.path.join(store.results_dir, filename)
+    return {"file": filename, "stamp": stamp, "sha256": _file_sha256(path)}
+
+
+def cache_path(results_dir, gold_file, none_file):
+    gold_stem = os.path.splitext(gold_file)[0]
+    none_stem = os.path.splitext(none_file)[0]
+    return os.path.join(results_dir, CACHE_DIRNAME, f".cache.{gold_stem}.{none_stem}.json")
+
+
+def _read_cache(path):
+    try:
+        cache = load_path(path)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Warning: Ignoring unreadable meaningful-test cache {path}: {e}")
+        return None
+    return cache if cache.get("version") == CACHE_VERSION else None
+
+
+def _write_cache(cache, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, path)
+
+
+# ============================================================
+# CACHED LOOKUP
+# ============================================================
+
+@profiling.profiled()
+def load_meaningful_map(store, gold_file, none_file):
+    """
+    Meaningful-test map for a gold/none baseline pair, cached in
+    <results_dir>/meaningful_tests and keyed by the content hash of both files.
+
+    An unchanged pair is served straight from the cache; when either baseline
+    changes, the map is recomputed in full.
+    """
+    snapshot_map = store.cached_meaningful(gold_file, none_file)
+    if snapshot_map is not None:
+        return snapshot_map
+
+    path = cache_path(store.results_dir, gold_file, none_file)
+    cache = _read_cache(path) or {"version": CACHE_VERSION, "gold": None, "none": None, "instances": {}}
+
+    gold_hash = _baseline_hash(store, gold_file, cache["gold"])
+    none_hash = _baseline_hash(store, none_file, cache["none"])
+    hashes_match = (
+        cache["gold"] is not None and cache["none"] is not None
+        and cache["gold"]["sha256"] == gold_hash["sha256"]
+        and cache["none"]["sha256"] == none_hash["sha256"]
+    )
+
+    if not hashes_match:
+        meaningful_map = get_meaningful_tests(store.resolved_sets(gold_file), store.resolved_sets(none_file))
+        cache["instances"] = {inst: sorted(tests) for inst, tests in meaningful_map.items()}
+
+    if not hashes_match or cache["gold"] != gold_hash or cache["none"] != none_hash:
+        cache["gold"], cache["none"] = gold_hash, none_hash
+        try:
+            _write_cache(cache, path)
+        except OSError as e:
+            print(f"Warning: Could not write meaningful-test cache {path}: {e}")
+
+    return {inst: set(tests) for inst, tests in cache["instances"].items()}
@@ -0,0 +1,243 @@
+import os
+import sys
+import json
+import time
+import atexit
+import functools
+import contextlib
+
+# Set to a trace path (e.g. ANALYSIS_PROFILE=trace.json) to profile any entry point
+PROFILE_ENV = "ANALYSIS_PROFILE"
+# pid of the process that owns the trace; worker processes only collect
+OWNER_ENV = "ANALYSIS_PROFILE_OWNER"
+
+FOLDED_SUFFIX = ".folded"
+SUMMARY_TOP = 10
+
+_enabled = False
+_path = None
+_owner = None  # pid that writes the trace
+_pid = None
+_t0 = 0.0
+_stack = []    # open phase frames
+_phases = []   # finished phase records
+_files = []    # per-file parse records
+_NULL = contextlib.nullcontext()
+
+
+# ============================================================
+# SETUP
+# ============================================================
+
+def enabled():
+    return _enabled
+
+
+def enable(path):
+    """Starts recording; the trace is written to path (and path.folded) at exit."""
+    global _enabled, _path, _owner, _pid, _t0
+    _enabled, _path, _pid, _t0 = True, path, os.getpid(), time.perf_counter()
+    owner = os.environ.get(OWNER_ENV)
+    if owner is None or owner == str(_pid):
+        _owner = _pid
+        os.environ[OWNER_ENV] = str(_pid)
+        atexit.register(_write_at_exit)
+
+
+def _ensure_local():
+    """Forked workers inherit the parent's records and open frames; start clean."""
+    global _pid
+    if _pid != os.getpid():
+        _pid = os.getpid()
+        del _stack[:], _phases[:], _files[:]
+
+
+# ============================================================
+# RECORDING
+# ============================================================
+
+class _Phase:
+    __slots__ = ("name", "tags", "start", "blocks", "bytes")
+
+    def __init__(self, name, tags):
+        self.name = name
+        self.tags = tags
+        self.bytes = 0
+
+    def __enter__(self):
+        _ensure_local()
+        _stack.append(self)
+        self.blocks = sys.getallocatedblocks()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        blocks = sys.getallocatedblocks() - self.blocks
+        path = ";".join(p.name for p in _stack)
+        _stack.pop()
+        if _stack:
+            _stack[-1].bytes += self.bytes
+        _phases.append({
+            "name": self.name,
+            "stack": path,
+            "start": round(self.start - _t0, 6),
+            "seconds": round(end - self.start, 6),
+            "bytes_read": self.bytes,
+            "alloc_blocks": blocks,
+            "tags": self.tags,
+            "pid": os.getpid(),
+        })
+        return False
+
+
+def phase(name, **tags):
+    """Context manager timing a named phase; a shared no-op when profiling is off."""
+    return _Phase(name, tags) if _enabled else _NULL
+
+
+def profiled(name=None):
+    """Decorator form of phase(), named after the function by default."""
+    def wrap(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def inner(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Phase(label, {}):
+                return func(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def add_bytes(n):
+    if _enabled and _stack:
+        _stack[-1].bytes += n
+
+
+def record_file(path, seconds):
+    """Per-file parse time; the file's size also counts as bytes read by the current phase."""
+    if not _enabled:
+        return
+    _ensure_local()
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        size = 0
+    add_bytes(size)
+    _files.append({
+        "file": os.path.basename(path),
+        "seconds": round(seconds, 6),
+        "bytes": size,
+        "stack": ";".join(p.name for p in _stack),
+        "pid": os.getpid(),
+    })
+
+
+# ============================================================
+# WORKER HAND-OFF
+# ============================================================
+
+def drain():
+    """Records collected in this process since the last drain (worker side)."""
+    if not _enabled:
+        return None
+    _ensure_local()
+    data = {"phases": list(_phases), "files": list(_files)}
+    del _phases[:], _files[:]
+    return data
+
+
+def merge(data):
+    """Adds a worker's drained records, nested under the phase open here."""
+    if not _enabled or not data:
+        return
+    prefix = ";".join(p.name for p in _stack)
+    bytes_read = 0
+    for rec in data["phases"]:
+        # Worker top-level phases already include their children's bytes
+        if ";" not in rec["stack"]:
+            bytes_read += rec["bytes_read"]
+        if prefix:
+            rec["stack"] = f"{prefix};{rec['stack']}"
+        _phases.append(rec)
+    for rec in data["files"]:
+        if not rec["stack"]:
+            bytes_read += rec["bytes"]
+        if prefix:
+            rec["stack"] = f"{prefix};{rec['stack']}" if rec["stack"] else prefix
+        _files.append(rec)
+    add_bytes(bytes_read)
+
+
+# ============================================================
+# OUTPUT
+# ============================================================
+
+def folded_stacks(phases):
+    """Flamegraph 'a;b;c <self microseconds>' lines, one per distinct stack."""
+    inclusive = {}
+    for rec in phases:
+        inclusive[rec["stack"]] = inclusive.get(rec["stack"], 0.0) + rec["seconds"]
+
+    child_time = {}
+    for stack, seconds in inclusive.items():
+        if ";" in stack:
+            parent = stack.rsplit(";", 1)[0]
+            child_time[parent] = child_time.get(parent, 0.0) + seconds
+
+    lines = []
+    for stack in sorted(inclusive):
+        self_us = int(max(0.0, inclusive[stack] - child_time.get(stack, 0.0)) * 1e6)
+        if self_us:
+            lines.append(f"{stack} {self_us}")
+    return lines
+
+
+def write(path):
+    trace = {
+        "pid": os.getpid(),
+        "argv": sys.argv,
+        "total_seconds": round(time.perf_counter() - _t0, 6),
+        "phases": _phases,
+        "files": _files,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(trace, f, indent=1)
+    with open(path + FOLDED_SUFFIX, "w", encoding="utf-8") as f:
+        f.write("\n".join(folded_stacks(_phases)) + "\n")
+
+
+def summary(out=sys.stderr):
+    """Top phases by total time and slowest file parses."""
+    totals = {}
+    for rec in _phases:
+        t = totals.setdefault(rec["name"], [0.0, 0, 0])
+        t[0] += rec["seconds"]
+        t[1] += 1
+        t[2] += rec["bytes_read"]
+
+    print(f"\n[profile] {'Phase':<28} | {'Calls':>6} | {'Seconds':>9} | {'MB read':>8}", file=out)
+    for name, (seconds, calls, nbytes) in sorted(totals.items(), key=lambda x: -x[1][0])[:SUMMARY_TOP]:
+        print(f"[profile] {name:<28} | {calls:>6} | {seconds:>9.3f} | {nbytes / (1 << 20):>8.2f}", file=out)
+
+    if _files:
+        print("[profile] Slowest file parses:", file=out)
+        for rec in sorted(_files, key=lambda r: -r["seconds"])[:SUMMARY_TOP]:
+            print(f"[profile]   {rec['seconds']:.4f}s  {rec['bytes'] / (1 << 20):.2f} MB  {rec['file']}", file=out)
+
+
+def _write_at_exit():
+    if not _enabled or _owner != os.getpid():
+        return
+    try:
+        write(_path)
+        summary()
+        print(f"[profile] Trace: {_path} | Flamegraph stacks: {_path}{FOLDED_SUFFIX}", file=sys.stderr)
+    except OSError as e:
+        print(f"[profile] Could not write trace {_path}: {e}", file=sys.stderr)
+
+
+if os.environ.get(PROFILE_ENV):
+    enable(os.environ[PROFILE_ENV])
@@ -0,0 +1,241 @@
+import os
+import json
+import argparse
+
+from llm_group import load_llm_group
+import profiling
+from json_backend import load_path
+from results_store import RUN_RESULT_DIR, load_store, match_baseline_key, parse_filename, scan_results_dir
+from solve_matrix import REGRESSION_KINDS, RegressionMatrix
+
+INDEX_VERSION = 1
+INDEX_DIRNAME = "regressions"
+
+# Test kinds listed per (agent, instance); "evaluated" is only counted
+DRILLDOWN_KINDS = REGRESSION_KINDS[:3]
+
+
+# ============================================================
+# RANKING
+# ============================================================
+
+def fail_rate(counts):
+    """Failed share of the baseline-passed tests that were actually evaluated, or None."""
+    return counts["failed"] / counts["evaluated"] if counts["evaluated"] else None
+
+
+def rank_agents(counts):
+    """
+    [(agent, counts)] safest first: by fail rate over evaluated tests, so an
+    agent whose runs lost tests to the harness is neither rewarded nor punished.
+    """
+    return sorted(counts.items(), key=lambda x: (fail_rate(x[1]) is None, fail_rate(x[1]) or 0, x[1]["failed"], x[0]))
+
+
+def print_regression_table(counts, indent="    "):
+    row_format = indent + "{:<40} | {:>6} | {:>7} | {:>10} | {:>9} | {:>7}"
+    print(row_format.format("Agent", "Failed", "Missing", "Unreported", "Evaluated", "Fail %"))
+    print(indent + "-" * 95)
+    for agent, c in rank_agents(counts):
+        rate = fail_rate(c)
+        print(row_format.format(agent, c["failed"], c["missing"], c["unreported"], c["evaluated"],
+                                f"{rate * 100:.2f}%" if rate is not None else "-"))
+
+
+# ============================================================
+# PERSISTENT DRILLDOWN INDEX
+# ============================================================
+
+def index_path(results_dir, llm):
+    return os.path.join(results_dir, INDEX_DIRNAME, f".index.{llm}.json")
+
+
+def _file_stamp(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _read_index(path):
+    try:
+        index = load_path(path)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Warning: Ignoring unreadable regression index {path}: {e}")
+        return None
+    return index if index.get("version") == INDEX_VERSION else None
+
+
+def _write_index(index, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, path)
+
+
+@profiling.profiled()
+def update_index(group):
+    """
+    Brings a group's (agent, instance) -> broken-tests index in
+    <results_dir>/regressions up to date and returns it.
+
+    Entries are keyed by the stamp of the None baseline and of each agent
+    file, so regression rows are built only for agents whose file changed;
+    the index is rewritten only when something changed.
+    """
+    store = group.store
+    path = index_path(store.results_dir, group.llm)
+    none = {"file": group.none_file, "stamp": list(store.files[group.none_file]["stamp"]) if store.has(group.none_file) else None}
+
+    index = _read_index(path)
+    if index is None or index["none"] != none:
+        index = {"version": INDEX_VERSION, "llm": group.llm, "none": none, "agents": {}}
+
+    agents = {}
+    stale = {}
+    for agent, filename in group.agent_files:
+        if not store.has(filename):
+            continue
+        stamp = list(store.files[filename]["stamp"])
+        entry = index["agents"].get(agent)
+        if entry is None or entry["file"] != filename or entry["stamp"] != stamp:
+            stale[agent] = (filename, stamp)
+        agents[agent] = entry
+
+    if stale:
+        matrix = RegressionMatrix(store, group.resolved(group.none_file))
+        for agent, (filename, stamp) in stale.items():
+            matrix.set_agent(agent, filename)
+        counts = matrix.counts()
+        for idx, (agent, (filename, stamp)) in enumerate(stale.items()):
+            agents[agent] = {"file": filename, "stamp": stamp, "counts": counts[agent], "instances": matrix.drilldown(idx)}
+    changed = bool(stale) or agents.keys() != index["agents"].keys()
+    index["agents"] = agents
+
+    if changed:
+        try:
+            _write_index(index, path)
+        except OSError as e:
+            print(f"Warning: Could not write regression index {path}: {e}")
+    return index
+
+
+def load_current_index(results_dir, llm, none_file, agent_files):
+    """
+    The stored index of a group if the None baseline and every file of
+    agent_files ({agent: filename}) are unchanged since it was written, else
+    None. Only stats files; nothing is parsed.
+    """
+    index = _read_index(index_path(results_dir, llm))
+    if index is None:
+        return None
+    try:
+        if index["none"] != {"file": none_file, "stamp": _file_stamp(os.path.join(results_dir, none_file))}:
+            return None
+        for agent, filename in agent_files.items():
+            entry = index["agents"].get(agent)
+            if entry is None or entry["file"] != filename or entry["stamp"] != _file_stamp(os.path.join(results_dir, filename)):
+                return None
+    except OSError:
+        return None
+    return index
+
+
+# ============================================================
+# DRILLDOWN
+# ============================================================
+
+def print_agent(entry, agent, instance=None):
+    instances = entry["instances"]
+    c = entry["counts"]
+    print(f"\n  {agent} ({entry['file']}): {c['failed']} failed | {c['missing']} missing | "
+          f"{c['unreported']} unreported | {c['evaluated']} evaluated")
+    if instance is not None:
+        tests = instances.get(instance)
+        if not tests:
+            print(f"    {instance}: no baseline-passed test broken or lost.")
+            return
+        for kind in DRILLDOWN_KINDS:
+            for test in tests.get(kind, []):
+                print(f"    {kind:<10} {test}")
+        return
+
+    print(f"    {'Instance':<45} | {'Failed':>6} | {'Missing':>7} | {'Unreported':>10}")
+    print("    " + "-" * 78)
+    ranked = sorted(instances.items(), key=lambda x: (-len(x[1].get("failed", [])), x[0]))
+    for inst, tests in ranked:
+        print(f"    {inst:<45} | " + " | ".join(
+            f"{len(tests.get(kind, [])):>{w}}" for kind, w in zip(DRILLDOWN_KINDS, (6, 7, 10))))
+
+
+# ============================================================
+# MAIN
+# ============================================================
+
+@profiling.profiled()
+def main():
+    parser = argparse.ArgumentParser(description="Regression ranking and per-(agent, instance) broken-test drilldown from a persistent index.")
+    parser.add_argument("--data_dir", default=RUN_RESULT_DIR, help="Directory containing run_result JSON files.")
+    parser.add_argument("--llm", help="TestGen LLM group (default: every group).")
+    parser.add_argument("--agent", help="Agent to drill into.")
+    parser.add_argument("--instance", help="Instance to list the broken tests of (needs --agent).")
+    parser.add_argument("--rebuild", action="store_true", help="Ignore the stored index and rebuild it.")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.data_dir):
+        print(f"Error: Directory not found: {args.data_dir}")
+        return
+    if args.instance and not args.agent:
+        parser.error("--instance needs --agent")
+
+    files_by_llm, gold_files, none_files = scan_results_dir(args.data_dir)
+    llms = sorted(files_by_llm)
+    if args.llm:
+        key = match_baseline_key(args.llm, llms)
+        if key is None:
+            print(f"Error: No TestGen LLM group matches {args.llm} (have: {', '.join(llms)})")
+            return
+        llms = [key]
+
+    store = None
+    for llm in llms:
+        print(f"\n{'='*80}")
+        print(f"REGRESSIONS: TestGen LLM = {llm}")
+        print(f"{'='*80}")
+
+        agent_files = {parse_filename(f)[0]: f for f in files_by_llm[llm]}
+        if args.agent:
+            if args.agent not in agent_files:
+                print(f"  No result file for agent {args.agent}.")
+                continue
+            agent_files = {args.agent: agent_files[args.agent]}
+        none_key = match_baseline_key(llm, none_files)
+
+        index = None
+        if none_key and not args.rebuild:
+            index = load_current_index(args.data_dir, llm, none_files[none_key], agent_files)
+            if index is not None and not args.agent and index["agents"].keys() != agent_files.keys():
+                index = None
+        if index is None:
+            if store is None:
+                store = load_store(args.data_dir)
+            group = load_llm_group(store, llm, files_by_llm[llm], gold_files, none_files)
+            if group is None:
+                print(f"  [SKIPPING] Missing Gold/None baselines for {llm}")
+                continue
+            index = update_index(group)
+            print(f"  Index updated: {index_path(args.data_dir, llm)}")
+
+        if args.agent:
+            entry = index["agents"].get(args.agent)
+            if entry is None:
+                print(f"  {args.agent} is not in the results store.")
+                continue
+            print_agent(entry, args.agent, args.instance)
+        else:
+            print_regression_table({agent: entry["counts"] for agent, entry in index["agents"].items()}, indent="  ")
+
+
+if __name__ == "__main__":
+    main()
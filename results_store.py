@@ -0,0 +1,363 @@
+import os
+import time
+import pickle
+from array import array
+from collections import defaultdict
+
+import profiling
+from group_runner import map_files
+from json_backend import iter_run_result, load_path, load_run_result
+
+# Paths relative to this script
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RUN_RESULT_DIR = os.path.join(BASE_DIR, "run_result")
+
+# Persisted next to the result files it was built from
+STORE_FILENAME = ".results_store.pkl"
+STORE_VERSION = 3
+
+# Cold builds parse files in worker processes once at least this many changed
+PARALLEL_PARSE_MIN_FILES = 8
+
+# Files at least this large are streamed into the store entry by entry
+STREAM_PARSE_MIN_BYTES = 256 << 20
+
+# Integer outcome codes, indexed like the "details" keys of a run_result entry
+OUTCOME_KEYS = ("resolved", "unresolved", "missing")
+RESOLVED, UNRESOLVED, MISSING = 0, 1, 2
+
+
+# ============================================================
+# IO HELPERS
+# ============================================================
+
+def load_json(path):
+    try:
+        return load_path(path)
+    except Exception as e:
+        print(f"Error reading {path}: {e}")
+        return None
+
+
+def load_run_json(path):
+    """A run_result file decoded to {instance_id: (n_resolved_tests, outcome lists)}, or None."""
+    start = time.perf_counter()
+    try:
+        data = load_run_result(path)
+    except Exception as e:
+        print(f"Error reading {path}: {e}")
+        return None
+    profiling.record_file(path, time.perf_counter() - start)
+    return data
+
+
+def parse_filename(filename):
+    """
+    Parses the filename to extract Agent Name and TestGen LLM.
+    Handles 'gold_' and 'none_' special cases.
+    "JoyCode__gpt-5.1-500-1.json" -> ("JoyCode", "gpt-5.1-500-1")
+    """
+    name = os.path.splitext(filename)[0]
+
+    if name.startswith("gold_"):
+        return "GOLD", name.replace("gold_", "")
+    if name.startswith("none_"):
+        return "NONE", name.replace("none_", "")
+
+    parts = name.split("__")
+    return (parts[0], parts[1]) if len(parts) == 2 else (name, "Unknown")
+
+
+def is_run_result_file(filename):
+    """gold_<llm>.json, none_<llm>.json or <agent>__<llm>.json; other JSON (selection reports, ...) is not a run_result file."""
+    return filename.endswith(".json") and not filename.startswith(".") and parse_filename(filename)[1] != "Unknown"
+
+
+def match_baseline_key(llm, keys):
+    """
+    The LLM string in 'gold_<llm>' is a substring of the one in 'Agent__<llm>'
+    (gold_gpt-5.1 vs Agent__gpt-5.1-500-1), so match either way round.
+    """
+    return next((k for k in keys if k in llm or llm in k), None)
+
+
+def scan_results_dir(results_dir):
+    """
+    Groups the result files of a directory by TestGen LLM.
+    Returns (files_by_llm, gold_files, none_files) in directory listing order.
+    """
+    files = [f for f in os.listdir(results_dir) if f.endswith(".json")]
+
+    files_by_llm = defaultdict(list)
+    gold_files, none_files = {}, {}
+
+    for f in files:
+        agent, llm = parse_filename(f)
+        if agent == "GOLD":
+            gold_files[llm] = f
+        elif agent == "NONE":
+            none_files[llm] = f
+        else:
+            files_by_llm[llm].append(f)
+
+    return files_by_llm, gold_files, none_files
+
+
+# ============================================================
+# COLUMNAR STORE
+# ============================================================
+
+class ResultsStore:
+    """
+    Columnar form of every run_result file in a directory.
+
+    Instance IDs, test names, agents and LLMs are interned to small ints. Each
+    file stores, per instance and outcome, a sorted run of test IDs in one
+    flat array; offsets[3 * k + outcome] is where instance k's run for that
+    outcome starts. The agent and TestGen LLM are constant within a file.
+    """
+
+    def __init__(self, results_dir):
+        self.results_dir = results_dir
+        self.instances, self._instance_ids = [], {}
+        self.tests, self._test_ids = [], {}
+        self.agents, self._agent_ids = [], {}
+        self.llms, self._llm_ids = [], {}
+        self.files = {}  # filename -> column chunk
+
+    # ---------------------------- interning ----------------------------
+
+    @staticmethod
+    def _intern(value, table, ids):
+        idx = ids.get(value)
+        if idx is None:
+            idx = ids[value] = len(table)
+            table.append(value)
+        return idx
+
+    def instance_id(self, instance):
+        return self._intern(instance, self.instances, self._instance_ids)
+
+    def test_id(self, test):
+        return self._intern(test, self.tests, self._test_ids)
+
+    def lookup_instance(self, instance):
+        """Interned ID of an instance, or None if no file mentions it."""
+        return self._instance_ids.get(instance)
+
+    def lookup_test(self, test):
+        return self._test_ids.get(test)
+
+    # ---------------------------- building ----------------------------
+
+    def add_file(self, filename, entries, stamp):
+        """entries: (instance_id, (n_resolved_tests, (resolved, unresolved, missing))) pairs."""
+        agent, llm = parse_filename(filename)
+        chunk = {
+            "stamp": stamp,
+            "agent": self._intern(agent, self.agents, self._agent_ids),
+            "llm": self._intern(llm, self.llms, self._llm_ids),
+            "instance": array("i"),    # one entry per instance record
+            "n_resolved": array("i"),  # n_resolved_tests, aligned with "instance"
+            "offsets": array("i", [0]),
+            "tests": array("i"),       # sorted, de-duplicated test IDs per (instance, outcome)
+        }
+
+        for inst, (n_resolved, outcome_lists) in entries:
+            chunk["instance"].append(self.instance_id(inst))
+            chunk["n_resolved"].append(n_resolved)
+
+            for tests in outcome_lists:
+                chunk["tests"].extend(sorted({self.test_id(test) for test in tests}))
+                chunk["offsets"].append(len(chunk["tests"]))
+
+        self.files[filename] = chunk
+
+    # ---------------------------- access ----------------------------
+
+    def has(self, filename):
+        return filename in self.files
+
+    def instance_list(self, filename):
+        """Instance IDs recorded in a file, in file order."""
+        instances = self.instances
+        return [instances[i] for i in self.files[filename]["instance"]]
+
+    def n_resolved(self, filename):
+        """{instance_id: n_resolved_tests}"""
+        chunk = self.files[filename]
+        instances = self.instances
+        return {instances[i]: n for i, n in zip(chunk["instance"], chunk["n_resolved"])}
+
+    def outcome_runs(self, filename, outcome=RESOLVED):
+        """Yields (interned instance, sorted test-ID array) for one outcome, in file order."""
+        chunk = self.files[filename]
+        offsets, tests = chunk["offsets"], chunk["tests"]
+        for k, i in enumerate(chunk["instance"]):
+            pos = 3 * k + outcome
+            yield i, tests[offsets[pos]:offsets[pos + 1]]
+
+    def outcome_ids(self, filename, outcome=RESOLVED):
+        """{instance_id: sorted test-ID array} for one outcome, covering every instance in the file."""
+        instances = self.instances
+        return {instances[i]: run for i, run in self.outcome_runs(filename, outcome)}
+
+    def outcome_sets(self, filename, outcome=RESOLVED):
+        """{instance_id: set(test names)} for one outcome, covering every instance in the file."""
+        instances, tests = self.instances, self.tests
+        return {instances[i]: {tests[t] for t in run} for i, run in self.outcome_runs(filename, outcome)}
+
+    def resolved_sets(self, filename):
+        return self.outcome_sets(filename, RESOLVED)
+
+    # ---------------------------- snapshot hooks ----------------------------
+
+    def cached_meaningful(self, gold_file, none_file):
+        """Meaningful map captured with the store, if any (see corpus_snapshot.py)."""
+        return None
+
+    def cached_real_resolved(self, path):
+        """Resolved IDs of a leaderboard results file captured with the store, if still current."""
+        return None
+
+    def rows(self, filename):
+        """Yields (agent, llm, instance, test, outcome) integer rows for a file."""
+        chunk = self.files[filename]
+        agent, llm = chunk["agent"], chunk["llm"]
+        offsets, tests = chunk["offsets"], chunk["tests"]
+        for k, i in enumerate(chunk["instance"]):
+            for outcome in range(len(OUTCOME_KEYS)):
+                pos = 3 * k + outcome
+                for t in tests[offsets[pos]:offsets[pos + 1]]:
+                    yield agent, llm, i, t, outcome
+
+
+# ============================================================
+# PERSISTENCE
+# ============================================================
+
+def _file_stamp(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def _read_store(store_path):
+    try:
+        with open(store_path, "rb") as f:
+            payload = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Warning: Ignoring unreadable results store {store_path}: {e}")
+        return None
+
+    if payload.get("version") != STORE_VERSION:
+        return None
+    # Plain state is pickled rather than the instance, so a store written by
+    # `python results_store.py` (class in __main__) loads everywhere else
+    store = ResultsStore.__new__(ResultsStore)
+    store.__dict__.update(payload["state"])
+    return store
+
+
+def _write_store(store, store_path):
+    tmp_path = f"{store_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump({"version": STORE_VERSION, "state": vars(store)}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, store_path)
+
+
+def refresh_files(store, filenames):
+    """
+    Re-reads the given files of store.results_dir into the store; files that
+    vanished or fail to parse are dropped. Returns the filenames whose chunk
+    was added, replaced or removed.
+    """
+    changed = []
+    pending = [] # (filename, path, stamp)
+    streamed = []
+    for filename in filenames:
+        path = os.path.join(store.results_dir, filename)
+        try:
+            stamp = _file_stamp(path)
+        except FileNotFoundError:
+            if store.files.pop(filename, None) is not None:
+                changed.append(filename)
+            continue
+        (streamed if stamp[0] >= STREAM_PARSE_MIN_BYTES else pending).append((filename, path, stamp))
+
+    # JSON parsing fans out to worker processes; interning stays here so IDs are deterministic
+    workers = None if len(pending) >= PARALLEL_PARSE_MIN_FILES else 1
+    with profiling.phase("parse", files=len(pending)):
+        parsed = map_files(load_run_json, [path for _, path, _ in pending], workers=workers)
+
+    with profiling.phase("intern"):
+        for (filename, _, stamp), data in zip(pending, parsed):
+            if not data:
+                if store.files.pop(filename, None) is not None:
+                    changed.append(filename)
+                continue
+
+            store.add_file(filename, data.items(), stamp)
+            changed.append(filename)
+
+    # Huge files never exist as one decoded document
+    for filename, path, stamp in streamed:
+        with profiling.phase("stream_parse", file=filename):
+            try:
+                store.add_file(filename, iter_run_result(path), stamp)
+                changed.append(filename)
+            except Exception as e:
+                print(f"Error reading {path}: {e}")
+                if store.files.pop(filename, None) is not None:
+                    changed.append(filename)
+
+    return changed
+
+
+@profiling.profiled()
+def load_store(results_dir=RUN_RESULT_DIR, persist=True, snapshot=True):
+    """
+    Returns the ResultsStore for a run_result directory.
+
+    A current corpus snapshot (corpus_snapshot.py) is memory-mapped as is.
+    Otherwise the store is persisted as results_dir/.results_store.pkl; only
+    files whose size or mtime changed since it was written are re-parsed.
+    """
+    if persist and snapshot:
+        from corpus_snapshot import open_snapshot
+        store = open_snapshot(results_dir)
+        if store is not None:
+            return store
+
+    store_path = os.path.join(results_dir, STORE_FILENAME)
+    with profiling.phase("read_store"):
+        store = _read_store(store_path) if persist else None
+    if store is None:
+        store = ResultsStore(results_dir)
+    store.results_dir = results_dir
+
+    on_disk = [f for f in os.listdir(results_dir) if is_run_result_file(f)]
+    stale = sorted(set(store.files) - set(on_disk))
+    for filename in on_disk:
+        chunk = store.files.get(filename)
+        if chunk is None or chunk["stamp"] != _file_stamp(os.path.join(results_dir, filename)):
+            stale.append(filename)
+    changed = refresh_files(store, stale)
+
+    if persist and changed:
+        with profiling.phase("persist"):
+            try:
+                _write_store(store, store_path)
+            except OSError as e:
+                print(f"Warning: Could not persist results store to {store_path}: {e}")
+
+    return store
+
+
+if __name__ == "__main__":
+    s = load_store()
+    n_rows = sum(len(c["tests"]) for c in s.files.values())
+    print(f"Results store for {s.results_dir}")
+    print(f"  Files: {len(s.files)} | Agents: {len(s.agents)} | LLMs: {len(s.llms)}")
+    print(f"  Instances: {len(s.instances)} | Tests: {len(s.tests)} | Rows: {n_rows}")
@@ -0,0 +1,103 @@
+import argparse
+import os
+
+from analyze_advanced import report_best_team, report_difficulty, report_regressions
+from analyze_correlation import REAL_RESULTS_DIR, report_correlation, report_threshold_sweep
+from analyze_oracle import report_ensemble, report_oracle
+from analyze_results import report_meaningful_counts
+from analyze_slices import report_slices
+from count_tests import report_coverage
+from group_runner import run_groups
+from instance_slices import SLICE_KINDS
+from llm_group import load_llm_group
+from misc import report_totals
+import profiling
+from results_store import RUN_RESULT_DIR, load_store, scan_results_dir
+
+# ============================================================
+# REPORT REGISTRY
+# ============================================================
+
+# name -> (title, needs agent rows in the solve matrix, runner(group, args))
+REPORTS = {
+    "counts": ("MEANINGFUL COUNTS", False, lambda group, args: report_meaningful_counts(group)),
+    "coverage": ("INSTANCE COVERAGE", False, lambda group, args: report_coverage(group)),
+    "totals": ("MEANINGFUL VS TOTAL PASS RATES", False, lambda group, args: report_totals(group)),
+    "regressions": ("REGRESSIONS", True, lambda group, args: report_regressions(group)),
+    "team": ("BEST TEAM", True, lambda group, args: report_best_team(
+        group, args.team_size, args.exact, args.hard_weight, args.unique_weight)),
+    "difficulty": ("DIFFICULTY CLUSTERING", True, lambda group, args: report_difficulty(group)),
+    "oracle": ("ORACLE", True, lambda group, args: report_oracle(group)),
+    "ensemble": ("ENSEMBLE", True, lambda group, args: report_ensemble(group)),
+    "correlation": ("CORRELATION WITH REAL RESULTS", False, lambda group, args: report_correlation(group, args.real_dir)),
+    "sweep": ("CORRELATION THRESHOLD SWEEP", False, lambda group, args: report_threshold_sweep(group, args.real_dir)),
+    "slices": ("REPO / YEAR SLICES", True, lambda group, args: report_slices(group, args.slice_by)),
+}
+
+
+def report_llm_group(store, llm, filenames, gold_files, none_files, args):
+    print(f"\n{'='*80}")
+    print(f"REPORTS: TestGen LLM = {llm}")
+    print(f"{'='*80}")
+
+    # Baselines, meaningful map and solve matrix are built once and shared by every report
+    group = load_llm_group(store, llm, filenames, gold_files, none_files)
+    if group is None:
+        print(f"  [SKIPPING] Missing Gold/None baselines for {llm}")
+        return
+
+    print(f"  Using Baseline: Gold='{group.gold_file}' | None='{group.none_file}'")
+    print(f"  Agents: {len(filenames)} | Meaningful Tests: {group.total_meaningful}")
+
+    for name in args.reports:
+        title, needs_matrix, run = REPORTS[name]
+        print(f"\n  {'-'*30} {title} {'-'*30}")
+        if needs_matrix and not group.matrix.agents:
+            print("  No agent data.")
+            continue
+        run(group, args)
+
+
+# ============================================================
+# MAIN
+# ============================================================
+
+@profiling.profiled()
+def main():
+    parser = argparse.ArgumentParser(description="Run all analysis reports from a single load of the results directory.")
+    parser.add_argument("--data_dir", default=RUN_RESULT_DIR, help="Directory containing run_result JSON files.")
+    parser.add_argument("--real_dir", default=REAL_RESULTS_DIR, help="Directory of real results_<agent>.json files (correlation).")
+    for name, (title, _, _) in REPORTS.items():
+        parser.add_argument(f"--{name}", dest="selected", action="append_const", const=name, help=f"Run the {title.lower()} report.")
+    parser.add_argument("--team-size", type=int, default=2, help="Number of agents per team (default: 2).")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--exact", dest="exact", action="store_true", default=None, help="Force branch-and-bound team search.")
+    mode.add_argument("--greedy", dest="exact", action="store_false", help="Force lazy greedy (CELF) team search.")
+    parser.add_argument("--hard-weight", type=int, default=0, help="Extra team score per hard test covered.")
+    parser.add_argument("--unique-weight", type=int, default=0, help="Extra team score per unique test covered.")
+    parser.add_argument("--slice-by", choices=SLICE_KINDS, default="repo", help="Slice kind of the slices report (default: repo).")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes across LLM groups (1 = sequential).")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.data_dir):
+        print(f"Error: Directory not found: {args.data_dir}")
+        return
+
+    # No report flags means every report, in registry order
+    selected = set(args.selected or REPORTS)
+    args.reports = [name for name in REPORTS if name in selected]
+    del args.selected
+
+    print(f"Reading from: {args.data_dir}")
+    print(f"Reports: {', '.join(args.reports)}")
+    store = load_store(args.data_dir)
+    files_by_llm, gold_files, none_files = scan_results_dir(args.data_dir)
+
+    run_groups(report_llm_group, [
+        (store, llm, files_by_llm[llm], gold_files, none_files, args)
+        for llm in sorted(files_by_llm)
+    ], workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,8 @@ import os
 import json
 import glob
 
-def load_json(path):
-    with open(path, 'r') as f:
-        return json.load(f)
+from meaningful_cache import load_meaningful_map
+from results_store import load_store
 
 def save_json(data, path):
     with open(path, 'w') as f:
@@ -21,6 +20,7 @@ def main():
     # 1. Find all gold files
     gold_files = glob.glob(os.path.join(results_dir, "gold_*.json"))
     
+    store = load_store(results_dir)
     union_data = {} # Structure: { instance_id: { identifier: [tests] } }
 
     for gold_path in gold_files:
@@ -36,21 +36,13 @@ def main():
             
         print(f"Processing identifier: {identifier}")
         
-        gold_data = load_json(gold_path)
-        none_data = load_json(none_path)
+        # Meaningful = Resolved in Gold AND NOT Resolved in None
+        meaningful_map = load_meaningful_map(store, filename, os.path.basename(none_path))
         
         meaningful_data_for_id = {}
         
-        # Iterate through all instances in gold (assuming same instances in none)
-        all_instances = set(gold_data.keys()) | set(none_data.keys())
-        
-        for instance_id in all_instances:
-            gold_res = set(gold_data.get(instance_id, {}).get("details", {}).get("resolved", []))
-            none_res = set(none_data.get(instance_id, {}).get("details", {}).get("resolved", []))
-            
-            # Meaningful = Resolved in Gold AND NOT Resolved in None
-            meaningful_tests = list(gold_res - none_res)
-            meaningful_tests.sort()
+        for instance_id, tests in meaningful_map.items():
+            meaningful_tests = sorted(tests)
             
             if meaningful_tests:
                 meaningful_data_for_id[instance_id] = meaningful_tests
@@ -1,8 +1,23 @@
 import os
 import re
+import json
 import shutil
+import argparse
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_URL = "https://github.com/SWE-bench/experiments.git"
+TEMP_DIR = "temp_experiments_clone_v2"
+OUTPUT_DIR = "all_results"
+TARGET_PATH = "evaluation/verified"
+
+# Last scraped commit and the experiment behind each output, kept next to the extracted results
+STATE_FILENAME = ".scraper_state.json"
+STATE_VERSION = 2
+
+# Extraction is file-copy bound, so threads are enough
+MAX_WORKERS = 8
 
 def run_git_command(args, cwd=None):
     """Run a git command and return output."""
@@ -16,128 +31,271 @@ def run_git_command(args, cwd=None):
         print(f"Error running command {' '.join(args)}: {e.stderr}", flush=True)
         raise
 
+def remove_tree(path):
+    # robust cleanup
+    def on_rm_error(func, path, exc_info):
+        os.chmod(path, 0o777)
+        func(path)
+    shutil.rmtree(path, onerror=on_rm_error)
+
+# ============================================================
+# STATE
+# ============================================================
+
+def load_state(output_dir):
+    try:
+        with open(os.path.join(output_dir, STATE_FILENAME), "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return state if state.get("version") == STATE_VERSION else {}
+
+def save_state(output_dir, repo_url, commit, outputs):
+    path = os.path.join(output_dir, STATE_FILENAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": STATE_VERSION, "repo_url": repo_url, "commit": commit, "outputs": outputs},
+                  f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+# ============================================================
+# CLONE
+# ============================================================
+
+def clone_sparse(repo_url, temp_dir, target_path):
+    print(f"Cloning {repo_url} (sparse)...", flush=True)
+    # Modern sparse clone
+    subprocess.run(["git", "clone", "--filter=blob:none", "--sparse", repo_url, temp_dir], check=True)
+
+    # Set sparse checkout path
+    print(f"Setting sparse checkout to {target_path}...", flush=True)
+    run_git_command(["git", "sparse-checkout", "set", target_path], cwd=temp_dir)
+
+def update_clone(repo_url, temp_dir, target_path):
+    """
+    Reuses an existing clone of repo_url when there is one (fetch + fast-forward),
+    otherwise makes a fresh sparse clone. Returns the checked-out commit.
+    """
+    reusable = False
+    if os.path.isdir(os.path.join(temp_dir, ".git")):
+        try:
+            reusable = run_git_command(["git", "remote", "get-url", "origin"], cwd=temp_dir) == repo_url
+        except subprocess.CalledProcessError:
+            reusable = False
+
+    if reusable:
+        print(f"Updating existing clone in {temp_dir}...", flush=True)
+        run_git_command(["git", "sparse-checkout", "set", target_path], cwd=temp_dir)
+        run_git_command(["git", "pull", "--ff-only", "--quiet"], cwd=temp_dir)
+    else:
+        if os.path.exists(temp_dir):
+            print(f"Cleaning up previous temp directory {temp_dir}...", flush=True)
+            remove_tree(temp_dir)
+        clone_sparse(repo_url, temp_dir, target_path)
+
+    return run_git_command(["git", "rev-parse", "HEAD"], cwd=temp_dir)
+
+def changed_experiments(temp_dir, target_path, old_commit, new_commit):
+    """
+    Experiment directory names under target_path touched between two commits,
+    or None when old_commit is unknown to the clone (full scan needed).
+    """
+    try:
+        run_git_command(["git", "cat-file", "-e", f"{old_commit}^{{commit}}"], cwd=temp_dir)
+    except subprocess.CalledProcessError:
+        return None
+
+    diff = run_git_command(
+        ["git", "diff", "--name-only", old_commit, new_commit, "--", target_path], cwd=temp_dir
+    )
+    prefix = target_path.rstrip("/") + "/"
+    names = set()
+    for line in diff.splitlines():
+        if line.startswith(prefix):
+            rest = line[len(prefix):]
+            if "/" in rest:
+                names.add(rest.split("/", 1)[0])
+    return names
+
+# ============================================================
+# EXTRACTION
+# ============================================================
+
+def find_agent_name(exp_dir_name, results_path):
+    agent_name = None
+
+    # 1. Try to find [Agent]__[LLM] file in results_path
+    try:
+        for filename in os.listdir(results_path):
+            if filename == "results.json" or filename.startswith("resolved_by"):
+                continue
+
+            if "__" in filename:
+                match = re.search(r'(.+)__(.+)', filename)
+                if match:
+                    raw_agent = match.group(1)
+                    # Clean if it has extension
+                    if raw_agent.endswith(".json"):
+                        raw_agent = raw_agent.rsplit('.', 1)[0]
+                    agent_name = raw_agent
+                    pass # Found it
+    except OSError:
+        pass
+
+    # 2. Fallback: Parse directory name
+    if not agent_name:
+        # ExpDir format usuall: YYYYMMDD_AgentName_...
+        # Strip date
+        match = re.match(r'^\d{8}_(.+)', exp_dir_name)
+        if match:
+            agent_name = match.group(1)
+            # Heuristic: if it looks like Agent_Model, can we split?
+            # But verifying this is hard without the file.
+            # We will use the directory suffix as the best guess.
+            # e.g. "JoyCode", "agentless-1.5_gpt4o"
+        else:
+            agent_name = exp_dir_name # Just use the whole dir name if no date
+
+    return agent_name
+
+def resolve_experiment(base_search_path, exp_dir_name):
+    """Returns (results.json path, agent name) for one experiment, or None if it has no results."""
+    exp_path = os.path.join(base_search_path, exp_dir_name)
+    if not os.path.isdir(exp_path):
+        return None
+
+    # We expect: evaluation/verified/<ExpDir>/results/results.json
+    results_path = os.path.join(exp_path, "results")
+    results_json_path = os.path.join(results_path, "results.json")
+
+    if not os.path.exists(results_json_path):
+        # Maybe results are not in a 'results' subdir? (unlikely for verified, but check)
+        # Some might be just <ExpDir>/results.json?
+        return None
+
+    return results_json_path, find_agent_name(exp_dir_name, results_path)
+
+def dest_path_for(output_dir, agent_name):
+    dest_filename = f"results_{agent_name}.json"
+    # Sanitize filename just in case
+    dest_filename = re.sub(r'[<>:"/\\|?*]', '_', dest_filename)
+    return os.path.join(output_dir, dest_filename)
+
+def extract_experiments(base_search_path, output_dir, workers=MAX_WORKERS, changed=None, previous=None):
+    """
+    Copies results.json of each agent's experiment to output_dir/results_<agent>.json
+    using a thread pool, and returns {output filename: experiment dir name}.
+
+    The agent -> experiment mapping is always resolved over every experiment:
+    directories are taken in sorted order and when two map to the same agent
+    the later one wins, as in a serial walk. With changed (experiments touched
+    since the last scrape) only outputs whose winner changed, was touched or
+    is missing on disk are copied. Outputs in previous (the last scrape's
+    mapping) that no longer have a winner are removed.
+    """
+    previous = previous or {}
+    exp_dir_names = sorted(os.listdir(base_search_path))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        resolved = list(pool.map(lambda name: resolve_experiment(base_search_path, name), exp_dir_names))
+
+        # dest -> (exp_dir_name, agent_name, source); last experiment wins
+        winners = {}
+        for exp_dir_name, entry in zip(exp_dir_names, resolved):
+            if entry is None:
+                continue
+            results_json_path, agent_name = entry
+            dest_path = dest_path_for(output_dir, agent_name)
+            winners.pop(dest_path, None)
+            winners[dest_path] = (exp_dir_name, agent_name, results_json_path)
+
+        jobs = {
+            dest_path: job for dest_path, job in winners.items()
+            if changed is None or job[0] in changed
+            or previous.get(os.path.basename(dest_path)) != job[0] or not os.path.exists(dest_path)
+        }
+        list(pool.map(lambda item: shutil.copy2(item[1][2], item[0]), jobs.items()))
+
+    outputs = {os.path.basename(dest_path): job[0] for dest_path, job in winners.items()}
+    for filename in sorted(previous.keys() - outputs.keys()):
+        try:
+            os.remove(os.path.join(output_dir, filename))
+        except FileNotFoundError:
+            pass
+        print(f"  - Removed: {filename} (from {previous[filename]})", flush=True)
+
+    for exp_dir_name, agent_name, _ in jobs.values():
+        print(f"  - Extracted: {agent_name} (from {exp_dir_name})", flush=True)
+    return outputs
+
+# ============================================================
+# MAIN
+# ============================================================
+
 def main():
+    parser = argparse.ArgumentParser(description="Extract SWE-bench verified results.json files per agent.")
+    parser.add_argument("--repo_url", default=REPO_URL, help="experiments repo to clone (a local path works too).")
+    parser.add_argument("--temp_dir", default=TEMP_DIR, help="Where the sparse clone lives.")
+    parser.add_argument("--output_dir", default=OUTPUT_DIR, help="Destination for results_<agent>.json files.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Keep the clone and only process experiments changed since the last scraped commit.")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="Extraction threads.")
+    args = parser.parse_args()
+
     print("Starting Robust Git-Clone Scraper...", flush=True)
-    
-    repo_url = "https://github.com/SWE-bench/experiments.git"
-    temp_dir = "temp_experiments_clone_v2"
-    output_dir = "all_results"
-    target_path = "evaluation/verified"
-    
-    # Ensure output directory exists
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
 
-    # 1. Clone with sparse checkout
-    if os.path.exists(temp_dir):
-        print(f"Cleaning up previous temp directory {temp_dir}...", flush=True)
-        try:
-             # robust cleanup
-             def on_rm_error(func, path, exc_info):
-                os.chmod(path, 0o777)
-                func(path)
-             shutil.rmtree(temp_dir, onerror=on_rm_error)
-        except Exception as e:
-            print(f"Warning: Could not clean up {temp_dir}: {e}", flush=True)
-            # Consider failing or using a different dir if this happens?
-            # We'll proceed and hope for the best or error out during clone.
+    # Ensure output directory exists
+    if not os.path.exists(args.output_dir):
+        os.makedirs(args.output_dir)
 
-    print(f"Cloning {repo_url} (sparse)...", flush=True)
     try:
-        # Modern sparse clone
-        subprocess.run(["git", "clone", "--filter=blob:none", "--sparse", repo_url, temp_dir], check=True)
-        
-        # Set sparse checkout path
-        print(f"Setting sparse checkout to {target_path}...", flush=True)
-        run_git_command(["git", "sparse-checkout", "set", target_path], cwd=temp_dir)
-        
+        if args.incremental:
+            commit = update_clone(args.repo_url, args.temp_dir, TARGET_PATH)
+        else:
+            # 1. Fresh clone with sparse checkout
+            if os.path.exists(args.temp_dir):
+                print(f"Cleaning up previous temp directory {args.temp_dir}...", flush=True)
+                try:
+                    remove_tree(args.temp_dir)
+                except Exception as e:
+                    print(f"Warning: Could not clean up {args.temp_dir}: {e}", flush=True)
+                    # We'll proceed and hope for the best or error out during clone.
+            clone_sparse(args.repo_url, args.temp_dir, TARGET_PATH)
+            commit = run_git_command(["git", "rev-parse", "HEAD"], cwd=args.temp_dir)
+
         print("Clone setup complete. Processing...", flush=True)
-        
-        count = 0
-        base_search_path = os.path.join(temp_dir, target_path)
-        
+
+        base_search_path = os.path.join(args.temp_dir, TARGET_PATH)
+
         if not os.path.exists(base_search_path):
             print(f"Error: Target path {base_search_path} does not exist. Sparse checkout might have failed.", flush=True)
             return
 
-        # Iterate through experiment directories
-        # We expect: evaluation/verified/<ExpDir>/results/results.json
-        
-        for exp_dir_name in os.listdir(base_search_path):
-            exp_path = os.path.join(base_search_path, exp_dir_name)
-            if not os.path.isdir(exp_path):
-                continue
-                
-            results_path = os.path.join(exp_path, "results")
-            results_json_path = os.path.join(results_path, "results.json")
-            
-            if not os.path.exists(results_json_path):
-                # Maybe results are not in a 'results' subdir? (unlikely for verified, but check)
-                # Some might be just <ExpDir>/results.json? 
-                continue
-                
-            # Strategy: Find Agent Name
-            agent_name = None
-            
-            # 1. Try to find [Agent]__[LLM] file in results_path
-            try:
-                for filename in os.listdir(results_path):
-                    if filename == "results.json" or filename.startswith("resolved_by"):
-                        continue
-                    
-                    if "__" in filename:
-                        match = re.search(r'(.+)__(.+)', filename)
-                        if match:
-                            raw_agent = match.group(1)
-                            # Clean if it has extension
-                            if raw_agent.endswith(".json"):
-                                raw_agent = raw_agent.rsplit('.', 1)[0]
-                            agent_name = raw_agent
-                            pass # Found it
-            except OSError:
-                pass
-            
-            # 2. Fallback: Parse directory name
-            if not agent_name:
-                # ExpDir format usuall: YYYYMMDD_AgentName_...
-                # Strip date
-                match = re.match(r'^\d{8}_(.+)', exp_dir_name)
-                if match:
-                    agent_name = match.group(1)
-                    # Heuristic: if it looks like Agent_Model, can we split?
-                    # But verifying this is hard without the file. 
-                    # We will use the directory suffix as the best guess.
-                    # e.g. "JoyCode", "agentless-1.5_gpt4o"
-                else:
-                    agent_name = exp_dir_name # Just use the whole dir name if no date
-            
-            if agent_name:
-                # Save file
-                dest_filename = f"results_{agent_name}.json"
-                # Sanitize filename just in case
-                dest_filename = re.sub(r'[<>:"/\\|?*]', '_', dest_filename)
-                
-                dest_path = os.path.join(output_dir, dest_filename)
-                
-                shutil.copy2(results_json_path, dest_path)
-                print(f"  - Extracted: {agent_name} (from {exp_dir_name})", flush=True)
-                count += 1
-            else:
-                print(f"  - Skipped: {exp_dir_name} (Could not determine agent name)", flush=True)
-
-        print(f"\nScraping completed. Extracted {count} result files.", flush=True)
+        changed = None
+        previous = None
+        state = load_state(args.output_dir)
+        if state.get("repo_url") == args.repo_url and state.get("commit"):
+            previous = state.get("outputs")
+            if args.incremental:
+                if state["commit"] == commit:
+                    print(f"Already up to date at {commit[:12]}.", flush=True)
+                    return
+                changed = changed_experiments(args.temp_dir, TARGET_PATH, state["commit"], commit)
+                if changed is not None:
+                    print(f"{len(changed)} experiment(s) changed since {state['commit'][:12]}.", flush=True)
+
+        outputs = extract_experiments(base_search_path, args.output_dir, args.workers, changed, previous)
+        save_state(args.output_dir, args.repo_url, commit, outputs)
+
+        print(f"\nScraping completed. {len(outputs)} result files.", flush=True)
 
     except Exception as e:
         print(f"Fatal Error: {e}", flush=True)
     finally:
-        # Cleanup
-        if os.path.exists(temp_dir):
+        # Cleanup (incremental runs keep the clone for the next fetch)
+        if not args.incremental and os.path.exists(args.temp_dir):
             print("Cleaning up...", flush=True)
             try:
-                 def on_rm_error(func, path, exc_info):
-                    os.chmod(path, 0o777)
-                    func(path)
-                 shutil.rmtree(temp_dir, onerror=on_rm_error)
+                remove_tree(args.temp_dir)
             except Exception as e:
                 print(f"Cleanup warning: {e}", flush=True)
 
@@ -0,0 +1,92 @@
+import hashlib
+
+# Sketch size: sets up to this many IDs are stored whole (exact comparisons);
+# above it, Jaccard estimates have standard error <= 1 / (2 * sqrt(SKETCH_K)).
+# The full SWE-bench test split has 2294 instances, so every submission to
+# it (or to Verified/Lite) compares exactly.
+SKETCH_K = 2294
+
+
+def id_hash(value):
+    """Stable 64-bit hash of an ID (independent of PYTHONHASHSEED)."""
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+# ============================================================
+# BOTTOM-K SKETCH
+# ============================================================
+
+class SetSketch:
+    """
+    Bottom-k MinHash sketch of a set of string IDs: the exact cardinality plus
+    the k smallest 64-bit ID hashes. When the set has at most k members the
+    sketch holds every hash and all comparisons are exact.
+    """
+
+    def __init__(self, hashes, size, k=SKETCH_K):
+        self.hashes = hashes  # sorted, at most k
+        self.size = size
+        self.k = k
+        self._set = None
+
+    @classmethod
+    def from_ids(cls, ids, k=SKETCH_K):
+        hashes = sorted({id_hash(i) for i in ids})
+        return cls(hashes[:k], len(hashes), k)
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data["hashes"], data["size"], data["k"])
+
+    def to_json(self):
+        return {"size": self.size, "k": self.k, "hashes": self.hashes}
+
+    @property
+    def exact(self):
+        return self.size <= self.k
+
+    def hash_set(self):
+        if self._set is None:
+            self._set = set(self.hashes)
+        return self._set
+
+
+# ============================================================
+# COMPARISONS
+# ============================================================
+
+def jaccard(a, b):
+    """|A ∩ B| / |A ∪ B|: exact when both sketches are, else the bottom-k estimate."""
+    if not a.size and not b.size:
+        return 1.0
+    if not a.size or not b.size:
+        return 0.0
+
+    if a.exact and b.exact:
+        inter = len(a.hash_set() & b.hash_set())
+        return inter / (a.size + b.size - inter)
+
+    # The k smallest hashes of the union are a uniform sample of it;
+    # the share of them present in both sets estimates the Jaccard index.
+    k = min(a.k, b.k, a.size + b.size)
+    sa, sb = a.hash_set(), b.hash_set()
+    union_sample = sorted(sa | sb)[:k]
+    if not union_sample:
+        return 0.0
+    both = sum(1 for h in union_sample if h in sa and h in sb)
+    return both / len(union_sample)
+
+
+def intersection_size(a, b):
+    """|A ∩ B|, exact for exact sketches, else derived from the Jaccard estimate."""
+    if a.exact and b.exact:
+        return len(a.hash_set() & b.hash_set())
+    j = jaccard(a, b)
+    return j * (a.size + b.size) / (1 + j)
+
+
+def containment(a, b):
+    """Share of A's members that are also in B (|A ∩ B| / |A|)."""
+    if not a.size:
+        return 0.0
+    return min(1.0, intersection_size(a, b) / a.size)
@@ -0,0 +1,120 @@
+import os
+import re
+import json
+
+import profiling
+from json_backend import loads
+
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 2
+
+# Top-level "instance_id" of a JSONL record. Keys inside the escaped
+# model_patch string cannot match because their quotes are backslashed.
+INSTANCE_ID_RE = re.compile(rb'"instance_id"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+def extract_instance_id(line):
+    """
+    Pulls instance_id out of one raw JSONL line (bytes) without decoding the
+    rest of the record. The fast path only trusts lines that end like a
+    complete object; anything else goes through a full json.loads, so
+    truncated records are rejected as before. Returns None for blank/invalid
+    lines.
+    """
+    if line.rstrip().endswith(b"}"):
+        match = INSTANCE_ID_RE.search(line)
+        if match:
+            return json.loads(b'"' + match.group(1) + b'"')
+    if not line.strip():
+        return None
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    return record.get("instance_id") if isinstance(record, dict) else None
+
+
+def _file_stamp(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+class SolutionIndex:
+    """
+    Byte-offset index over one agents_solution/<agent>.jsonl file.
+
+    The index (instance_id -> [offset, length]) is kept in a sidecar
+    <file>.idx and rebuilt when the JSONL's size or mtime changes. Records
+    are read with a seek and decoded only when requested.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        self.offsets = self._load_index()
+
+    @profiling.profiled("load_solution_index")
+    def _load_index(self):
+        try:
+            stamp = _file_stamp(self.path)
+        except FileNotFoundError:
+            # Some agents might not have a solution file if they are baselines or errored
+            print(f"Warning: Solution file not found: {self.path}")
+            return {}
+
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("version") == INDEX_VERSION and cached.get("stamp") == stamp:
+                return cached["offsets"]
+        except (OSError, ValueError):
+            pass
+
+        offsets = self._build_offsets()
+        try:
+            tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": INDEX_VERSION, "stamp": stamp, "offsets": offsets}, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"Warning: Could not write solution index {self.index_path}: {e}")
+        return offsets
+
+    def _build_offsets(self):
+        offsets = {}
+        pos = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                instance_id = extract_instance_id(line)
+                if instance_id is not None:
+                    # Later records win, as with a dict built line by line
+                    offsets[instance_id] = [pos, len(line)]
+                pos += len(line)
+        profiling.add_bytes(pos)
+        return offsets
+
+    def __contains__(self, instance_id):
+        return instance_id in self.offsets
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def raw(self, instance_id):
+        """The record's JSONL line as bytes, or None."""
+        entry = self.offsets.get(instance_id)
+        if entry is None:
+            return None
+        offset, length = entry
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def get(self, instance_id):
+        """The decoded record, or None if missing or unreadable."""
+        line = self.raw(instance_id)
+        if line is None:
+            return None
+        try:
+            return loads(line)
+        except ValueError:
+            return None
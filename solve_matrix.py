@@ -0,0 +1,242 @@
+import profiling
+from results_store import MISSING, RESOLVED, UNRESOLVED
+
+
+# ============================================================
+# BITSET SOLVE MATRIX
+# ============================================================
+
+class SolveMatrix:
+    """
+    Agent x meaningful-test solve matrix for one TestGen LLM group.
+
+    Every meaningful (instance, test) pair owns one bit; an instance's tests
+    occupy a contiguous bit range. Each agent row is a Python int bitset, so
+    unions, per-instance counts and unique-solver masks are integer ops.
+    """
+
+    def __init__(self, meaningful_map):
+        self.agents = []
+        self.rows = []
+        self.instances = list(meaningful_map)
+        self.columns = []          # bit -> (instance_id, test_name)
+        self.instance_masks = []   # aligned with self.instances
+        self._spans = []           # (start_bit, width) per instance
+
+        for inst in self.instances:
+            start = len(self.columns)
+            for test in sorted(meaningful_map[inst]):
+                self.columns.append((inst, test))
+            width = len(self.columns) - start
+            self._spans.append((start, width))
+            self.instance_masks.append(((1 << width) - 1) << start)
+
+        self.column_instance = [idx for idx, (_, width) in enumerate(self._spans) for _ in range(width)]
+        self.n_bytes = (len(self.columns) + 7) // 8
+
+    def add_agent(self, agent, row):
+        self.agents.append(agent)
+        self.rows.append(row)
+
+    def set_agent(self, agent, row):
+        """Replaces an agent's row, or appends it; returns the row index."""
+        if agent in self.agents:
+            idx = self.agents.index(agent)
+            self.rows[idx] = row
+            return idx
+        self.add_agent(agent, row)
+        return len(self.rows) - 1
+
+    def remove_agent(self, agent):
+        """Drops an agent's row; returns its former index, or None."""
+        if agent not in self.agents:
+            return None
+        idx = self.agents.index(agent)
+        del self.agents[idx], self.rows[idx]
+        return idx
+
+    # ---------------------------- reductions ----------------------------
+
+    @staticmethod
+    def count(row):
+        return row.bit_count()
+
+    def union(self):
+        acc = 0
+        for row in self.rows:
+            acc |= row
+        return acc
+
+    def solver_masks(self):
+        """(solved by >= 1 agent, solved by >= 2 agents) bitsets."""
+        once = twice = 0
+        for row in self.rows:
+            twice |= once & row
+            once |= row
+        return once, twice
+
+    def unique_mask(self):
+        """Tests solved by exactly one agent."""
+        once, twice = self.solver_masks()
+        return once & ~twice
+
+    def bits(self, row):
+        """Yields the set bit positions of a row, lowest first."""
+        for byte_idx, b in enumerate(row.to_bytes(self.n_bytes, "little")):
+            while b:
+                low = b & -b
+                yield (byte_idx << 3) + low.bit_length() - 1
+                b ^= low
+
+    def instance_counts(self, row):
+        """Meaningful tests solved per instance, aligned with self.instances."""
+        counts = [0] * len(self.instances)
+        column_instance = self.column_instance
+        for bit in self.bits(row):
+            counts[column_instance[bit]] += 1
+        return counts
+
+    def count_matrix(self):
+        """agents x instances list of per-instance solved counts."""
+        return [self.instance_counts(row) for row in self.rows]
+
+    def tests_of(self, mask):
+        """Decodes a bitset back into (instance_id, test_name) pairs."""
+        return [self.columns[bit] for bit in self.bits(mask)]
+
+
+def column_index(store, matrix):
+    """(interned instance, interned test) -> bit for every matrix column."""
+    bit_of = {}
+    for bit, (inst, test) in enumerate(matrix.columns):
+        bit_of[(store.lookup_instance(inst), store.lookup_test(test))] = bit
+    return bit_of
+
+
+def solve_row(store, filename, bit_of, n_bytes, outcome=RESOLVED):
+    """One file's bitset row: the columns it lists under an outcome (resolved by default)."""
+    buf = bytearray(n_bytes)
+    for i, run in store.outcome_runs(filename, outcome):
+        for t in run:
+            bit = bit_of.get((i, t))
+            if bit is not None:
+                buf[bit >> 3] |= 1 << (bit & 7)
+    return int.from_bytes(buf, "little")
+
+
+@profiling.profiled()
+def build_solve_matrix(store, meaningful_map, agent_files):
+    """
+    Builds the SolveMatrix for a group from the results store.
+    agent_files: list of (agent_name, filename); files missing from the store are skipped.
+    """
+    matrix = SolveMatrix(meaningful_map)
+    bit_of = column_index(store, matrix)
+
+    for agent_name, filename in agent_files:
+        if store.has(filename):
+            matrix.add_agent(agent_name, solve_row(store, filename, bit_of, matrix.n_bytes))
+
+    return matrix
+
+
+# ============================================================
+# REGRESSION MATRIX
+# ============================================================
+
+# Per-agent rows over the baseline-passed columns
+REGRESSION_KINDS = ("failed", "missing", "unreported", "evaluated")
+
+
+class RegressionMatrix:
+    """
+    Agent x baseline-passed-test regression matrix for one TestGen LLM group.
+
+    The columns are the tests the None baseline resolves, laid out like a
+    SolveMatrix. Each agent gets one bitset row per kind, restricted to the
+    instances its file covers:
+
+      failed     - listed as unresolved (and not resolved): a real regression
+      missing    - listed under details.missing only: the test did not run
+      unreported - in no outcome list at all
+      evaluated  - resolved or unresolved, i.e. the tests that were judged
+
+    Missing and unreported tests are evaluation gaps, so they are kept apart
+    from failures instead of being counted as broken.
+    """
+
+    def __init__(self, store, passed_map):
+        self.store = store
+        self.tests = SolveMatrix(passed_map)  # columns only; rows live below
+        self.agents = []
+        self.files = []
+        self.rows = {kind: [] for kind in REGRESSION_KINDS}
+        self._bit_of = column_index(store, self.tests)
+        self._instance_mask = dict(zip(self.tests.instances, self.tests.instance_masks))
+
+    def _agent_rows(self, filename):
+        store, bit_of, n_bytes = self.store, self._bit_of, self.tests.n_bytes
+        resolved = solve_row(store, filename, bit_of, n_bytes, RESOLVED)
+        unresolved = solve_row(store, filename, bit_of, n_bytes, UNRESOLVED)
+        missing = solve_row(store, filename, bit_of, n_bytes, MISSING)
+        covered = 0
+        for inst in store.instance_list(filename):
+            covered |= self._instance_mask.get(inst, 0)
+        return {
+            "failed": unresolved & ~resolved,
+            "missing": missing & ~resolved & ~unresolved,
+            "unreported": covered & ~(resolved | unresolved | missing),
+            "evaluated": covered & (resolved | unresolved),
+        }
+
+    def set_agent(self, agent, filename):
+        """(Re)builds an agent's rows from its file; returns the row index."""
+        rows = self._agent_rows(filename)
+        if agent in self.agents:
+            idx = self.agents.index(agent)
+            self.files[idx] = filename
+            for kind in REGRESSION_KINDS:
+                self.rows[kind][idx] = rows[kind]
+            return idx
+        self.agents.append(agent)
+        self.files.append(filename)
+        for kind in REGRESSION_KINDS:
+            self.rows[kind].append(rows[kind])
+        return len(self.agents) - 1
+
+    def remove_agent(self, agent):
+        if agent not in self.agents:
+            return None
+        idx = self.agents.index(agent)
+        del self.agents[idx], self.files[idx]
+        for kind in REGRESSION_KINDS:
+            del self.rows[kind][idx]
+        return idx
+
+    # ---------------------------- reductions ----------------------------
+
+    def counts(self):
+        """{agent: {kind: number of tests}} for every agent."""
+        totals = {kind: [row.bit_count() for row in rows] for kind, rows in self.rows.items()}
+        return {agent: {kind: totals[kind][idx] for kind in REGRESSION_KINDS} for idx, agent in enumerate(self.agents)}
+
+    def drilldown(self, idx):
+        """{instance: {kind: [test names]}} of an agent's failed / missing / unreported tests."""
+        entries = {}
+        for kind in REGRESSION_KINDS[:3]:
+            for inst, test in self.tests.tests_of(self.rows[kind][idx]):
+                entries.setdefault(inst, {}).setdefault(kind, []).append(test)
+        return entries
+
+
+@profiling.profiled()
+def build_regression_matrix(store, passed_map, agent_files):
+    """
+    Builds the RegressionMatrix for a group from the results store.
+    passed_map: {instance_id: tests resolved by the None baseline}; files missing from the store are skipped.
+    """
+    matrix = RegressionMatrix(store, passed_map)
+    for agent_name, filename in agent_files:
+        if store.has(filename):
+            matrix.set_agent(agent_name, filename)
+    return matrix
@@ -0,0 +1,142 @@
+import re
+import json
+
+# Schema variants of a leaderboard results_<agent>.json
+SCHEMA_LISTS = "lists"                  # {"resolved": [...], "no_generation": [...], ...}
+SCHEMA_INSTANCE_DICT = "instance_dict"  # {"<instance_id>": {...details...}, ...}
+SCHEMA_MIXED = "mixed"
+SCHEMA_LIST = "list"                    # top-level list, no known layout
+SCHEMA_EMPTY = "empty"
+SCHEMA_INVALID = "invalid"
+
+CHUNK_SIZE = 1 << 16
+
+# One JSON token, after optional whitespace: string | structural char | scalar
+TOKEN_RE = re.compile(rb'\s*(?:("(?:[^"\\]|\\.)*")|([{}\[\]:,])|([^\s{}\[\]:,"]+))')
+
+
+# ============================================================
+# SCAN RESULT
+# ============================================================
+
+class SubmissionScan:
+    """
+    Instance IDs found in one results file, by where they appeared:
+    ids_by_key[key] holds the "__" strings of a top-level list, and
+    instance_keys the "__" top-level keys whose value is an object.
+    """
+
+    def __init__(self):
+        self.top_level = None
+        self.ids_by_key = {}
+        self.instance_keys = []
+        self.error = None
+
+    @property
+    def schema(self):
+        if self.error is not None:
+            return SCHEMA_INVALID
+        if self.top_level == "[":
+            return SCHEMA_LIST
+        has_lists = any(self.ids_by_key.values())
+        if has_lists and self.instance_keys:
+            return SCHEMA_MIXED
+        if self.instance_keys:
+            return SCHEMA_INSTANCE_DICT
+        if has_lists:
+            return SCHEMA_LISTS
+        return SCHEMA_EMPTY
+
+    def submitted_ids(self):
+        """Every instance ID the file mentions."""
+        ids = set(self.instance_keys)
+        for values in self.ids_by_key.values():
+            ids.update(values)
+        return ids
+
+    def resolved_ids(self):
+        return set(self.ids_by_key.get("resolved", ()))
+
+
+# ============================================================
+# STREAMING SCANNER
+# ============================================================
+
+def _tokens(f):
+    """Yields (string, punct, scalar) token groups from a binary file, chunk by chunk."""
+    buf = b""
+    pos = 0
+    eof = False
+    while True:
+        if not eof:
+            chunk = f.read(CHUNK_SIZE)
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            pos = 0
+
+        while True:
+            m = TOKEN_RE.match(buf, pos)
+            # A token touching the end of the buffer may continue in the next chunk
+            if m is None or (m.end() == len(buf) and not eof):
+                break
+            pos = m.end()
+            yield m.groups()
+
+        if eof:
+            if buf[pos:].strip():
+                raise ValueError(f"Unexpected data at byte {pos}")
+            return
+
+
+def scan_submission(path):
+    """
+    Streams a results file and collects instance IDs (strings containing
+    "__") the way the old full json.load walk did: items of top-level lists
+    and top-level keys whose value is an object. Nothing else is decoded.
+    """
+    scan = SubmissionScan()
+    stack = []  # [container char, key in parent, expecting key]
+    key = None  # last top-level key read
+
+    try:
+        with open(path, "rb") as f:
+            for string, punct, scalar in _tokens(f):
+                top = stack[-1] if stack else None
+
+                if string is not None:
+                    if top is not None and top[0] == "{" and top[2]:
+                        top[2] = False
+                        if len(stack) == 1:
+                            key = json.loads(string)
+                    elif len(stack) == 2 and top[0] == "[" and stack[0][0] == "{" and b"__" in string:
+                        value = json.loads(string)
+                        if "__" in value:
+                            scan.ids_by_key[top[1]].append(value)
+
+                elif punct in (b"{", b"["):
+                    char = punct.decode()
+                    if not stack:
+                        scan.top_level = char
+                    elif len(stack) == 1 and top[0] == "{":
+                        if char == "[":
+                            scan.ids_by_key.setdefault(key, [])
+                        elif "__" in key:
+                            scan.instance_keys.append(key)
+                    parent_key = key if len(stack) == 1 and top[0] == "{" else None
+                    stack.append([char, parent_key, char == "{"])
+
+                elif punct in (b"}", b"]"):
+                    if not stack or stack[-1][0] != ("{" if punct == b"}" else "["):
+                        raise ValueError("Mismatched bracket")
+                    stack.pop()
+
+                elif punct == b",":
+                    if top is not None and top[0] == "{":
+                        top[2] = True
+
+        if stack:
+            raise ValueError("Truncated JSON")
+    except (OSError, ValueError) as e:
+        scan.error = str(e)
+
+    return scan
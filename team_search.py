@@ -0,0 +1,111 @@
+import heapq
+
+import profiling
+
+# Exhaustive branch-and-bound is the default up to this team size
+EXACT_MAX_K = 3
+
+
+# ============================================================
+# SCORING
+# ============================================================
+
+def coverage_scorer(hard_mask=0, hard_weight=0, unique_mask=0, unique_weight=0):
+    """
+    Returns score(mask) for a bitset of covered meaningful tests.
+    Each test counts 1, plus hard_weight if it is in hard_mask and
+    unique_weight if it is in unique_mask. Weighted coverage stays
+    monotone and submodular, which both searches below rely on.
+    """
+    if not hard_weight and not unique_weight:
+        return lambda mask: mask.bit_count()
+
+    def score(mask):
+        return (
+            mask.bit_count()
+            + hard_weight * (mask & hard_mask).bit_count()
+            + unique_weight * (mask & unique_mask).bit_count()
+        )
+    return score
+
+
+# ============================================================
+# GREEDY (CELF)
+# ============================================================
+
+def greedy_team(rows, k, score):
+    """
+    Greedy max-coverage with lazy marginal-gain evaluation (CELF).
+    Stale gains are upper bounds (submodularity), so an entry is only
+    re-scored when it reaches the top of the heap.
+    Returns (sorted agent indices, team score).
+    """
+    heap = [(-score(row), idx, 0) for idx, row in enumerate(rows)]
+    heapq.heapify(heap)
+
+    team, covered, current = [], 0, 0
+    while heap and len(team) < k:
+        neg_gain, idx, rnd = heapq.heappop(heap)
+        if rnd == len(team):
+            team.append(idx)
+            covered |= rows[idx]
+            current -= neg_gain
+            continue
+        gain = score(covered | rows[idx]) - current
+        heapq.heappush(heap, (-gain, idx, len(team)))
+
+    return sorted(team), current
+
+
+# ============================================================
+# EXACT (BRANCH AND BOUND)
+# ============================================================
+
+def exact_team(rows, k, score):
+    """
+    Best team of exactly k agents (all agents if there are fewer).
+    Depth-first over agent indices in itertools.combinations order, pruned
+    with a submodular bound: current score + the k - m largest marginal gains
+    left. Among equal scores the first combination wins, as with
+    itertools.combinations.
+    Returns (sorted agent indices, team score).
+    """
+    n = len(rows)
+    k = min(k, n)
+    if k == 0:
+        return [], 0
+
+    # Greedy gives a floor that any optimal team must reach
+    _, floor = greedy_team(rows, k, score)
+    best = None  # (score, team)
+
+    def search(start, team, covered, current):
+        nonlocal best
+        slots = k - len(team)
+        if slots == 0:
+            if (best is None and current >= floor) or (best is not None and current > best[0]):
+                best = (current, list(team))
+            return
+
+        candidates = range(start, n - slots + 1)
+        gains = sorted((score(covered | rows[j]) - current for j in range(start, n)), reverse=True)
+        bound = current + sum(gains[:slots])
+        if (best is None and bound < floor) or (best is not None and bound <= best[0]):
+            return
+
+        for j in candidates:
+            team.append(j)
+            merged = covered | rows[j]
+            search(j + 1, team, merged, score(merged))
+            team.pop()
+
+    search(0, [], 0, 0)
+    return best[1], best[0]
+
+
+@profiling.profiled()
+def best_team(rows, k, score, exact=None):
+    """exact=None picks branch-and-bound for k <= EXACT_MAX_K and CELF greedy above."""
+    if exact is None:
+        exact = k <= EXACT_MAX_K
+    return exact_team(rows, k, score) if exact else greedy_team(rows, k, score)
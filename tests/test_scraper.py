@@ -0,0 +1,92 @@
+import os
+import json
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+SCRAPER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scraper.py")
+TARGET_PATH = os.path.join("evaluation", "verified")
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not available")
+
+GIT_ENV = dict(os.environ, GIT_AUTHOR_NAME="test", GIT_AUTHOR_EMAIL="test@example.com",
+               GIT_COMMITTER_NAME="test", GIT_COMMITTER_EMAIL="test@example.com")
+
+
+def git(*args, cwd):
+    subprocess.run(["git", *args], cwd=cwd, env=GIT_ENV, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+
+def write_experiment(work, exp_dir_name, resolved, agent_file=None):
+    results_dir = os.path.join(work, TARGET_PATH, exp_dir_name, "results")
+    os.makedirs(results_dir, exist_ok=True)
+    with open(os.path.join(results_dir, "results.json"), "w", encoding="utf-8") as f:
+        json.dump({"resolved": resolved}, f)
+    if agent_file:
+        with open(os.path.join(results_dir, agent_file), "w", encoding="utf-8") as f:
+            f.write("{}")
+
+
+def commit_all(work, message):
+    git("add", "-A", cwd=work)
+    git("commit", "-q", "-m", message, cwd=work)
+    git("push", "-q", "origin", "HEAD:master", cwd=work)
+
+
+def scrape(tmp_path, output_dir, temp_dir, repo_url, incremental):
+    args = [sys.executable, SCRAPER, "--repo_url", repo_url, "--temp_dir", str(tmp_path / temp_dir),
+            "--output_dir", str(tmp_path / output_dir)]
+    if incremental:
+        args.append("--incremental")
+    result = subprocess.run(args, cwd=tmp_path, env=GIT_ENV, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    assert "Fatal Error" not in result.stdout, result.stdout
+
+
+def read_outputs(output_dir):
+    outputs = {}
+    for filename in sorted(os.listdir(output_dir)):
+        if filename.startswith("results_"):
+            with open(os.path.join(output_dir, filename), "r", encoding="utf-8") as f:
+                outputs[filename] = json.load(f)
+    return outputs
+
+
+def test_incremental_matches_full_scrape(tmp_path):
+    origin = tmp_path / "origin.git"
+    work = tmp_path / "work"
+    git("init", "-q", "--bare", "-b", "master", str(origin), cwd=tmp_path)
+    git("clone", "-q", str(origin), str(work), cwd=tmp_path)
+    repo_url = origin.as_uri()
+
+    write_experiment(work, "20240101_Alpha", ["a-1"], "Alpha__gpt-4o.json")
+    write_experiment(work, "20240102_Beta", ["b-1"])
+    write_experiment(work, "20240103_Gamma", ["g-1"])
+    write_experiment(work, "20240104_Eps", ["e-1"])
+    write_experiment(work, "20240105_Eps", ["e-2"])
+    os.makedirs(work / TARGET_PATH / "20240106_NoResults")
+    (work / TARGET_PATH / "20240106_NoResults" / "README.md").write_text("no results yet")
+    commit_all(work, "initial")
+
+    scrape(tmp_path, "out_incremental", "clone_incremental", repo_url, incremental=True)
+    assert sorted(read_outputs(tmp_path / "out_incremental")) == [
+        "results_Alpha.json", "results_Beta.json", "results_Eps.json", "results_Gamma.json"]
+
+    # Edit one experiment, drop one agent, supersede one and un-supersede another
+    write_experiment(work, "20240102_Beta", ["b-1", "b-2"])
+    shutil.rmtree(work / TARGET_PATH / "20240101_Alpha")
+    write_experiment(work, "20240110_Gamma", ["g-2"])
+    shutil.rmtree(work / TARGET_PATH / "20240105_Eps")
+    commit_all(work, "update")
+
+    scrape(tmp_path, "out_incremental", "clone_incremental", repo_url, incremental=True)
+    scrape(tmp_path, "out_full", "clone_full", repo_url, incremental=False)
+
+    full = read_outputs(tmp_path / "out_full")
+    assert full == {
+        "results_Beta.json": {"resolved": ["b-1", "b-2"]},
+        "results_Eps.json": {"resolved": ["e-1"]},
+        "results_Gamma.json": {"resolved": ["g-2"]},
+    }
+    assert read_outputs(tmp_path / "out_incremental") == full
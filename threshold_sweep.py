@@ -0,0 +1,200 @@
+from bisect import bisect_right
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# ============================================================
+# SOLVED-FRACTION VECTORS
+# ============================================================
+
+def solved_fractions(group):
+    """
+    (instances, agents, fractions): for every matrix agent, the share of each
+    instance's meaningful tests it solved, aligned with matrix.instances.
+    """
+    matrix = group.matrix
+    totals = [mask.bit_count() for mask in matrix.instance_masks]
+    fractions = [[c / t if t else 0.0 for c, t in zip(row, totals)] for row in group.counts]
+    return matrix.instances, matrix.agents, fractions
+
+
+def threshold_grid(fractions):
+    """Every distinct fraction, plus 0 (all pass) and 1 (all tests), ascending."""
+    values = {0.0, 1.0}
+    for row in fractions:
+        values.update(row)
+    return sorted(values)
+
+
+# ============================================================
+# SWEEP
+# ============================================================
+
+class ThresholdSweep:
+    """
+    Confusion counts of the predictor "solved fraction >= t" against real
+    resolution, for every threshold t of a shared grid and every row (agent).
+
+    tp[r][k] / fp[r][k] count the predicted passes of row r at thresholds[k]
+    that really passed / failed; positives[r] / negatives[r] are the row's
+    real passes / failures. The smallest positive threshold is the "at least
+    one meaningful test" criterion and 1.0 is "all meaningful tests".
+    """
+
+    def __init__(self, thresholds, tp, fp, positives, negatives):
+        self.thresholds = thresholds
+        self.tp = tp
+        self.fp = fp
+        self.positives = positives
+        self.negatives = negatives
+
+    @classmethod
+    def compute(cls, fractions, labels, thresholds=None, use_numpy=None):
+        """
+        fractions: rows x instances solved fractions; labels: rows x instances
+        real pass flags. Each value is bucketed under the largest threshold not
+        above it, and a reverse cumulative sum of the buckets gives every
+        threshold's counts in one pass.
+        """
+        if thresholds is None:
+            thresholds = threshold_grid(fractions)
+        if use_numpy is None:
+            use_numpy = np is not None
+        k = len(thresholds)
+
+        if use_numpy and fractions:
+            values = np.asarray(fractions, dtype=np.float64)
+            passed = np.asarray(labels, dtype=bool)
+            bucket = np.searchsorted(np.asarray(thresholds), values, side="right") - 1
+            bucket += np.arange(len(fractions))[:, None] * k
+            pos = np.bincount(bucket[passed], minlength=len(fractions) * k).reshape(-1, k)
+            neg = np.bincount(bucket[~passed], minlength=len(fractions) * k).reshape(-1, k)
+            tp = pos[:, ::-1].cumsum(axis=1)[:, ::-1]
+            fp = neg[:, ::-1].cumsum(axis=1)[:, ::-1]
+            return cls(thresholds, tp.tolist(), fp.tolist(), pos.sum(axis=1).tolist(), neg.sum(axis=1).tolist())
+
+        tp, fp, positives, negatives = [], [], [], []
+        for row, row_labels in zip(fractions, labels):
+            pos = [0] * k
+            neg = [0] * k
+            for value, passed in zip(row, row_labels):
+                bucket = bisect_right(thresholds, value) - 1
+                if passed:
+                    pos[bucket] += 1
+                else:
+                    neg[bucket] += 1
+            tp.append(_reverse_cumsum(pos))
+            fp.append(_reverse_cumsum(neg))
+            positives.append(sum(pos))
+            negatives.append(sum(neg))
+        return cls(thresholds, tp, fp, positives, negatives)
+
+    def pooled(self):
+        """A one-row sweep summing every row (micro-averaged across agents)."""
+        return ThresholdSweep(
+            self.thresholds,
+            [[sum(col) for col in zip(*self.tp)]] if self.tp else [[0] * len(self.thresholds)],
+            [[sum(col) for col in zip(*self.fp)]] if self.fp else [[0] * len(self.thresholds)],
+            [sum(self.positives)],
+            [sum(self.negatives)],
+        )
+
+    # ---------------------------- per-threshold metrics ----------------------------
+
+    def index_of(self, criterion):
+        """Grid index of "any" (smallest positive threshold), "all" (1.0) or a threshold value."""
+        if criterion == "any":
+            return min(k for k, t in enumerate(self.thresholds) if t > 0)
+        if criterion == "all":
+            return self.thresholds.index(1.0)
+        return self.thresholds.index(criterion)
+
+    def confusion(self, row, k):
+        """(TP, FP, FN, TN) of a row at grid index k."""
+        tp, fp = self.tp[row][k], self.fp[row][k]
+        return tp, fp, self.positives[row] - tp, self.negatives[row] - fp
+
+    def metrics(self, row, k):
+        """{"TP", "FP", "FN", "TN", "Prec", "Recall", "F1", "FPR"} of a row at grid index k."""
+        tp, fp, fn, tn = self.confusion(row, k)
+        precision = tp / (tp + fp) if (tp + fp) > 0 else 0
+        recall = tp / (tp + fn) if (tp + fn) > 0 else 0
+        f1 = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
+        fpr = fp / (fp + tn) if (fp + tn) > 0 else 0
+        return {"TP": tp, "FP": fp, "FN": fn, "TN": tn, "Prec": precision, "Recall": recall, "F1": f1, "FPR": fpr}
+
+    def best_index(self, row, key="F1"):
+        """
+        Grid index maximizing a metric over the positive thresholds (t = 0
+        passes everything, so it is no criterion); ties go to the stricter one.
+        """
+        return max(range(self.index_of("any"), len(self.thresholds)), key=lambda k: (self.metrics(row, k)[key], k))
+
+    # ---------------------------- curves ----------------------------
+
+    def roc_curve(self, row):
+        """[(FPR, TPR)] from the strictest threshold down, starting at (0, 0); None without both classes."""
+        p, n = self.positives[row], self.negatives[row]
+        if not p or not n:
+            return None
+        points = [(0.0, 0.0)]
+        for k in reversed(range(len(self.thresholds))):
+            points.append((self.fp[row][k] / n, self.tp[row][k] / p))
+        return points
+
+    def pr_curve(self, row):
+        """[(recall, precision)] from the strictest threshold down; None without real passes."""
+        p = self.positives[row]
+        if not p:
+            return None
+        points = []
+        for k in reversed(range(len(self.thresholds))):
+            tp, fp = self.tp[row][k], self.fp[row][k]
+            points.append((tp / p, tp / (tp + fp) if tp + fp else 1.0))
+        return points
+
+    def roc_auc(self, row):
+        points = self.roc_curve(row)
+        if points is None:
+            return None
+        return sum((x1 - x0) * (y0 + y1) / 2 for (x0, y0), (x1, y1) in zip(points, points[1:]))
+
+    def average_precision(self, row):
+        """Area under the PR step curve: sum of precision x recall gained at each threshold."""
+        points = self.pr_curve(row)
+        if points is None:
+            return None
+        ap = 0.0
+        prev_recall = 0.0
+        for recall, precision in points:
+            ap += (recall - prev_recall) * precision
+            prev_recall = recall
+        return ap
+
+    def to_json(self, names):
+        """Per-row confusion counts and curves, keyed by row name."""
+        rows = {}
+        for r, name in enumerate(names):
+            rows[name] = {
+                "positives": self.positives[r],
+                "negatives": self.negatives[r],
+                "tp": self.tp[r],
+                "fp": self.fp[r],
+                "roc_auc": self.roc_auc(r),
+                "average_precision": self.average_precision(r),
+                "roc": self.roc_curve(r),
+                "pr": self.pr_curve(r),
+            }
+        return {"thresholds": self.thresholds, "rows": rows}
+
+
+def _reverse_cumsum(values):
+    out = [0] * len(values)
+    acc = 0
+    for k in reversed(range(len(values))):
+        acc += values[k]
+        out[k] = acc
+    return out
@@ -0,0 +1,324 @@
+import os
+import time
+import argparse
+from datetime import datetime
+
+import profiling
+from llm_group import load_llm_group
+from results_store import (
+    RUN_RESULT_DIR, is_run_result_file, load_store, match_baseline_key, parse_filename, refresh_files, scan_results_dir,
+)
+
+# Seconds between directory polls
+POLL_INTERVAL = 5.0
+
+
+def _dir_stamps(results_dir):
+    stamps = {}
+    for f in os.listdir(results_dir):
+        if is_run_result_file(f):
+            try:
+                st = os.stat(os.path.join(results_dir, f))
+            except FileNotFoundError:
+                continue
+            stamps[f] = (st.st_size, st.st_mtime_ns)
+    return stamps
+
+
+# ============================================================
+# PER-GROUP AGGREGATES
+# ============================================================
+
+class GroupWatch:
+    """
+    Running aggregates of one LLM group: per-agent meaningful stats, the
+    per-instance oracle max, the ensemble union, solved-once/solved-twice
+    masks and the best pair. A new or replaced agent only scores its own
+    pairs; the union/oracle aggregates are rebuilt from the in-memory
+    matrix rows on replacement or removal, without re-reading any file, and
+    all pairs are rescanned only when the agent left was in the best pair.
+    """
+
+    def __init__(self, group):
+        self.group = group
+        self.agent_stats = {}  # agent -> (meaningful solved, meaningful instances, raw resolved)
+        for agent, filename in group.agent_files:
+            if group.store.has(filename):
+                self.agent_stats[agent] = self._stats(agent, filename)
+        self.rebuild()
+        self.rescan_pairs()
+
+    def _stats(self, agent, filename):
+        matrix = self.group.matrix
+        idx = matrix.agents.index(agent)
+        counts = self.group.counts[idx]
+        raw = sum(self.group.store.n_resolved(filename).values())
+        return matrix.count(matrix.rows[idx]), sum(1 for c in counts if c), raw
+
+    def rebuild(self):
+        """Oracle max, union and solver masks from the current matrix rows."""
+        matrix = self.group.matrix
+        counts = self.group.counts
+        self.oracle_max = [max(col) for col in zip(*counts)] if counts else [0] * len(matrix.instances)
+        self.union = matrix.union()
+        self.once, self.twice = matrix.solver_masks()
+
+    # ---------------------------- best pair ----------------------------
+    # Among equal scores the pair first in itertools.combinations order over
+    # the matrix rows wins, as in analyze_advanced.report_best_team.
+
+    def rescan_pairs(self):
+        rows = self.group.matrix.rows
+        best = None  # (score, i, j)
+        for i in range(len(rows)):
+            for j in range(i + 1, len(rows)):
+                score = (rows[i] | rows[j]).bit_count()
+                if best is None or score > best[0]:
+                    best = (score, i, j)
+        self._set_best(best)
+
+    def _offer_pairs(self, idx):
+        """Scores every pair with row idx against the current best pair."""
+        matrix = self.group.matrix
+        rows, agents = matrix.rows, matrix.agents
+        best = None
+        if self.best_pair is not None:
+            score, (a, b) = self.best_pair
+            best = (score, agents.index(a), agents.index(b))
+        row = rows[idx]
+        for j in range(len(rows)):
+            if j == idx:
+                continue
+            pair = (j, idx) if j < idx else (idx, j)
+            score = (row | rows[j]).bit_count()
+            if best is None or score > best[0] or (score == best[0] and pair < best[1:]):
+                best = (score, *pair)
+        self._set_best(best)
+
+    def _set_best(self, best):
+        # Kept by name, so row indices shifting on removal do not matter
+        agents = self.group.matrix.agents
+        self.best_pair = None if best is None else (best[0], (agents[best[1]], agents[best[2]]))
+
+    def _in_best_pair(self, agent):
+        return self.best_pair is not None and agent in self.best_pair[1]
+
+    # ---------------------------- updates ----------------------------
+
+    def _add_row(self, idx):
+        """Folds in the agent just appended at row idx."""
+        matrix = self.group.matrix
+        row = matrix.rows[idx]
+        self.oracle_max = [max(a, b) for a, b in zip(self.oracle_max, self.group.counts[idx])]
+        self.union |= row
+        self.twice |= self.once & row
+        self.once |= row
+        self._offer_pairs(idx)
+
+    def apply(self, filename):
+        """
+        Brings one agent file (already refreshed in the store) into the
+        aggregates. Returns "added", "updated", "removed" or None.
+        """
+        group = self.group
+        agent = parse_filename(filename)[0]
+        existed = agent in group.matrix.agents
+        # Pairs without this agent keep their scores, so the best of them
+        # stays current unless the agent itself was in the best pair
+        was_best = self._in_best_pair(agent)
+
+        idx = group.update_agent_file(filename)
+        if idx is None:
+            self.agent_stats.pop(agent, None)
+            if not existed:
+                return None
+            self.rebuild()
+            if was_best:
+                self.rescan_pairs()
+            return "removed"
+
+        self.agent_stats[agent] = self._stats(agent, filename)
+        if existed:
+            self.rebuild()
+            if was_best:
+                self.rescan_pairs()
+            else:
+                self._offer_pairs(idx)
+            return "updated"
+        self._add_row(idx)
+        return "added"
+
+    def report(self, events=()):
+        group = self.group
+        matrix = group.matrix
+        total = group.total_meaningful
+        stamp = datetime.now().strftime("%H:%M:%S")
+
+        print(f"\n{'='*80}")
+        print(f"WATCH [{stamp}]: TestGen LLM = {group.llm}")
+        print(f"{'='*80}")
+        for event, agent in events:
+            print(f"  {event}: {agent}")
+        print(f"  Agents: {len(matrix.agents)} | Meaningful Tests: {total}")
+        if not matrix.agents:
+            print("  No agent data.")
+            return
+
+        def pct(n):
+            return f"{n / total * 100:.2f}%" if total else "0.00%"
+
+        unique_mask = self.once & ~self.twice
+        rows = []
+        for agent, row in zip(matrix.agents, matrix.rows):
+            solved, n_inst, raw = self.agent_stats[agent]
+            rows.append((agent, solved, n_inst, (row & unique_mask).bit_count(), raw))
+        # First in matrix row order wins ties, as in report_oracle
+        best_agent, best_score = max(rows, key=lambda r: r[1])[:2]
+        rows.sort(key=lambda r: (-r[1], r[0]))
+
+        row_format = "{:<40} | {:<12} | {:<10} | {:<12} | {:<8} | {:<10}"
+        print(row_format.format("Agent", "Mean. Tests", "% Tests", "Mean. Inst.", "Unique", "Total Raw"))
+        print("-" * 110)
+        for agent, solved, n_inst, unique, raw in rows:
+            print(row_format.format(agent, solved, pct(solved), f"{n_inst}/{len(matrix.instances)}", unique, raw))
+
+        oracle = sum(self.oracle_max)
+        ensemble = self.union.bit_count()
+        print(f"\n  Best Single Agent: {best_agent} ({best_score} / {total}, {pct(best_score)})")
+        print(f"  Oracle (best agent per instance): {oracle} ({pct(oracle)}) | +{oracle - best_score} vs best")
+        print(f"  Ensemble (union of all agents):   {ensemble} ({pct(ensemble)}) | +{ensemble - oracle} vs oracle")
+        if self.best_pair is not None:
+            score, (a, b) = self.best_pair
+            print(f"  Best Pair: {a} + {b} ({score}, {pct(score)})")
+
+
+# ============================================================
+# DIRECTORY WATCHER
+# ============================================================
+
+class CorpusWatch:
+    """Polls a run_result directory and keeps one GroupWatch per TestGen LLM current."""
+
+    def __init__(self, results_dir):
+        self.results_dir = results_dir
+        # A mutable store; a memory-mapped snapshot cannot take new files
+        self.store = load_store(results_dir, snapshot=False)
+        self.seen = _dir_stamps(results_dir)
+        self.unsettled = {}  # filename -> stamp at the previous poll
+        self.groups = {}     # llm -> GroupWatch, None while baselines are missing
+
+        files_by_llm, _, _ = scan_results_dir(results_dir)
+        for llm in sorted(files_by_llm):
+            self._build_group(llm)
+
+    def _build_group(self, llm):
+        files_by_llm, gold_files, none_files = scan_results_dir(self.results_dir)
+        group = load_llm_group(self.store, llm, files_by_llm.get(llm, []), gold_files, none_files)
+        self.groups[llm] = GroupWatch(group) if group is not None else None
+        return self.groups[llm]
+
+    def report_all(self):
+        for llm in sorted(self.groups):
+            if self.groups[llm] is None:
+                print(f"\n[WATCH] {llm}: waiting for Gold/None baselines.")
+            else:
+                self.groups[llm].report()
+
+    def _settled_changes(self):
+        """
+        Files added, modified or removed since the last poll. A file counts
+        only once its size/mtime held for a full poll, so half-written runs
+        are not parsed.
+        """
+        stamps = _dir_stamps(self.results_dir)
+        ready = []
+        for f in sorted(set(stamps) | set(self.seen)):
+            stamp = stamps.get(f)
+            if stamp == self.seen.get(f):
+                self.unsettled.pop(f, None)
+                continue
+            if stamp is not None and self.unsettled.get(f) != stamp:
+                self.unsettled[f] = stamp
+                continue
+            self.unsettled.pop(f, None)
+            if stamp is None:
+                del self.seen[f]
+            else:
+                self.seen[f] = stamp
+            ready.append(f)
+        return ready
+
+    @profiling.profiled()
+    def poll(self):
+        """Applies settled changes and re-emits the affected groups. Returns the number of files applied."""
+        changed = refresh_files(self.store, self._settled_changes())
+        if not changed:
+            return 0
+
+        rebuild = set()
+        agent_changes = []
+        for f in changed:
+            agent, llm = parse_filename(f)
+            if agent in ("GOLD", "NONE"):
+                # New baselines change the meaningful map, so every matching group starts over
+                rebuild.update(key for key in self.groups if match_baseline_key(key, {llm: f}))
+                files_by_llm, _, _ = scan_results_dir(self.results_dir)
+                rebuild.update(key for key in files_by_llm if match_baseline_key(key, {llm: f}))
+            elif self.groups.get(llm) is None:
+                rebuild.add(llm)
+            else:
+                agent_changes.append((llm, f))
+
+        events = {}
+        for llm in sorted(rebuild):
+            self._build_group(llm)
+            events.setdefault(llm, []).append(("rebuilt", "baselines or new group"))
+        for llm, f in agent_changes:
+            if llm in rebuild:
+                continue
+            event = self.groups[llm].apply(f)
+            if event:
+                events.setdefault(llm, []).append((event, parse_filename(f)[0]))
+
+        for llm in sorted(events):
+            if self.groups.get(llm) is None:
+                print(f"\n[WATCH] {llm}: waiting for Gold/None baselines.")
+            else:
+                self.groups[llm].report(events[llm])
+        return len(changed)
+
+
+# ============================================================
+# MAIN
+# ============================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-emit group reports as run_result files land.")
+    parser.add_argument("--data_dir", default=RUN_RESULT_DIR, help="run_result directory to watch.")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL, help="Seconds between polls (default: 5).")
+    parser.add_argument("--polls", type=int, default=None, help="Stop after this many polls (default: until Ctrl-C).")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.data_dir):
+        print(f"Error: Directory not found: {args.data_dir}")
+        return
+
+    print(f"Watching {args.data_dir} every {args.interval:g}s (Ctrl-C to stop)...")
+    watch = CorpusWatch(args.data_dir)
+    watch.report_all()
+
+    n = 0
+    try:
+        while args.polls is None or n < args.polls:
+            time.sleep(args.interval)
+            start = time.perf_counter()
+            applied = watch.poll()
+            if applied:
+                print(f"\n[WATCH] Applied {applied} file(s) in {time.perf_counter() - start:.3f}s")
+            n += 1
+    except KeyboardInterrupt:
+        print("\nStopped.")
+
+
+if __name__ == "__main__":
+    main()